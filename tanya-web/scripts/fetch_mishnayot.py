@@ -7,13 +7,37 @@ IMPORTANT:
 - Sefaria's content is licensed under CC BY-NC 4.0
 - You MUST attribute Sefaria in your app
 - Use responsibly and don't overwhelm their servers
+
+--bulk fetches each tractate with a single whole-book request (63 requests
+instead of ~590) and splits it into the usual per-chapter files, falling
+back to per-chapter requests for tractates whose book response fails or
+comes back incomplete.
+
+--profile times every request, JSON decode and file write and writes
+mishnayot_texts/fetch_run_report.json (see mishnah_profiling.py).
+
+--base-url (or $SEFARIA_BASE_URL) points the fetcher at another server,
+such as the local stand-in in mishnah_sefaria_stub.py, so concurrency and
+retry changes can be tested and timed offline.
 """
 
+import argparse
+import hashlib
 import requests
 import json
+import random
+import sys
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+from mishnah_profiling import (CODE_PROFILERS, code_profiler, enable_profiling, print_run_report, profiling_enabled,
+                               stage, tally, write_run_report)
 
 # List of all 63 Mishnah tractates in order
 MISHNAH_TRACTATES = [
@@ -93,77 +117,630 @@ MISHNAH_TRACTATES = [
     "Mishnah_Oktzin",
 ]
 
-BASE_URL = "https://www.sefaria.org.il/api/v3/texts"
+# API root - override with --base-url or $SEFARIA_BASE_URL (e.g. the mishnah_sefaria_stub.py stand-in)
+DEFAULT_SITE_URL = "https://www.sefaria.org.il"
+BASE_URL = f"{DEFAULT_SITE_URL}/api/v3/texts"
+INDEX_URL = f"{DEFAULT_SITE_URL}/api/v2/index"
 OUTPUT_DIR = Path("mishnayot_texts")
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+FAILURE_REPORT_FILE = OUTPUT_DIR / "fetch_failures.json"
+RUN_REPORT_FILE = OUTPUT_DIR / "fetch_run_report.json"
+FETCH_STAGES = ("fetch", "parse", "write")
+
+# Concurrency defaults - the rate limit is shared by all workers, so raising
+# the worker count only hides latency, it never increases load on Sefaria
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0  # requests per second (the old serial loop slept 0.5s per call)
+
+# Retry policy for transient failures (rate limiting, server errors, network blips)
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds, doubled on every attempt
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-request timeouts in seconds (a whole tractate is a much bigger response)
+REQUEST_TIMEOUT = 10.0
+BOOK_TIMEOUT = 60.0
+
+# Query parameters of every text request (chapter or whole tractate)
+TEXT_PARAMS = {
+    "version": "hebrew|Torat Emet 357",
+    "fill_in_missing_segments": 1,
+    "return_format": "wrap_all_entities"
+}
+
+# Per-section fields of a chapter response - everything else is the same for every chapter of a book
+SECTION_FIELDS = ('ref', 'heRef', 'sections', 'toSections', 'sectionRef', 'heSectionRef',
+                  'firstAvailableSectionRef', 'isSpanning', 'next', 'prev', 'title')
+
+# One keep-alive session per worker thread (requests.Session is not thread-safe)
+_thread_local = threading.local()
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter shared across fetch workers"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    
+                    wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+    
+    def pause(self, seconds):
+        """Hold back every worker for a while (e.g. after a 429 with Retry-After)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+def configure_api(site_url=None, timeout=None):
+    """Point the fetcher at another Sefaria-compatible server and/or change the request timeout"""
+    global BASE_URL, INDEX_URL, REQUEST_TIMEOUT
+    if site_url:
+        site_url = site_url.rstrip('/')
+        BASE_URL = f"{site_url}/api/v3/texts"
+        INDEX_URL = f"{site_url}/api/v2/index"
+    if timeout:
+        REQUEST_TIMEOUT = timeout
+
+def get_session():
+    """Return this thread's pooled keep-alive HTTP session"""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.session = session
+    return session
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it into place, returning the bytes written
+    
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    """
+    payload = json.dumps(data, ensure_ascii=False, **dump_kwargs).encode('utf-8')
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return payload
+
+def load_manifest():
+    """Load the fetch manifest (validators, fetch time, hash and status per chapter)"""
+    if not MANIFEST_FILE.exists():
+        return {}
+    
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    """Atomically write the fetch manifest next to the chapter files"""
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    write_json_atomic(MANIFEST_FILE, manifest, indent=2, sort_keys=True)
+
+def conditional_headers(validators):
+    """Build If-None-Match / If-Modified-Since headers from stored validators"""
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def response_meta(response):
+    """Extract the status and cache validators worth keeping from a response"""
+    return {
+        'status': response.status_code,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+def error_meta(error):
+    """Describe a failed request; status is the HTTP code when there was one"""
+    response = getattr(error, 'response', None)
+    return {
+        'status': response.status_code if response is not None else None,
+        'error': str(error),
+    }
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta-seconds or HTTP date), or None if absent"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given (0-based) retry attempt"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
 
-def fetch_index(tractate_name):
-    """Fetch the index/structure of a tractate to know how many chapters it has"""
-    url = f"https://www.sefaria.org.il/api/v2/index/{tractate_name}"
+def get_with_retry(url, limiter=None, max_retries=DEFAULT_MAX_RETRIES, **kwargs):
+    """GET a URL, retrying 429/5xx responses and network errors
+    
+    Retry-After is honoured when the server sends it (and pauses the shared
+    limiter so other workers back off too); otherwise the delay is exponential
+    backoff with jitter. Returns (response, attempts) - the last response is
+    returned even if it is still an error so the caller can raise_for_status().
+    Network errors on the final attempt propagate.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        
+        try:
+            with stage('fetch', url.rsplit('/', 1)[-1]):
+                response = get_session().get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            tally('network_errors')
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        
+        tally(f'http_{response.status_code}')
+        if attempt:
+            tally('retries')
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response, attempt + 1
+        
+        delay = retry_after_seconds(response)
+        if delay is not None:
+            if limiter:
+                limiter.pause(delay)
+        else:
+            delay = backoff_delay(attempt)
+        time.sleep(delay)
+
+def fetch_index(tractate_name, limiter=None, validators=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch the index/structure of a tractate to know how many chapters it has
+    
+    Returns (num_chapters, meta). On 304 Not Modified the chapter count stored
+    alongside the validators is reused.
+    """
+    url = f"{INDEX_URL}/{tractate_name}"
+    attempts = 0
     
     try:
-        response = requests.get(url, timeout=10)
+        response, attempts = get_with_retry(url, limiter, max_retries,
+                                            headers=conditional_headers(validators), timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return validators.get('chapters'), response_meta(response)
+        
         response.raise_for_status()
-        data = response.json()
+        with stage('parse'):
+            data = response.json()
+        meta = response_meta(response)
         
         # Get the number of chapters from the schema
         if 'schema' in data:
             schema = data['schema']
             if 'lengths' in schema and len(schema['lengths']) > 0:
-                return schema['lengths'][0]  # Number of chapters
+                return schema['lengths'][0], meta  # Number of chapters
         
-        return None
+        return None, dict(meta, error="index has no chapter lengths", attempts=attempts)
     except Exception as e:
         print(f"Error fetching index for {tractate_name}: {e}")
-        return None
+        return None, dict(error_meta(e), attempts=attempts or max_retries + 1)
 
-def fetch_chapter(tractate_name, chapter_num):
-    """Fetch a specific chapter of a tractate"""
+def fetch_chapter(tractate_name, chapter_num, limiter=None, validators=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch a specific chapter of a tractate
+    
+    Returns (chapter_data, meta). chapter_data is None when the request failed
+    or when the server answered 304 Not Modified (meta['status'] == 304).
+    """
     url = f"{BASE_URL}/{tractate_name}.{chapter_num}"
-    params = {
-        "version": "hebrew|Torat Emet 357",
-        "fill_in_missing_segments": 1,
-        "return_format": "wrap_all_entities"
-    }
+    attempts = 0
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response, attempts = get_with_retry(url, limiter, max_retries, params=TEXT_PARAMS,
+                                            headers=conditional_headers(validators), timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return None, response_meta(response)
+        
         response.raise_for_status()
-        return response.json()
+        with stage('parse'):
+            chapter_data = response.json()
+        return chapter_data, response_meta(response)
     except Exception as e:
         print(f"Error fetching {tractate_name}.{chapter_num}: {e}")
-        return None
+        return None, dict(error_meta(e), attempts=attempts or max_retries + 1)
+
+def fetch_book(tractate_name, limiter=None, validators=None, max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch a whole tractate with one request (text is a list of chapters)
+    
+    Returns (book_data, meta) like fetch_chapter.
+    """
+    url = f"{BASE_URL}/{tractate_name}"
+    attempts = 0
+    
+    try:
+        response, attempts = get_with_retry(url, limiter, max_retries, params=TEXT_PARAMS,
+                                            headers=conditional_headers(validators), timeout=BOOK_TIMEOUT)
+        if response.status_code == 304:
+            return None, response_meta(response)
+        
+        response.raise_for_status()
+        with stage('parse'):
+            book_data = response.json()
+        return book_data, response_meta(response)
+    except Exception as e:
+        print(f"Error fetching {tractate_name}: {e}")
+        return None, dict(error_meta(e), attempts=attempts or max_retries + 1)
+
+def hebrew_numeral(num):
+    """Sefaria-style Hebrew numeral with geresh/gershayim (1 -> א׳, 15 -> ט״ו, 30 -> ל׳)"""
+    letters = ""
+    for value, letter in ((400, 'ת'), (300, 'ש'), (200, 'ר'), (100, 'ק')):
+        while num >= value:
+            letters += letter
+            num -= value
+    
+    # 15 and 16 are written ט״ו / ט״ז rather than spelling a divine name
+    if num in (15, 16):
+        letters += 'ט' + 'וז'[num - 15]
+    else:
+        if num >= 10:
+            letters += 'יכלמנסעפצ'[num // 10 - 1]
+        if num % 10:
+            letters += 'אבגדהוזחט'[num % 10 - 1]
+    
+    if len(letters) == 1:
+        return letters + '׳'
+    return letters[:-1] + '״' + letters[-1]
+
+def split_book(book_data):
+    """Split a whole-tractate response into per-chapter responses
+    
+    Each chapter gets the book's fields, its own slice of every version's text
+    and sources, and the per-section fields Sefaria sends for a chapter request.
+    Returns (chapters by number, None), or (None, reason) when the response is
+    not a complete book.
+    """
+    versions = book_data.get('versions') or []
+    lengths = book_data.get('lengths') or []
+    if not versions or not lengths:
+        return None, "book response has no versions or lengths"
+    
+    chapter_count = lengths[0]
+    for version in versions:
+        text = version.get('text')
+        if not isinstance(text, list) or len(text) != chapter_count:
+            return None, f"{version.get('versionTitle')} has {len(text or [])} of {chapter_count} chapters"
+        if not all(isinstance(chapter, list) and chapter for chapter in text):
+            return None, f"{version.get('versionTitle')} has empty or malformed chapters"
+    
+    book = book_data['book']
+    he_title = book_data['heTitle']
+    chapters = {}
+    for chapter_num in range(1, chapter_count + 1):
+        ref = f"{book} {chapter_num}"
+        he_ref = f"{he_title} {hebrew_numeral(chapter_num)}"
+        section = {
+            'ref': ref,
+            'heRef': he_ref,
+            'sections': [str(chapter_num)],
+            'toSections': [str(chapter_num)],
+            'sectionRef': ref,
+            'heSectionRef': he_ref,
+            'firstAvailableSectionRef': ref,
+            'isSpanning': False,
+            'next': f"{book} {chapter_num + 1}" if chapter_num < chapter_count else None,
+            'prev': f"{book} {chapter_num - 1}" if chapter_num > 1 else None,
+            'title': ref,
+        }
+        
+        chapter_versions = []
+        for version in versions:
+            chapter_version = dict(version, text=version['text'][chapter_num - 1])
+            if isinstance(version.get('sources'), list) and len(version['sources']) == chapter_count:
+                chapter_version['sources'] = version['sources'][chapter_num - 1]
+            chapter_versions.append(chapter_version)
+        
+        # Same key order as a chapter response, so the saved files look the same
+        chapter = {}
+        for key, value in book_data.items():
+            if key == 'versions':
+                chapter[key] = chapter_versions
+            elif key in SECTION_FIELDS:
+                chapter[key] = section[key]
+            else:
+                chapter[key] = value
+        for key in SECTION_FIELDS:
+            chapter.setdefault(key, section[key])
+        chapters[chapter_num] = chapter
+    
+    return chapters, None
+
+def chapter_path(tractate_name, chapter_num):
+    """Path of a chapter file in the mishnayot_texts tree"""
+    return OUTPUT_DIR / tractate_name / f"chapter_{chapter_num}.json"
+
+def save_chapter(tractate_name, chapter_num, chapter_data):
+    """Atomically save one chapter and return the SHA-256 of the written file"""
+    chapter_file = chapter_path(tractate_name, chapter_num)
+    chapter_file.parent.mkdir(parents=True, exist_ok=True)
+    with stage('write'):
+        payload = write_json_atomic(chapter_file, chapter_data, indent=2)
+    tally('bytes_written', len(payload))
+    return hashlib.sha256(payload).hexdigest()
 
 def save_tractate_data(tractate_name, chapters_data):
     """Save all chapters of a tractate to a JSON file"""
-    tractate_dir = OUTPUT_DIR / tractate_name
-    tractate_dir.mkdir(parents=True, exist_ok=True)
-    
     # Save each chapter
     for chapter_num, chapter_data in chapters_data.items():
         if chapter_data:
-            chapter_file = tractate_dir / f"chapter_{chapter_num}.json"
-            with open(chapter_file, 'w', encoding='utf-8') as f:
-                json.dump(chapter_data, f, ensure_ascii=False, indent=2)
+            save_chapter(tractate_name, chapter_num, chapter_data)
     
     print(f"✅ Saved {tractate_name} ({len(chapters_data)} chapters)")
 
-def main():
-    """Main function to fetch all Mishnayot"""
+def is_ok_status(status):
+    """Whether a recorded HTTP status means the chapter on disk is current"""
+    return status in (200, 304)
+
+def record_chapter(manifest, tractate, chapter_num, meta, sha256=None):
+    """Update a chapter's manifest entry after a fetch attempt"""
+    chapters_manifest = manifest.setdefault(tractate, {}).setdefault('chapters', {})
+    entry = chapters_manifest.setdefault(str(chapter_num), {})
+    entry['status'] = meta['status']
+    entry['fetched_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    
+    if sha256:
+        # Fresh download - replace validators and hash
+        entry.update(etag=meta['etag'], last_modified=meta['last_modified'], sha256=sha256)
+        entry.pop('error', None)
+    elif meta.get('error'):
+        entry['error'] = meta['error']
+    else:
+        entry.pop('error', None)
+
+def chapter_validators(manifest, tractate, chapter_num):
+    """Stored validators for a chapter, but only if its file is still on disk"""
+    if not chapter_path(tractate, chapter_num).exists():
+        return None
+    return manifest.get(tractate, {}).get('chapters', {}).get(str(chapter_num))
+
+def needs_fetch(manifest, tractate, chapter_num):
+    """In resume mode, a chapter is fetched only if its file is absent or its last fetch failed"""
+    if not chapter_path(tractate, chapter_num).exists():
+        return True
+    entry = manifest.get(tractate, {}).get('chapters', {}).get(str(chapter_num))
+    return entry is not None and not is_ok_status(entry.get('status'))
+
+def failure_entry(tractate, chapter_num, meta):
+    """One row of the machine-readable failure report (chapter_num is None for an index)"""
+    return {
+        'tractate': tractate,
+        'chapter': chapter_num,
+        'status': meta.get('status'),
+        'error': meta.get('error'),
+        'attempts': meta.get('attempts'),
+    }
+
+def write_failure_report(failures):
+    """Write fetch_failures.json so CI and follow-up runs can see exactly what is missing"""
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'failed': len(failures),
+        'failures': failures,
+    }
     OUTPUT_DIR.mkdir(exist_ok=True)
+    write_json_atomic(FAILURE_REPORT_FILE, report, indent=2)
+
+def fetch_all_concurrent(tractates, concurrency, rate, manifest, conditional=True, resume=False,
+                         max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch tractates with a worker pool, saving each chapter as soon as it arrives
     
-    print("🚀 Starting Mishnayot fetch from Sefaria API")
-    print(f"📁 Output directory: {OUTPUT_DIR.absolute()}")
-    print(f"📚 Total tractates to fetch: {len(MISHNAH_TRACTATES)}\n")
+    When conditional is set, stored ETag/Last-Modified validators are sent so
+    chapters that have not changed upstream come back as 304 and are skipped.
+    When resume is set, only chapters that are missing on disk or whose last
+    fetch failed are requested, and known chapter counts are taken from the
+    manifest instead of re-fetching the index.
     
+    Returns (total_chapters, failures) where failures lists every index or
+    chapter that still failed after all retries.
+    """
+    limiter = TokenBucket(rate)
     total_chapters = 0
+    unchanged_chapters = 0
+    failures = []
     
-    for idx, tractate in enumerate(MISHNAH_TRACTATES, 1):
-        print(f"\n[{idx}/{len(MISHNAH_TRACTATES)}] Fetching {tractate}...")
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # 1. Resolve chapter counts for every tractate
+        chapter_counts = {}
+        index_futures = {}
+        for tractate in tractates:
+            index_entry = manifest.get(tractate, {}).get('index', {})
+            if resume and index_entry.get('chapters'):
+                chapter_counts[tractate] = index_entry['chapters']
+                continue
+            validators = index_entry if conditional else None
+            future = executor.submit(fetch_index, tractate, limiter, validators, max_retries)
+            index_futures[future] = tractate
+        
+        for future in as_completed(index_futures):
+            tractate = index_futures[future]
+            num_chapters, meta = future.result()
+            if not num_chapters:
+                print(f"⚠️  Could not determine chapter count for {tractate}, skipping...")
+                failures.append(failure_entry(tractate, None, meta))
+                continue
+            chapter_counts[tractate] = num_chapters
+            if meta['status'] == 200:
+                manifest.setdefault(tractate, {})['index'] = {
+                    'etag': meta['etag'],
+                    'last_modified': meta['last_modified'],
+                    'chapters': num_chapters,
+                }
+        
+        # 2. Fetch chapters; tractates are submitted in order so they tend to finish in order
+        chapter_futures = {}
+        for tractate in tractates:
+            for chapter_num in range(1, chapter_counts.get(tractate, 0) + 1):
+                if resume and not needs_fetch(manifest, tractate, chapter_num):
+                    continue
+                validators = chapter_validators(manifest, tractate, chapter_num) if conditional else None
+                future = executor.submit(fetch_chapter, tractate, chapter_num, limiter, validators, max_retries)
+                chapter_futures[future] = (tractate, chapter_num)
+        
+        print(f"📖 {len(chapter_futures)} of {sum(chapter_counts.values())} chapters to fetch "
+              f"in {len(chapter_counts)} tractates\n")
+        
+        pending = {}
+        for tractate, _ in chapter_futures.values():
+            pending[tractate] = pending.get(tractate, 0) + 1
+        saved = {tractate: 0 for tractate in pending}
+        
+        try:
+            for future in as_completed(chapter_futures):
+                tractate, chapter_num = chapter_futures[future]
+                chapter_data, meta = future.result()
+                if chapter_data:
+                    sha256 = save_chapter(tractate, chapter_num, chapter_data)
+                    record_chapter(manifest, tractate, chapter_num, meta, sha256)
+                    saved[tractate] += 1
+                    total_chapters += 1
+                else:
+                    record_chapter(manifest, tractate, chapter_num, meta)
+                    if meta['status'] == 304:
+                        unchanged_chapters += 1
+                    else:
+                        failures.append(failure_entry(tractate, chapter_num, meta))
+                
+                pending[tractate] -= 1
+                if pending[tractate] == 0:
+                    # Checkpoint the manifest once per finished tractate
+                    save_manifest(manifest)
+                    if saved[tractate]:
+                        print(f"✅ Saved {tractate} ({saved[tractate]} chapters)")
+        finally:
+            # Persist progress even if interrupted, so --resume can pick up from here
+            save_manifest(manifest)
+    
+    if unchanged_chapters:
+        print(f"♻️  {unchanged_chapters} chapters unchanged upstream (304 Not Modified)")
+    
+    return total_chapters, failures
+
+def fetch_all_bulk(tractates, concurrency, rate, manifest, conditional=True, resume=False,
+                   max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch each tractate with one whole-book request and split it into chapter files
+    
+    Tractates whose book request fails, or whose response is incomplete, are
+    fetched chapter by chapter with fetch_all_concurrent instead, and are
+    remembered in the manifest so later runs go straight to per-chapter
+    requests for them. Returns (total_chapters, failures) like
+    fetch_all_concurrent.
+    """
+    limiter = TokenBucket(rate)
+    total_chapters = 0
+    unchanged_chapters = 0
+    fallback = []
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        book_futures = {}
+        for tractate in tractates:
+            entry = manifest.get(tractate, {})
+            if entry.get('bulk') == 'fallback':
+                fallback.append(tractate)
+                continue
+            chapter_count = entry.get('index', {}).get('chapters')
+            if resume and chapter_count and not any(needs_fetch(manifest, tractate, chapter_num)
+                                                    for chapter_num in range(1, chapter_count + 1)):
+                continue
+            # A 304 only helps if every chapter file is still on disk
+            on_disk = chapter_count and all(chapter_path(tractate, chapter_num).exists()
+                                            for chapter_num in range(1, chapter_count + 1))
+            validators = entry.get('book') if conditional and on_disk else None
+            book_futures[executor.submit(fetch_book, tractate, limiter, validators, max_retries)] = tractate
+        
+        print(f"📚 {len(book_futures)} whole-tractate requests\n")
+        
+        try:
+            for future in as_completed(book_futures):
+                tractate = book_futures[future]
+                book_data, meta = future.result()
+                entry = manifest.setdefault(tractate, {})
+                
+                if meta['status'] == 304:
+                    unchanged_chapters += entry.get('index', {}).get('chapters', 0)
+                    continue
+                
+                chapters, problem = split_book(book_data) if book_data else (None, meta.get('error'))
+                if chapters is None:
+                    print(f"↩️  {tractate}: {problem} - fetching chapter by chapter")
+                    if book_data:
+                        entry['bulk'] = 'fallback'
+                    fallback.append(tractate)
+                    continue
+                
+                for chapter_num, chapter_data in chapters.items():
+                    sha256 = save_chapter(tractate, chapter_num, chapter_data)
+                    # The book's validators don't apply to chapter URLs, so none are kept per chapter
+                    record_chapter(manifest, tractate, chapter_num, dict(meta, etag=None, last_modified=None), sha256)
+                entry['index'] = {'etag': None, 'last_modified': None, 'chapters': len(chapters)}
+                entry['book'] = {'etag': meta['etag'], 'last_modified': meta['last_modified']}
+                total_chapters += len(chapters)
+                save_manifest(manifest)
+                print(f"✅ Saved {tractate} ({len(chapters)} chapters, 1 request)")
+        finally:
+            save_manifest(manifest)
+    
+    if unchanged_chapters:
+        print(f"♻️  {unchanged_chapters} chapters unchanged upstream (304 Not Modified)")
+    
+    failures = []
+    if fallback:
+        print(f"\n📖 Per-chapter fallback for {len(fallback)} tractates")
+        fallback_chapters, failures = fetch_all_concurrent(fallback, concurrency, rate, manifest, conditional,
+                                                           resume, max_retries)
+        total_chapters += fallback_chapters
+    
+    return total_chapters, failures
+
+def fetch_all_serial(tractates, max_retries=DEFAULT_MAX_RETRIES):
+    """Fetch tractates one chapter at a time with fixed pauses (original behaviour)"""
+    total_chapters = 0
+    failures = []
+    
+    for idx, tractate in enumerate(tractates, 1):
+        print(f"\n[{idx}/{len(tractates)}] Fetching {tractate}...")
         
         # Get the number of chapters in this tractate
-        num_chapters = fetch_index(tractate)
+        num_chapters, meta = fetch_index(tractate, max_retries=max_retries)
         if not num_chapters:
             print(f"⚠️  Could not determine chapter count for {tractate}, skipping...")
+            failures.append(failure_entry(tractate, None, meta))
             continue
         
         print(f"  📖 Found {num_chapters} chapters")
@@ -172,10 +749,12 @@ def main():
         chapters_data = {}
         for chapter_num in range(1, num_chapters + 1):
             print(f"  ⏳ Fetching chapter {chapter_num}/{num_chapters}...", end='\r')
-            chapter_data = fetch_chapter(tractate, chapter_num)
+            chapter_data, meta = fetch_chapter(tractate, chapter_num, max_retries=max_retries)
             if chapter_data:
                 chapters_data[chapter_num] = chapter_data
                 total_chapters += 1
+            else:
+                failures.append(failure_entry(tractate, chapter_num, meta))
             
             # Be respectful - don't overwhelm the server
             time.sleep(0.5)
@@ -188,11 +767,100 @@ def main():
         # Pause between tractates
         time.sleep(1)
     
-    print(f"\n\n🎉 Done! Fetched {total_chapters} chapters from {len(MISHNAH_TRACTATES)} tractates")
+    return total_chapters, failures
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Fetch all Mishnayot texts from Sefaria API")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"number of parallel fetch workers (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"max requests per second across all workers (default: {DEFAULT_RATE})")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"retries per request for 429/5xx and network errors (default: {DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--bulk", action="store_true",
+                        help="fetch each tractate with one whole-book request, falling back to "
+                             "per-chapter requests when that fails")
+    parser.add_argument("--serial", action="store_true",
+                        help="use the original one-at-a-time fetch loop with fixed pauses")
+    parser.add_argument("--no-conditional", action="store_true",
+                        help="ignore stored ETag/Last-Modified validators and download everything")
+    parser.add_argument("--resume", "--only-missing", dest="resume", action="store_true",
+                        help="only fetch chapters that are missing on disk or failed last time")
+    parser.add_argument("--tractates", nargs="+", metavar="NAME",
+                        help="only fetch these tractates (e.g. Mishnah_Berakhot)")
+    parser.add_argument("--base-url", metavar="URL", default=os.environ.get("SEFARIA_BASE_URL"),
+                        help=f"API server to fetch from, e.g. http://127.0.0.1:8765 for mishnah_sefaria_stub.py "
+                             f"(default: $SEFARIA_BASE_URL or {DEFAULT_SITE_URL})")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help=f"seconds before an index or chapter request times out (default: {REQUEST_TIMEOUT:g})")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time requests, JSON decoding and writes and save {RUN_REPORT_FILE}")
+    parser.add_argument("--profile-code", choices=CODE_PROFILERS,
+                        help="also dump a cProfile or sampled-stack profile next to the report (implies --profile)")
+    return parser.parse_args()
+
+def main():
+    """Main function to fetch all Mishnayot"""
+    args = parse_args()
+    tractates = args.tractates or MISHNAH_TRACTATES
+    configure_api(args.base_url, args.timeout)
+    
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    
+    print("🚀 Starting Mishnayot fetch from Sefaria API")
+    if args.base_url:
+        print(f"🧪 API server: {args.base_url}")
+    print(f"📁 Output directory: {OUTPUT_DIR.absolute()}")
+    print(f"📚 Total tractates to fetch: {len(tractates)}")
+    
+    if args.profile or args.profile_code:
+        enable_profiling()
+    
+    start = time.monotonic()
+    
+    with code_profiler(args.profile_code, RUN_REPORT_FILE.with_name("fetch_run_profile")):
+        if args.serial:
+            total_chapters, failures = fetch_all_serial(tractates, args.max_retries)
+        elif args.bulk:
+            print(f"📚 Bulk mode: {args.concurrency} workers, {args.rate} requests/sec\n")
+            manifest = load_manifest()
+            total_chapters, failures = fetch_all_bulk(tractates, args.concurrency, args.rate, manifest,
+                                                      conditional=not args.no_conditional, resume=args.resume,
+                                                      max_retries=args.max_retries)
+        else:
+            print(f"⚡ Concurrent mode: {args.concurrency} workers, {args.rate} requests/sec\n")
+            manifest = load_manifest()
+            total_chapters, failures = fetch_all_concurrent(tractates, args.concurrency, args.rate, manifest,
+                                                            conditional=not args.no_conditional, resume=args.resume,
+                                                            max_retries=args.max_retries)
+    
+    elapsed = time.monotonic() - start
+    write_failure_report(failures)
+    
+    if profiling_enabled():
+        report = write_run_report(RUN_REPORT_FILE, "fetch_mishnayot.py", elapsed, {
+            'mode': 'serial' if args.serial else 'bulk' if args.bulk else 'concurrent',
+            'concurrency': args.concurrency,
+            'rate': args.rate,
+            'base_url': args.base_url or DEFAULT_SITE_URL,
+            'chapters_saved': total_chapters,
+            'failures': len(failures),
+        }, FETCH_STAGES)
+        print_run_report(report)
+        print(f"📝 Run report: {RUN_REPORT_FILE}")
+    
+    print(f"\n\n🎉 Done! Fetched {total_chapters} chapters from {len(tractates)} tractates in {elapsed:.1f}s")
     print(f"📁 All data saved to: {OUTPUT_DIR.absolute()}")
+    print("📦 Rebuild the compact corpus for the renderers with: python3 scripts/mishnah_corpus.py")
     print("\n⚠️  IMPORTANT: Remember to attribute Sefaria in your app!")
     print("    Sefaria data is licensed under CC BY-NC 4.0")
     print("    See: https://www.sefaria.org/licensing")
+    
+    if failures:
+        print(f"\n❌ {len(failures)} requests still failed after retries - see {FAILURE_REPORT_FILE}")
+        print("   Rerun with --resume to fetch only the missing chapters")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -3,25 +3,100 @@
 Generate all Mishnah images in 2 versions:
 1. By chapters (525 images) - Full chapter with multiple mishnayot
 2. By individual mishnayot (~4,192 images) - One mishnah per image
+
+Builds are incremental: images whose text and render configuration are
+unchanged since the last run are skipped (see mishnah_build_cache.py).
+Use --force to redraw everything.
+
+Each canvas is sized to its text, so nothing is cut off. --max-page-height
+splits very long chapters into pages (N.png, N_2.png, ...) and
+--fixed-height restores the old fixed 800x2400 page.
+
+--bundle tar|zip|pack streams the images into a few sharded bundles with an
+offset index (see mishnah_bundles.py) instead of thousands of loose files.
+
+Rendering is split in two: layout (wrapping, measuring and positioning
+every line) produces a display list, cached in mishnah_layout_cache/ by text
+and layout configuration, which is then replayed into pixels (see
+mishnah_display_list.py). Changing --format or --scale re-encodes without
+measuring any text again.
+
+--profile times every stage (parse, extract, strip, wrap, layout, draw,
+encode, write) and writes mishnah_run_report.json (see mishnah_profiling.py).
 """
 
-import json
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
-import re
+import PIL
+
+import mishnah_display_list
+import mishnah_encoders
+import mishnah_layout
+from mishnah_bundles import BUNDLE_DIR, BUNDLE_FORMATS, DEFAULT_SHARD_SIZE, BundleSet
+from mishnah_build_cache import (BUILD_CACHE_FILE, CHANGED_LIST_FILE, BuildCache, code_digest, config_fingerprint, file_digest,
+                                 output_digest, write_changed_list)
+from mishnah_encoders import ENCODE_THREADS, ENCODERS, ImageWriter, available_modes, cached_palette, encoder_report, extension, wait_written
+from mishnah_display_list import DisplayListCache, display_list, draw_display_page
+from mishnah_corpus import CORPUS_FILE, MISHNAYOT_DIR, TRACTATE_HEBREW, hebrew_title, iter_chapters
+from mishnah_fonts import configure_font, describe_font_setup, get_font, has_rtl_layout, resolve_font_path
+from mishnah_layout import line_width, wrap_hebrew_text
+from mishnah_profiling import (CODE_PROFILERS, code_profiler, drain_profile, enable_profiling, merge_profile,
+                               print_run_report, profiling_enabled, stage, tally, write_run_report)
 
 # Directories
-MISHNAYOT_DIR = Path("mishnayot_texts")
 OUTPUT_DIR_CHAPTERS = Path("mishnah_images_chapters")
 OUTPUT_DIR_SINGLE = Path("mishnah_images_single")
+RUN_REPORT_FILE = Path("mishnah_run_report.json")
+PIPELINE_STAGES = ("parse", "extract", "strip", "wrap", "layout", "draw", "encode", "write", "chapter")
 
 # Image settings
 IMAGE_WIDTH = 800
-IMAGE_HEIGHT = 2400  # Increased to fit full chapter text
+IMAGE_HEIGHT = 2400  # Fixed page height when FIT_TO_CONTENT is off
 BACKGROUND_COLOR = (255, 250, 245)  # Warm off-white
 TEXT_COLOR = (40, 40, 40)  # Dark gray
 HEADER_COLOR = (4, 71, 142)  # Brand blue #04478E
 BORDER_COLOR = (4, 71, 142)
+FOOTER_COLOR = (150, 150, 150)
+
+# Output encoding (see mishnah_encoders.py): png, or opt in to png8, webp or avif with --format
+OUTPUT_FORMAT = "png"
+
+# Stream pages into sharded bundles (tar, zip or pack - see mishnah_bundles.py) instead of loose files
+BUNDLE_FORMAT = None
+
+# Pixels per layout pixel (2 draws every page at twice the resolution from the same display list)
+RENDER_SCALE = 1
+
+# Keep display lists in mishnah_layout_cache/ (False lays every image out again)
+LAYOUT_CACHE = True
+
+# Per-process encode/write stage, created on first use
+_writer = None
+
+# Per-process layout cache, and the fingerprint its keys are built from (computed on first use)
+_layout_cache = DisplayListCache("images")
+_layout_fingerprint = None
+
+# Layout: canvases sized to their content; False keeps the fixed IMAGE_HEIGHT page (long text is cut off)
+FIT_TO_CONTENT = True
+MAX_PAGE_HEIGHT = 0  # split taller content-sized images into pages of at most this height (0 = never)
+
+# Vertical rhythm
+HEADER_TOP = 60
+PADDING_X = 60
+LINE_HEIGHT = 40
+MISHNAH_GAP = 20
+FOOTER_SPACE = 100  # text never starts lower than this above the bottom edge
+
+# Page chrome item tuples kept per process (one per distinct page height, a few hundred bytes each)
+CHROME_CACHE_SIZE = 1024
+
+# Line breaking: exact textbbox checks near the margin (False is ~4x faster, breaks may shift)
+WRAP_VERIFY = True
 
 # Font settings
 TITLE_FONT_SIZE = 48
@@ -29,95 +104,6 @@ CHAPTER_FONT_SIZE = 36
 TEXT_FONT_SIZE = 32
 MISHNAH_NUMBER_FONT_SIZE = 28
 
-# Hebrew tractate names mapping
-TRACTATE_HEBREW = {
-    "Mishnah_Berakhot": "ברכות",
-    "Mishnah_Peah": "פאה",
-    "Mishnah_Demai": "דמאי",
-    "Mishnah_Kilayim": "כלאים",
-    "Mishnah_Sheviit": "שביעית",
-    "Mishnah_Terumot": "תרומות",
-    "Mishnah_Maasrot": "מעשרות",
-    "Mishnah_Maaser_Sheni": "מעשר שני",
-    "Mishnah_Challah": "חלה",
-    "Mishnah_Orlah": "ערלה",
-    "Mishnah_Bikkurim": "ביכורים",
-    "Mishnah_Shabbat": "שבת",
-    "Mishnah_Eruvin": "עירובין",
-    "Mishnah_Pesachim": "פסחים",
-    "Mishnah_Shekalim": "שקלים",
-    "Mishnah_Yoma": "יומא",
-    "Mishnah_Sukkah": "סוכה",
-    "Mishnah_Beitzah": "ביצה",
-    "Mishnah_Rosh_Hashanah": "ראש השנה",
-    "Mishnah_Taanit": "תענית",
-    "Mishnah_Megillah": "מגילה",
-    "Mishnah_Moed_Katan": "מועד קטן",
-    "Mishnah_Chagigah": "חגיגה",
-    "Mishnah_Yevamot": "יבמות",
-    "Mishnah_Ketubot": "כתובות",
-    "Mishnah_Nedarim": "נדרים",
-    "Mishnah_Nazir": "נזיר",
-    "Mishnah_Sotah": "סוטה",
-    "Mishnah_Gittin": "גיטין",
-    "Mishnah_Kiddushin": "קידושין",
-    "Mishnah_Bava_Kamma": "בבא קמא",
-    "Mishnah_Bava_Metzia": "בבא מציעא",
-    "Mishnah_Bava_Batra": "בבא בתרא",
-    "Mishnah_Sanhedrin": "סנהדרין",
-    "Mishnah_Makkot": "מכות",
-    "Mishnah_Shevuot": "שבועות",
-    "Mishnah_Eduyot": "עדיות",
-    "Mishnah_Avodah_Zarah": "עבודה זרה",
-    "Mishnah_Avot": "אבות",
-    "Mishnah_Horayot": "הוריות",
-    "Mishnah_Zevachim": "זבחים",
-    "Mishnah_Menachot": "מנחות",
-    "Mishnah_Chullin": "חולין",
-    "Mishnah_Bekhorot": "בכורות",
-    "Mishnah_Arakhin": "ערכין",
-    "Mishnah_Temurah": "תמורה",
-    "Mishnah_Keritot": "כריתות",
-    "Mishnah_Meilah": "מעילה",
-    "Mishnah_Tamid": "תמיד",
-    "Mishnah_Middot": "מידות",
-    "Mishnah_Kinnim": "קינים",
-    "Mishnah_Kelim": "כלים",
-    "Mishnah_Oholot": "אהלות",
-    "Mishnah_Negaim": "נגעים",
-    "Mishnah_Parah": "פרה",
-    "Mishnah_Tahorot": "טהרות",
-    "Mishnah_Mikvaot": "מקואות",
-    "Mishnah_Niddah": "נדה",
-    "Mishnah_Makhshirin": "מכשירין",
-    "Mishnah_Zavim": "זבים",
-    "Mishnah_Tevul_Yom": "טבול יום",
-    "Mishnah_Yadayim": "ידיים",
-    "Mishnah_Oktzin": "עוקצין",
-}
-
-def get_font(size):
-    """Try to get Hebrew font, fallback to system fonts"""
-    font_options = [
-        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-        "/System/Library/Fonts/Supplemental/Arial.ttf",
-        "/Library/Fonts/Arial Unicode.ttf",
-    ]
-    
-    for font_path in font_options:
-        try:
-            return ImageFont.truetype(font_path, size)
-        except:
-            continue
-    
-    return ImageFont.load_default()
-
-def strip_html_tags(text):
-    """Remove HTML tags and entities from text"""
-    text = re.sub(r'<[^>]+>', '', text)
-    text = ' '.join(text.split())
-    return text.strip()
-
 def number_to_hebrew_gematria(num):
     """Convert number to Hebrew gematria letter"""
     hebrew_letters = [
@@ -141,278 +127,576 @@ def number_to_hebrew_gematria(num):
     else:
         return hebrew_letters[(num - 1) % 22]
 
-def wrap_hebrew_text(text, font, max_width):
-    """Wrap Hebrew text to fit within max_width"""
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        width = bbox[2] - bbox[0]
-        
-        if width <= max_width:
-            current_line.append(word)
-        else:
-            if current_line:
-                lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
-
-def extract_text_from_chapter(chapter_data):
-    """Extract Hebrew text from chapter JSON"""
-    try:
-        if 'versions' in chapter_data:
-            for version in chapter_data['versions']:
-                if version.get('language') == 'he':
-                    return version.get('text', [])
+def configure_render(fit_to_content, max_page_height, output_format, encode_threads=ENCODE_THREADS, bundle_format=None,
+                     profile=False, scale=1, layout_cache=True):
+    """Choose canvas sizing, output encoding, encoder threads, bundling, profiling, scale and layout caching
+    (also used to set up worker processes)"""
+    global FIT_TO_CONTENT, MAX_PAGE_HEIGHT, OUTPUT_FORMAT, ENCODE_THREADS, BUNDLE_FORMAT, RENDER_SCALE, LAYOUT_CACHE
+    global _layout_fingerprint
+    FIT_TO_CONTENT = fit_to_content
+    MAX_PAGE_HEIGHT = max_page_height
+    OUTPUT_FORMAT = output_format
+    ENCODE_THREADS = encode_threads
+    BUNDLE_FORMAT = bundle_format
+    RENDER_SCALE = scale
+    LAYOUT_CACHE = layout_cache
+    _layout_fingerprint = None
+    close_writer()
+    if profile:
+        enable_profiling()
+
+def get_writer():
+    """This process's background encoder/writer for the current output format"""
+    global _writer
+    if _writer is None:
+        _writer = ImageWriter(OUTPUT_FORMAT, output_palette(), threads=ENCODE_THREADS,
+                              to_memory=BUNDLE_FORMAT is not None)
+    return _writer
+
+def close_writer():
+    """Finish pending writes and stop the encoder threads, if any were started"""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.close()
+
+def output_palette():
+    """Fixed palette of background -> ink ramps used by the png8 encoder"""
+    inks = tuple(dict.fromkeys((TEXT_COLOR, HEADER_COLOR, BORDER_COLOR, FOOTER_COLOR)))
+    return cached_palette(BACKGROUND_COLOR, inks)
+
+def output_name(number):
+    """Filename of output image `number` in the current output format"""
+    return f"{number}{extension(OUTPUT_FORMAT)}"
+
+def wrap_rows(text, text_font, max_text_width, advance=LINE_HEIGHT):
+    """Wrap text into (line, advance) rows - advance is the vertical step after the line"""
+    with stage('wrap'):
+        lines = wrap_hebrew_text(text, text_font, max_text_width, verify=WRAP_VERIFY)
+    rows = [(line, LINE_HEIGHT) for line in lines]
+    if rows:
+        rows[-1] = (rows[-1][0], advance)
+    return rows
+
+def fixed_pages(paragraphs, body_top):
+    """Legacy single IMAGE_HEIGHT page - paragraphs starting past the bottom margin are dropped"""
+    rows = []
+    y = body_top
+    for paragraph in paragraphs:
+        if y > IMAGE_HEIGHT - FOOTER_SPACE:
+            break
+        rows += paragraph
+        y += sum(advance for _, advance in paragraph)
+    return [(rows, IMAGE_HEIGHT)]
+
+def fitted_pages(paragraphs, body_top):
+    """Pages sized to their content, split between paragraphs when MAX_PAGE_HEIGHT is set"""
+    limit = MAX_PAGE_HEIGHT - FOOTER_SPACE - body_top if MAX_PAGE_HEIGHT else None
+    pages = []
+    rows = []
+    used = 0
+    
+    for paragraph in paragraphs:
+        height = sum(advance for _, advance in paragraph)
+        # Keep a mishnah on one page unless it is taller than a whole page
+        if limit and rows and used + height > limit and height <= limit:
+            pages.append((rows, body_top + used + FOOTER_SPACE))
+            rows, used = [], 0
         
-        if 'he' in chapter_data:
-            return chapter_data['he']
-            
-        return []
-    except Exception as e:
-        print(f"Error extracting text: {e}")
-        return []
+        for row in paragraph:
+            if limit and rows and used + row[1] > limit:
+                pages.append((rows, body_top + used + FOOTER_SPACE))
+                rows, used = [], 0
+            rows.append(row)
+            used += row[1]
+    
+    pages.append((rows, body_top + used + FOOTER_SPACE))
+    return pages
 
-def create_chapter_image(tractate_name, chapter_num, mishnayot_texts, output_path):
-    """Create image for a full chapter with multiple mishnayot"""
-    
-    img = Image.new('RGB', (IMAGE_WIDTH, IMAGE_HEIGHT), BACKGROUND_COLOR)
-    draw = ImageDraw.Draw(img)
-    
-    title_font = get_font(TITLE_FONT_SIZE)
-    chapter_font = get_font(CHAPTER_FONT_SIZE)
-    text_font = get_font(TEXT_FONT_SIZE)
-    
-    # Draw border
+def layout_pages(paragraphs, body_top):
+    """Pass 1: decide which rows go on which page and how tall each page is"""
+    if FIT_TO_CONTENT:
+        return fitted_pages(paragraphs, body_top)
+    return fixed_pages(paragraphs, body_top)
+
+def ascent(font_size):
+    """Distance from the top of a line of text to its baseline"""
+    return get_font(font_size).getmetrics()[0]
+
+def centred_label(text, font_size, top):
+    """Header label centred horizontally on the page, with its line top at `top`"""
+    x = (IMAGE_WIDTH - line_width(get_font(font_size), text)) // 2
+    return ('label', x, top + ascent(font_size), text, font_size, HEADER_COLOR, None)
+
+@lru_cache(maxsize=CHROME_CACHE_SIZE)
+def page_chrome(height):
+    """Static items of a page of the given height - background, border, separator and footer"""
     border_margin = 20
-    draw.rectangle(
-        [border_margin, border_margin, IMAGE_WIDTH - border_margin, IMAGE_HEIGHT - border_margin],
-        outline=BORDER_COLOR,
-        width=3
-    )
-    
-    y = 60
-    padding_x = 60
+    separator_y = HEADER_TOP + 130
     
-    # Tractate title
-    tractate_he = TRACTATE_HEBREW.get(tractate_name, tractate_name.replace("Mishnah_", ""))
-    title_text = f"מסכת {tractate_he}"
+    footer_text = "מקור: ספריא | Powered by Sefaria.org"
+    footer_x = (IMAGE_WIDTH - line_width(get_font(16), footer_text)) // 2
+    
+    return (
+        ('rect', 0, 0, IMAGE_WIDTH, height, BACKGROUND_COLOR, None, 0),
+        ('rect', border_margin, border_margin, IMAGE_WIDTH - 2 * border_margin + 1, height - 2 * border_margin + 1,
+         None, BORDER_COLOR, 3),
+        ('line', PADDING_X, separator_y, IMAGE_WIDTH - PADDING_X, separator_y, BORDER_COLOR, 2),
+        ('text', footer_x, height - 60 + ascent(16), footer_text, 16, FOOTER_COLOR, None),
+    )
+
+def layout_display_list(title_text, subtitle_text, body_top, paragraphs):
+    """Pass 2: position the header labels and right-aligned text rows of every page (see mishnah_display_list.py)"""
+    text_font = get_font(TEXT_FONT_SIZE)
+    text_ascent = ascent(TEXT_FONT_SIZE)
+    
+    # Tractate title, then chapter (and mishnah) number, repeated on every page
+    header = [centred_label(title_text, TITLE_FONT_SIZE, HEADER_TOP),
+              centred_label(subtitle_text, CHAPTER_FONT_SIZE, HEADER_TOP + 70)]
+    
+    pages = []
+    for rows, height in layout_pages(paragraphs, body_top):
+        items = list(header)
+        y = body_top
+        for line, advance in rows:
+            text_x = IMAGE_WIDTH - PADDING_X - line_width(text_font, line)
+            items.append(('text', text_x, y + text_ascent, line, TEXT_FONT_SIZE, TEXT_COLOR, None))
+            y += advance
+        pages.append(((IMAGE_WIDTH, height), page_chrome(height), items))
+    
+    return display_list('px', pages, f"{title_text} {subtitle_text}")
+
+def page_path(output_path, page_num):
+    """Output path of a page - page 1 keeps the plain name, later pages get a _2, _3... suffix"""
+    if page_num == 1:
+        return output_path
+    return output_path.with_name(f"{output_path.stem}_{page_num}{output_path.suffix}")
+
+def render_display_list(display_list):
+    """Replay a display list as images, one per page, at the configured scale"""
+    images = []
+    for page in display_list['pages']:
+        with stage('draw'):
+            images.append(draw_display_page(page, RENDER_SCALE))
+    return images
+
+def render_pages(title_text, subtitle_text, body_top, paragraphs):
+    """Lay out and draw every page of an image, bypassing the layout cache"""
+    with stage('layout'):
+        laid_out = layout_display_list(title_text, subtitle_text, body_top, paragraphs)
+    return render_display_list(laid_out)
+
+def save_pages(display_list, output_path):
+    """Draw every page of a display list and queue it for encoding, returning the paths it will be written to"""
+    output_path = Path(output_path)
+    
+    written = []
+    for page_num, img in enumerate(render_display_list(display_list), 1):
+        path = page_path(output_path, page_num)
+        get_writer().submit(img, path)
+        written.append(path)
+    tally('pages', len(written))
+    return written
+
+def chapter_page_spec(tractate_name, chapter_num, mishnayot_texts):
+    """Header texts, body offset and wrapped paragraphs of a full chapter image
     
-    title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    title_x = (IMAGE_WIDTH - title_width) // 2
-    draw.text((title_x, y), title_text, fill=HEADER_COLOR, font=title_font)
-    y += 70
+    The texts come from the corpus already normalised (see normalize_mishnah).
+    """
+    text_font = get_font(TEXT_FONT_SIZE)
+    max_text_width = IMAGE_WIDTH - (PADDING_X * 2)
     
-    # Chapter number
-    chapter_hebrew_num = number_to_hebrew_gematria(chapter_num)
-    chapter_text = f"פרק {chapter_hebrew_num}"
-    chapter_bbox = draw.textbbox((0, 0), chapter_text, font=chapter_font)
-    chapter_width = chapter_bbox[2] - chapter_bbox[0]
-    chapter_x = (IMAGE_WIDTH - chapter_width) // 2
-    draw.text((chapter_x, y), chapter_text, fill=HEADER_COLOR, font=chapter_font)
-    y += 60
+    title_text = f"מסכת {hebrew_title(tractate_name)}"
+    chapter_text = f"פרק {number_to_hebrew_gematria(chapter_num)}"
     
-    # Separator line
-    draw.line([(padding_x, y), (IMAGE_WIDTH - padding_x, y)], fill=BORDER_COLOR, width=2)
-    y += 30
+    # One paragraph per mishnah, numbered, with a gap after it
+    paragraphs = []
+    for idx, mishnah_text in enumerate(mishnayot_texts, 1):
+        mishnah_with_number = f"{number_to_hebrew_gematria(idx)}. {mishnah_text}"
+        paragraphs.append(wrap_rows(mishnah_with_number, text_font, max_text_width, LINE_HEIGHT + MISHNAH_GAP))
     
-    # Draw mishnayot
-    max_text_width = IMAGE_WIDTH - (padding_x * 2)
+    return title_text, chapter_text, HEADER_TOP + 160, paragraphs
+
+def single_page_spec(tractate_name, chapter_num, mishnah_num, mishnah_text):
+    """Header texts, body offset and wrapped lines of a single mishnah image"""
+    text_font = get_font(TEXT_FONT_SIZE)
+    max_text_width = IMAGE_WIDTH - (PADDING_X * 2)
     
-    for idx, mishnah_text in enumerate(mishnayot_texts, 1):
-        if y > IMAGE_HEIGHT - 100:
-            break
-        
-        mishnah_text = strip_html_tags(mishnah_text)
-        hebrew_num = number_to_hebrew_gematria(idx)
-        mishnah_with_number = f"{hebrew_num}. {mishnah_text}"
-        
-        lines = wrap_hebrew_text(mishnah_with_number, text_font, max_text_width)
-        
-        for line in lines:  # Show all lines
-            line_bbox = draw.textbbox((0, 0), line, font=text_font)
-            line_width = line_bbox[2] - line_bbox[0]
-            text_x = IMAGE_WIDTH - padding_x - line_width
-            
-            draw.text((text_x, y), line, fill=TEXT_COLOR, font=text_font)
-            y += 40
-        
-        y += 20
+    # e.g., "פרק א משנה ג"
+    title_text = f"מסכת {hebrew_title(tractate_name)}"
+    chapter_text = f"פרק {number_to_hebrew_gematria(chapter_num)} משנה {number_to_hebrew_gematria(mishnah_num)}"
     
-    # Footer
-    y = IMAGE_HEIGHT - 60
-    footer_text = "מקור: ספריא | Powered by Sefaria.org"
-    footer_font = get_font(16)
-    footer_bbox = draw.textbbox((0, 0), footer_text, font=footer_font)
-    footer_width = footer_bbox[2] - footer_bbox[0]
-    footer_x = (IMAGE_WIDTH - footer_width) // 2
-    draw.text((footer_x, y), footer_text, fill=(150, 150, 150), font=footer_font)
+    # No number prefix for single mishnah; every line may start a new page
+    rows = wrap_rows(mishnah_text, text_font, max_text_width)
+    paragraphs = [[row] for row in rows]
     
-    img.save(output_path, 'PNG', quality=95)
+    return title_text, chapter_text, HEADER_TOP + 170, paragraphs
+
+def layout_fingerprint():
+    """Digest of layout_config(), computed once per process (configure_render resets it)"""
+    global _layout_fingerprint
+    if _layout_fingerprint is None:
+        _layout_fingerprint = config_fingerprint(layout_config())
+    return _layout_fingerprint
+
+def cached_layout(spec, *key_parts):
+    """Display list of an image from the layout cache, laid out from spec() on a miss"""
+    fingerprint = layout_fingerprint()
+    key = output_digest(fingerprint, *key_parts)
+    
+    def layout():
+        title_text, subtitle_text, body_top, paragraphs = spec()
+        with stage('layout'):
+            return layout_display_list(title_text, subtitle_text, body_top, paragraphs)
+    
+    if not LAYOUT_CACHE:
+        return layout()
+    return _layout_cache.layout(fingerprint, key, layout)
+
+def chapter_display_list(tractate_name, chapter_num, mishnayot_texts):
+    """Display list of a full chapter image"""
+    return cached_layout(lambda: chapter_page_spec(tractate_name, chapter_num, mishnayot_texts),
+                         'chapter', tractate_name, chapter_num, mishnayot_texts)
+
+def single_display_list(tractate_name, chapter_num, mishnah_num, mishnah_text):
+    """Display list of a single mishnah image"""
+    return cached_layout(lambda: single_page_spec(tractate_name, chapter_num, mishnah_num, mishnah_text),
+                         'single', tractate_name, chapter_num, mishnah_num, mishnah_text)
+
+def create_chapter_image(tractate_name, chapter_num, mishnayot_texts, output_path):
+    """Create image(s) for a full chapter with multiple mishnayot"""
+    return save_pages(chapter_display_list(tractate_name, chapter_num, mishnayot_texts), output_path)
 
 def create_single_mishnah_image(tractate_name, chapter_num, mishnah_num, mishnah_text, output_path):
-    """Create image for a single mishnah"""
+    """Create image(s) for a single mishnah"""
+    return save_pages(single_display_list(tractate_name, chapter_num, mishnah_num, mishnah_text), output_path)
+
+def layout_config():
+    """Everything besides the text that affects a display list - not the output format or scale
+    
+    The code part covers only the functions that build display lists, so editing the
+    CLI, the scheduler or the encoders keeps every cached layout.
+    """
+    font_path = resolve_font_path()
+    return {
+        'image_size': (IMAGE_WIDTH, IMAGE_HEIGHT),
+        'colors': (BACKGROUND_COLOR, TEXT_COLOR, HEADER_COLOR, BORDER_COLOR, FOOTER_COLOR),
+        'font_sizes': (TITLE_FONT_SIZE, CHAPTER_FONT_SIZE, TEXT_FONT_SIZE, MISHNAH_NUMBER_FONT_SIZE),
+        'wrap_verify': WRAP_VERIFY,
+        'layout': (FIT_TO_CONTENT, MAX_PAGE_HEIGHT, HEADER_TOP, PADDING_X, LINE_HEIGHT, MISHNAH_GAP, FOOTER_SPACE),
+        'font': (font_path and os.path.basename(font_path), file_digest(font_path)),
+        'pillow': (PIL.__version__, has_rtl_layout()),
+        'titles': TRACTATE_HEBREW,
+        'layout_code': (code_digest(number_to_hebrew_gematria, hebrew_title, wrap_rows, fixed_pages, fitted_pages,
+                                    layout_pages, ascent, centred_label, page_chrome, layout_display_list,
+                                    chapter_page_spec, single_page_spec),
+                        file_digest(mishnah_layout.__file__)),
+    }
+
+def render_config():
+    """Everything besides the text that affects the pixels of an image"""
+    return dict(layout_config(), **{
+        'output_format': OUTPUT_FORMAT,
+        'scale': RENDER_SCALE,
+        # Editing the drawing code invalidates everything, just like changing a constant
+        'renderer': (file_digest(__file__), file_digest(mishnah_layout.__file__),
+                     file_digest(mishnah_display_list.__file__), file_digest(mishnah_encoders.__file__)),
+    })
+
+def plan_work_units():
+    """Split the corpus into (tractate, chapter) work units with their output numbers
+    
+    Numbers are assigned here, in traditional order, before any rendering starts,
+    so output filenames stay deterministic whichever order the units finish in.
+    Each unit is (tractate_name, chapter_num, mishnayot_texts, chapter_number,
+    first_mishnah_number).
+    """
+    units = []
+    chapter_counter = 0
+    mishnah_counter = 0
     
-    img = Image.new('RGB', (IMAGE_WIDTH, IMAGE_HEIGHT), BACKGROUND_COLOR)
-    draw = ImageDraw.Draw(img)
+    for tractate_name, chapter_num, mishnayot_texts in iter_chapters(CORPUS_FILE, MISHNAYOT_DIR):
+        if not mishnayot_texts:
+            continue
+        
+        chapter_counter += 1
+        units.append((tractate_name, chapter_num, mishnayot_texts, chapter_counter, mishnah_counter + 1))
+        mishnah_counter += len(mishnayot_texts)
     
-    title_font = get_font(TITLE_FONT_SIZE)
-    chapter_font = get_font(CHAPTER_FONT_SIZE)
-    text_font = get_font(TEXT_FONT_SIZE)
+    return units
+
+def unit_outputs(unit, fingerprint):
+    """(index, output path, digest) for every image of a unit - index 0 is the chapter image"""
+    tractate_name, chapter_num, mishnayot_texts, chapter_number, first_mishnah_number = unit
+    
+    outputs = [(0, OUTPUT_DIR_CHAPTERS / output_name(chapter_number),
+                output_digest(fingerprint, 'chapter', tractate_name, chapter_num, mishnayot_texts))]
+    for mishnah_idx, mishnah_text in enumerate(mishnayot_texts, 1):
+        outputs.append((mishnah_idx, OUTPUT_DIR_SINGLE / output_name(first_mishnah_number + mishnah_idx - 1),
+                        output_digest(fingerprint, 'single', tractate_name, chapter_num, mishnah_idx, mishnah_text)))
+    return outputs
+
+def plan_builds(units, cache, fingerprint):
+    """Pair each unit with the outputs that are missing or stale, dropping units that are up to date"""
+    builds = []
+    for unit in units:
+        stale = [output for output in unit_outputs(unit, fingerprint) if not cache.is_fresh(output[1], output[2])]
+        if stale:
+            builds.append((unit, stale))
+    return builds
+
+def render_work_unit(unit, indices=None, wait=True):
+    """Render one chapter image and its single-mishnah images (only `indices`, if given)
+    
+    Returns the unit's description, every file written (continuation pages included)
+    and, when bundling, the encoded (path, bytes) pages. With wait=False the pages may
+    still be encoding when this returns and no pages are returned.
+    """
+    tractate_name, chapter_num, mishnayot_texts, chapter_number, first_mishnah_number = unit
+    written = []
+    
+    with stage('chapter', f"{tractate_name} {chapter_num}"):
+        # 1. Create chapter image
+        if indices is None or 0 in indices:
+            chapter_output = OUTPUT_DIR_CHAPTERS / output_name(chapter_number)
+            written += create_chapter_image(tractate_name, chapter_num, mishnayot_texts, chapter_output)
+            tally('images')
+        
+        # 2. Create individual mishnah images
+        for mishnah_idx, mishnah_text in enumerate(mishnayot_texts, 1):
+            if indices is not None and mishnah_idx not in indices:
+                continue
+            mishnah_output = OUTPUT_DIR_SINGLE / output_name(first_mishnah_number + mishnah_idx - 1)
+            written += create_single_mishnah_image(tractate_name, chapter_num, mishnah_idx, mishnah_text, mishnah_output)
+            tally('images')
     
-    # Draw border
-    border_margin = 20
-    draw.rectangle(
-        [border_margin, border_margin, IMAGE_WIDTH - border_margin, IMAGE_HEIGHT - border_margin],
-        outline=BORDER_COLOR,
-        width=3
-    )
+    pages = get_writer().flush() if wait else []
     
-    y = 60
-    padding_x = 60
-    
-    # Tractate title
-    tractate_he = TRACTATE_HEBREW.get(tractate_name, tractate_name.replace("Mishnah_", ""))
-    title_text = f"מסכת {tractate_he}"
-    
-    title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    title_x = (IMAGE_WIDTH - title_width) // 2
-    draw.text((title_x, y), title_text, fill=HEADER_COLOR, font=title_font)
-    y += 70
-    
-    # Chapter and Mishnah number - e.g., "פרק א משנה ג"
-    chapter_hebrew_num = number_to_hebrew_gematria(chapter_num)
-    mishnah_hebrew_num = number_to_hebrew_gematria(mishnah_num)
-    chapter_text = f"פרק {chapter_hebrew_num} משנה {mishnah_hebrew_num}"
-    chapter_bbox = draw.textbbox((0, 0), chapter_text, font=chapter_font)
-    chapter_width = chapter_bbox[2] - chapter_bbox[0]
-    chapter_x = (IMAGE_WIDTH - chapter_width) // 2
-    draw.text((chapter_x, y), chapter_text, fill=HEADER_COLOR, font=chapter_font)
-    y += 60
-    
-    # Separator line
-    draw.line([(padding_x, y), (IMAGE_WIDTH - padding_x, y)], fill=BORDER_COLOR, width=2)
-    y += 40
-    
-    # Draw mishnah text (no number prefix for single mishnah)
-    max_text_width = IMAGE_WIDTH - (padding_x * 2)
-    mishnah_text = strip_html_tags(mishnah_text)
-    lines = wrap_hebrew_text(mishnah_text, text_font, max_text_width)
-    
-    for line in lines:
-        if y > IMAGE_HEIGHT - 100:
-            break
+    return tractate_name, chapter_num, chapter_number, len(mishnayot_texts), written, pages
+
+def run_work_unit(unit, indices):
+    """Worker process entry point: render_work_unit, plus the stage timings it recorded"""
+    return render_work_unit(unit, indices), drain_profile()
+
+def record_build(cache, changed, stale, written, pages, bundles=None):
+    """Record a finished unit's outputs in the build cache and the changed-file list,
+    or stream its encoded pages into the bundles"""
+    if bundles is not None:
+        for path, data in pages:
+            with stage('write'):
+                bundles.add(path, data)
+        return
+    
+    written_paths = set(written)
+    for _, output_path, digest in stale:
+        page_count = 1
+        while page_path(output_path, page_count + 1) in written_paths:
+            page_count += 1
         
-        line_bbox = draw.textbbox((0, 0), line, font=text_font)
-        line_width = line_bbox[2] - line_bbox[0]
-        text_x = IMAGE_WIDTH - padding_x - line_width
+        # Drop continuation pages left over from an earlier, longer layout
+        for page_num in range(page_count + 1, cache.page_count(output_path) + 1):
+            page_path(output_path, page_num).unlink(missing_ok=True)
+        cache.record(output_path, digest, page_count)
+    changed.extend(str(path) for path in written)
+
+def render_serial(builds, cache, changed, bundles=None):
+    """Render work units one after another in this process
+    
+    Each unit's pages keep encoding on the writer threads while the next unit is
+    drawn; a unit is recorded in the build cache once its files are on disk.
+    """
+    current_tractate = None
+    in_flight = None
+    
+    def finish(result, stale, pending):
+        nonlocal current_tractate
+        pages = wait_written(pending)
         
-        draw.text((text_x, y), line, fill=TEXT_COLOR, font=text_font)
-        y += 40
-    
-    # Footer
-    y = IMAGE_HEIGHT - 60
-    footer_text = "מקור: ספריא | Powered by Sefaria.org"
-    footer_font = get_font(16)
-    footer_bbox = draw.textbbox((0, 0), footer_text, font=footer_font)
-    footer_width = footer_bbox[2] - footer_bbox[0]
-    footer_x = (IMAGE_WIDTH - footer_width) // 2
-    draw.text((footer_x, y), footer_text, fill=(150, 150, 150), font=footer_font)
-    
-    img.save(output_path, 'PNG', quality=95)
+        tractate_name, chapter_num, chapter_number, mishnah_count, written, _ = result
+        if tractate_name != current_tractate:
+            current_tractate = tractate_name
+            print(f"\n📖 Processing {tractate_name}...")
+        
+        record_build(cache, changed, stale, written, pages, bundles)
+        print(f"  ✅ Chapter {chapter_number}: {tractate_name} פרק {chapter_num}")
+        print(f"     {len(stale)} of {mishnah_count + 1} images redrawn")
+    
+    for unit, stale in builds:
+        result = render_work_unit(unit, {output[0] for output in stale}, wait=False)
+        pending = get_writer().take_pending()
+        if in_flight:
+            finish(*in_flight)
+        in_flight = (result, stale, pending)
+    
+    if in_flight:
+        finish(*in_flight)
+
+def render_parallel(builds, cache, changed, jobs, bundles=None):
+    """Render work units across a pool of worker processes"""
+    print(f"⚡ Rendering {len(builds)} chapters with {jobs} worker processes\n")
+    
+    # Longest chapters first, so a big Kelim chapter doesn't become the tail of the run
+    ordered = sorted(builds, key=lambda build: sum(len(text) for text in build[0][2]), reverse=True)
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=configure_render,
+                             initargs=(FIT_TO_CONTENT, MAX_PAGE_HEIGHT, OUTPUT_FORMAT, ENCODE_THREADS,
+                                       BUNDLE_FORMAT, profiling_enabled(), RENDER_SCALE, LAYOUT_CACHE)) as executor:
+        futures = {executor.submit(run_work_unit, unit, {output[0] for output in stale}): stale
+                   for unit, stale in ordered}
+        for done, future in enumerate(as_completed(futures), 1):
+            result, profile = future.result()
+            merge_profile(profile)
+            tractate_name, chapter_num, chapter_number, mishnah_count, written, pages = result
+            record_build(cache, changed, futures[future], written, pages, bundles)
+            print(f"  ✅ [{done}/{len(builds)}] Chapter {chapter_number}: {tractate_name} פרק {chapter_num} "
+                  f"({len(futures[future])} of {mishnah_count + 1} images)")
+
+def run_encoder_report(units, sample_size):
+    """Compare output formats on the pages of an evenly spread sample of chapters"""
+    sample = units[::max(len(units) // sample_size, 1)][:sample_size]
+    
+    images = []
+    for tractate_name, chapter_num, mishnayot_texts, _, _ in sample:
+        images += render_display_list(chapter_display_list(tractate_name, chapter_num, mishnayot_texts))
+        for mishnah_idx, mishnah_text in enumerate(mishnayot_texts, 1):
+            images += render_display_list(single_display_list(tractate_name, chapter_num, mishnah_idx, mishnah_text))
+    
+    print(f"\n🧪 Sample: {len(sample)} chapters -> {len(images)} pages")
+    encoder_report(images, output_palette())
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate all Mishnah images")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of rendering processes (0 = one per CPU core, default: 1)")
+    parser.add_argument("--font", metavar="PATH",
+                        help="Hebrew TrueType/OpenType font to render with (default: auto-detect)")
+    parser.add_argument("--force", action="store_true",
+                        help=f"ignore {BUILD_CACHE_FILE} and redraw every image")
+    parser.add_argument("--fixed-height", action="store_true",
+                        help=f"draw every image on a fixed {IMAGE_WIDTH}x{IMAGE_HEIGHT} page, cutting off longer text")
+    parser.add_argument("--max-page-height", type=int, default=MAX_PAGE_HEIGHT, metavar="PX",
+                        help="split content-sized images taller than this into numbered pages "
+                             "(N.png, N_2.png, ...; default: never split)")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default=OUTPUT_FORMAT,
+                        help=f"output encoding (default: {OUTPUT_FORMAT}; see mishnah_encoders.py)")
+    parser.add_argument("--scale", type=float, default=RENDER_SCALE,
+                        help="pixels per layout pixel, e.g. 2 for double-resolution images "
+                             f"(default: {RENDER_SCALE}; reuses cached layouts)")
+    parser.add_argument("--no-layout-cache", action="store_true",
+                        help=f"lay out every image again instead of replaying display lists from "
+                             f"{mishnah_display_list.LAYOUT_CACHE_DIR}/")
+    parser.add_argument("--encode-threads", type=int, default=ENCODE_THREADS, metavar="N",
+                        help=f"encoder/writer threads per process, overlapping with drawing "
+                             f"(0 = encode inline, default: {ENCODE_THREADS})")
+    parser.add_argument("--bundle", choices=BUNDLE_FORMATS,
+                        help=f"stream every image into sharded bundles with an offset index in {BUNDLE_DIR}/ "
+                             "instead of writing loose files (always a full render)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE // (1024 * 1024), metavar="MB",
+                        help=f"maximum bundle shard size (default: {DEFAULT_SHARD_SIZE // (1024 * 1024)} MB)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time every pipeline stage and write {RUN_REPORT_FILE}")
+    parser.add_argument("--profile-code", choices=CODE_PROFILERS,
+                        help="also dump a cProfile or sampled-stack profile of this process "
+                             "next to the report (implies --profile; use with -j 1)")
+    parser.add_argument("--encoder-report", type=int, metavar="N",
+                        help="render N sample chapters in memory, compare bytes and encode time "
+                             "of every output format, and exit")
+    return parser.parse_args()
 
 def main():
     """Generate all Mishnah images in both versions"""
-    
-    OUTPUT_DIR_CHAPTERS.mkdir(exist_ok=True)
-    OUTPUT_DIR_SINGLE.mkdir(exist_ok=True)
+    args = parse_args()
+    jobs = args.jobs or os.cpu_count()
+    
+    if args.max_page_height and args.max_page_height < HEADER_TOP + 170 + FOOTER_SPACE + LINE_HEIGHT:
+        raise SystemExit(f"❌ --max-page-height {args.max_page_height} leaves no room for text")
+    if args.format not in available_modes():
+        raise SystemExit(f"❌ This Pillow build cannot write {args.format} "
+                         f"(available: {', '.join(available_modes())})")
+    if args.scale <= 0:
+        raise SystemExit("❌ --scale must be positive")
+    configure_render(not args.fixed_height, args.max_page_height, args.format, args.encode_threads, args.bundle,
+                     args.profile or args.profile_code is not None, args.scale, not args.no_layout_cache)
+    started = time.perf_counter()
+    
+    if args.font:
+        configure_font(args.font)
+    
+    if not args.bundle:
+        OUTPUT_DIR_CHAPTERS.mkdir(exist_ok=True)
+        OUTPUT_DIR_SINGLE.mkdir(exist_ok=True)
     
     print("🎨 Generating ALL Mishnah images...")
     print("📊 2 versions:")
     print("   1. By chapters (525 images)")
     print("   2. By individual mishnayot (~4,192 images)\n")
     
-    chapter_counter = 0
-    mishnah_counter = 0
+    # Resolve the font once up front so worker processes inherit it
+    describe_font_setup()
     
-    # Traditional Mishnah order (6 Sedarim)
-    mishnah_order = [
-        # סדר זרעים
-        "Mishnah_Berakhot", "Mishnah_Peah", "Mishnah_Demai", "Mishnah_Kilayim", 
-        "Mishnah_Sheviit", "Mishnah_Terumot", "Mishnah_Maasrot", "Mishnah_Maaser_Sheni", 
-        "Mishnah_Challah", "Mishnah_Orlah", "Mishnah_Bikkurim",
-        # סדר מועד
-        "Mishnah_Shabbat", "Mishnah_Eruvin", "Mishnah_Pesachim", "Mishnah_Shekalim", 
-        "Mishnah_Yoma", "Mishnah_Sukkah", "Mishnah_Beitzah", "Mishnah_Rosh_Hashanah", 
-        "Mishnah_Taanit", "Mishnah_Megillah", "Mishnah_Moed_Katan", "Mishnah_Chagigah",
-        # סדר נשים
-        "Mishnah_Yevamot", "Mishnah_Ketubot", "Mishnah_Nedarim", "Mishnah_Nazir", 
-        "Mishnah_Sotah", "Mishnah_Gittin", "Mishnah_Kiddushin",
-        # סדר נזיקין
-        "Mishnah_Bava_Kamma", "Mishnah_Bava_Metzia", "Mishnah_Bava_Batra", 
-        "Mishnah_Sanhedrin", "Mishnah_Makkot", "Mishnah_Shevuot", "Mishnah_Eduyot", 
-        "Mishnah_Avodah_Zarah", "Mishnah_Avot", "Mishnah_Horayot",
-        # סדר קודשים
-        "Mishnah_Zevachim", "Mishnah_Menachot", "Mishnah_Chullin", "Mishnah_Bekhorot", 
-        "Mishnah_Arakhin", "Mishnah_Temurah", "Mishnah_Keritot", "Mishnah_Meilah", 
-        "Mishnah_Tamid", "Mishnah_Middot", "Mishnah_Kinnim",
-        # סדר טהרות
-        "Mishnah_Kelim", "Mishnah_Oholot", "Mishnah_Negaim", "Mishnah_Parah", 
-        "Mishnah_Tahorot", "Mishnah_Mikvaot", "Mishnah_Niddah", "Mishnah_Makhshirin", 
-        "Mishnah_Zavim", "Mishnah_Tevul_Yom", "Mishnah_Yadayim", "Mishnah_Oktzin",
-    ]
+    if args.encoder_report:
+        run_encoder_report(plan_work_units(), args.encoder_report)
+        return
     
-    # Process tractates in traditional order
-    for tractate_name in mishnah_order:
-        tractate_dir = MISHNAYOT_DIR / tractate_name
-        
-        if not tractate_dir.exists() or not tractate_dir.is_dir():
-            print(f"⚠️  Skipping {tractate_name} - not found")
-            continue
+    # Bundles are rewritten as a whole, so bundling renders everything and leaves the cache alone
+    cache = BuildCache()
+    bundles = BundleSet(BUNDLE_DIR, args.bundle, args.shard_size * 1024 * 1024) if args.bundle else None
+    if args.force or bundles:
+        cache.forget()
+    
+    with code_profiler(args.profile_code, RUN_REPORT_FILE.with_name("mishnah_run_profile")):
+        units = plan_work_units()
+        chapter_counter = len(units)
+        mishnah_counter = sum(len(unit[2]) for unit in units)
         
-        print(f"\n📖 Processing {tractate_name}...")
+        builds = plan_builds(units, cache, config_fingerprint(render_config()))
+        stale_count = sum(len(stale) for _, stale in builds)
+        print(f"🗂️  {stale_count} of {chapter_counter + mishnah_counter} images need redrawing "
+              f"({len(builds)} chapters)\n")
         
-        # Process each chapter
-        for chapter_file in sorted(tractate_dir.glob("chapter_*.json")):
-            chapter_num = int(chapter_file.stem.replace("chapter_", ""))
-            
-            with open(chapter_file, 'r', encoding='utf-8') as f:
-                chapter_data = json.load(f)
-            
-            mishnayot_texts = extract_text_from_chapter(chapter_data)
-            
-            if not mishnayot_texts:
-                continue
-            
-            # 1. Create chapter image
-            chapter_counter += 1
-            chapter_output = OUTPUT_DIR_CHAPTERS / f"{chapter_counter}.png"
-            create_chapter_image(tractate_name, chapter_num, mishnayot_texts, chapter_output)
-            print(f"  ✅ Chapter {chapter_counter}: {tractate_name} פרק {chapter_num}")
-            
-            # 2. Create individual mishnah images
-            for mishnah_idx, mishnah_text in enumerate(mishnayot_texts, 1):
-                mishnah_counter += 1
-                mishnah_output = OUTPUT_DIR_SINGLE / f"{mishnah_counter}.png"
-                create_single_mishnah_image(tractate_name, chapter_num, mishnah_idx, mishnah_text, mishnah_output)
-            
-            print(f"     + {len(mishnayot_texts)} individual mishnayot")
+        changed = []
+        completed = False
+        try:
+            if jobs > 1 and builds:
+                render_parallel(builds, cache, changed, jobs, bundles)
+            else:
+                render_serial(builds, cache, changed, bundles)
+            close_writer()
+            completed = True
+        finally:
+            # Keep whatever finished, so an interrupted run resumes where it stopped
+            close_writer()
+            if bundles and completed:
+                changed = [str(path) for path in bundles.close()]
+            elif bundles:
+                # A partial bundle is never published - the last complete one stays in place
+                bundles.discard()
+                changed = []
+            else:
+                cache.save()
+            write_changed_list(changed)
+    
+    if profiling_enabled():
+        report = write_run_report(RUN_REPORT_FILE, "generate_all_mishnah_images.py", time.perf_counter() - started, {
+            'output_format': OUTPUT_FORMAT,
+            'jobs': jobs,
+            'encode_threads': ENCODE_THREADS,
+            'bundle': BUNDLE_FORMAT,
+            'images_planned': stale_count,
+        }, PIPELINE_STAGES)
+        print_run_report(report)
+        print(f"📝 Run report: {RUN_REPORT_FILE}")
     
     print(f"\n\n🎉 Done!")
     print(f"📊 Statistics:")
-    print(f"   - Chapters: {chapter_counter} images in {OUTPUT_DIR_CHAPTERS}/")
-    print(f"   - Individual Mishnayot: {mishnah_counter} images in {OUTPUT_DIR_SINGLE}/")
+    if bundles:
+        print(f"   - Chapters: {chapter_counter} images, Individual Mishnayot: {mishnah_counter} images")
+        print(f"   - Bundled into {len(changed)} shard/index files in {BUNDLE_DIR}/ (listed in {CHANGED_LIST_FILE})")
+    else:
+        print(f"   - Chapters: {chapter_counter} images in {OUTPUT_DIR_CHAPTERS}/")
+        print(f"   - Individual Mishnayot: {mishnah_counter} images in {OUTPUT_DIR_SINGLE}/")
+        print(f"   - Redrawn this run: {len(changed)} (listed in {CHANGED_LIST_FILE})")
     print(f"\n✅ Ready for S3 upload!")
 
 if __name__ == "__main__":
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Generate all Mishnah PDFs in 2 versions, as vector text:
+1. By chapters (524 PDFs) - Full chapter with multiple mishnayot
+2. By individual mishnayot (~4,187 PDFs) - One mishnah per PDF
+
+This is the only Mishnah PDF generator: it replaced generateMishnayotPdfs.js,
+which printed every document through headless Chromium (puppeteer) and has
+been removed. The layout is computed in Python: lines are broken by the same
+wrap_hebrew_text as the images, measured with the advance widths of the font
+that is embedded, and written with mishnah_pdf.py as A4 pages of text that
+embed a subset of the font (only the glyphs used in that document). Output
+names are the ones the JS generator used ({n}.pdf in mishnah_pdfs_chapters/
+and mishnah_pdfs_single/) and builds are incremental, like the images'.
+
+Layout produces a display list per document, cached in mishnah_layout_cache/
+(see mishnah_display_list.py): lines are wrapped and measured once, and a
+rebuild after a change to the replay code only replays the cached layouts.
+
+Chapters come from the same sources as mishnah_pipeline.py: the compact
+corpus if it has been built, else mishnayot_texts/ (--source picks one).
+
+Usage:
+    python3 scripts/generate_all_mishnah_pdfs.py            # only changed or missing PDFs
+    python3 scripts/generate_all_mishnah_pdfs.py --force    # rewrite every PDF
+    python3 scripts/generate_all_mishnah_pdfs.py --check    # parse one chapter PDF back and compare it with the text
+"""
+
+import argparse
+import os
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import mishnah_display_list
+import mishnah_layout
+import mishnah_pdf
+from generate_all_mishnah_images import (BACKGROUND_COLOR, BORDER_COLOR, FOOTER_COLOR, HEADER_COLOR, TEXT_COLOR,
+                                         number_to_hebrew_gematria)
+from mishnah_build_cache import BuildCache, code_digest, config_fingerprint, file_digest, output_digest, write_changed_list
+from mishnah_corpus import TRACTATE_HEBREW, hebrew_title
+from mishnah_display_list import DisplayListCache, display_list, to_pdf
+from mishnah_fonts import configure_font, resolve_font_path
+from mishnah_layout import wrap_hebrew_text
+from mishnah_pdf import A4, MIRRORED, PdfFont, TrueTypeFont, load_font, pdf_font, read_pdf, subset_glyphs
+from mishnah_pipeline import SOURCES, numbered, open_source
+
+# Directories and build state
+OUTPUT_DIR_CHAPTERS = Path("mishnah_pdfs_chapters")
+OUTPUT_DIR_SINGLE = Path("mishnah_pdfs_single")
+PDF_BUILD_CACHE_FILE = Path("mishnah_pdf_build_cache.json")
+PDF_CHANGED_LIST_FILE = Path("mishnah_pdfs_changed.txt")
+
+# Page layout, in points (A4 with 15 mm margins, like the Chromium PDFs)
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 42.5
+PADDING = 30
+BORDER_WIDTH = 2.25
+CARD_COLOR = (255, 255, 255)
+RULE_COLOR = (221, 221, 221)
+FOOTER_TEXT = "מקור: ספריא | Powered by Sefaria.org"
+
+TITLE_FONT_SIZE = 30
+CHAPTER_FONT_SIZE = 23
+TEXT_FONT_SIZE = 17
+FOOTER_FONT_SIZE = 10
+LINE_HEIGHT = 31
+MISHNAH_GAP = 14
+
+TEXT_LEFT = MARGIN + PADDING
+TEXT_RIGHT = PAGE_WIDTH - MARGIN - PADDING
+TEXT_TOP = MARGIN + PADDING
+FOOTER_BASELINE = PAGE_HEIGHT - MARGIN - PADDING
+TEXT_BOTTOM = FOOTER_BASELINE - 40  # lowest baseline above the footer rule
+
+# Display lists live alongside the images', in their own namespace
+_layout_cache = DisplayListCache("pdfs")
+
+def layout_config():
+    """Everything besides the text that affects a display list
+    
+    The code part covers the layout functions and the font measuring code they call,
+    not the PDF writer or the CLI, so only a layout change lays documents out again.
+    """
+    font_path = resolve_font_path()
+    return {
+        'page': (PAGE_WIDTH, PAGE_HEIGHT, MARGIN, PADDING, BORDER_WIDTH),
+        'colors': (BACKGROUND_COLOR, CARD_COLOR, TEXT_COLOR, HEADER_COLOR, BORDER_COLOR, FOOTER_COLOR, RULE_COLOR),
+        'font_sizes': (TITLE_FONT_SIZE, CHAPTER_FONT_SIZE, TEXT_FONT_SIZE, FOOTER_FONT_SIZE),
+        'spacing': (LINE_HEIGHT, MISHNAH_GAP),
+        'font': (font_path and os.path.basename(font_path), file_digest(font_path)),
+        'titles': TRACTATE_HEBREW,
+        'layout_code': (code_digest(number_to_hebrew_gematria, hebrew_title, text_width, centred, page_chrome,
+                                    layout_document, chapter_pdf, single_pdf, pdf_font, TrueTypeFont,
+                                    PdfFont.__init__, PdfFont.getlength),
+                        file_digest(mishnah_layout.__file__)),
+    }
+
+def pdf_config():
+    """Everything besides the text that affects the bytes of a PDF"""
+    return dict(layout_config(), renderer=(file_digest(__file__), file_digest(mishnah_pdf.__file__),
+                                           file_digest(mishnah_display_list.__file__)))
+
+@lru_cache(maxsize=None)
+def layout_fingerprint():
+    """Digest of layout_config(), once per run"""
+    return config_fingerprint(layout_config())
+
+def text_width(font_size, text):
+    """Advance width of a line in the embedded font, in points"""
+    return pdf_font(resolve_font_path(), font_size).getlength(text)
+
+def centred(kind, text, font_size, baseline, fill):
+    """Text item centred horizontally on the page"""
+    return (kind, PAGE_WIDTH / 2 - text_width(font_size, text) / 2, baseline, text, font_size, fill, None)
+
+@lru_cache(maxsize=None)
+def page_chrome():
+    """Static items of every page - background, bordered card and footer"""
+    rule = FOOTER_BASELINE - FOOTER_FONT_SIZE - 12
+    # The border is stroked on the card's edge, half outside it
+    return (
+        ('rect', 0, 0, PAGE_WIDTH, PAGE_HEIGHT, BACKGROUND_COLOR, None, 0),
+        ('rect', MARGIN, MARGIN, PAGE_WIDTH - 2 * MARGIN, PAGE_HEIGHT - 2 * MARGIN, CARD_COLOR, None, 0),
+        ('rect', MARGIN - BORDER_WIDTH / 2, MARGIN - BORDER_WIDTH / 2, PAGE_WIDTH - 2 * MARGIN + BORDER_WIDTH,
+         PAGE_HEIGHT - 2 * MARGIN + BORDER_WIDTH, None, BORDER_COLOR, BORDER_WIDTH),
+        ('line', TEXT_LEFT, rule, TEXT_RIGHT, rule, RULE_COLOR, 1.5),
+        centred('text', FOOTER_TEXT, FOOTER_FONT_SIZE, FOOTER_BASELINE, FOOTER_COLOR),
+    )
+
+def layout_document(title_text, subtitle_text, paragraphs, doc_title):
+    """Lay out the header and the wrapped paragraphs over as many A4 pages as they need, as a display list"""
+    text_font = pdf_font(resolve_font_path(), TEXT_FONT_SIZE)
+    max_text_width = TEXT_RIGHT - TEXT_LEFT
+    
+    y = TEXT_TOP + TITLE_FONT_SIZE
+    items = [centred('label', title_text, TITLE_FONT_SIZE, y, HEADER_COLOR)]
+    y += CHAPTER_FONT_SIZE + 18
+    items.append(centred('label', subtitle_text, CHAPTER_FONT_SIZE, y, HEADER_COLOR))
+    y += 22
+    items.append(('line', TEXT_LEFT, y, TEXT_RIGHT, y, BORDER_COLOR, 1.5))
+    baseline = y + 24 + TEXT_FONT_SIZE
+    pages = [items]
+    
+    for paragraph in paragraphs:
+        lines = wrap_hebrew_text(paragraph, text_font, max_text_width)
+        for line_num, line in enumerate(lines, 1):
+            if baseline > TEXT_BOTTOM:
+                pages.append([])
+                baseline = TEXT_TOP + TEXT_FONT_SIZE
+            # Justified like the printed editions, except the last line of a paragraph
+            if line_num == len(lines):
+                item = ('text', TEXT_RIGHT - text_font.getlength(line), baseline, line, TEXT_FONT_SIZE, TEXT_COLOR, None)
+            else:
+                item = ('text', TEXT_LEFT, baseline, line, TEXT_FONT_SIZE, TEXT_COLOR, max_text_width)
+            pages[-1].append(item)
+            baseline += LINE_HEIGHT
+        baseline += MISHNAH_GAP
+    
+    return display_list('pt', [((PAGE_WIDTH, PAGE_HEIGHT), page_chrome(), items) for items in pages], doc_title)
+
+def render_document(key_parts, title_text, subtitle_text, paragraphs, doc_title):
+    """PDF bytes replayed from the document's cached display list, laid out on a miss"""
+    key = output_digest(layout_fingerprint(), *key_parts)
+    laid_out = _layout_cache.layout(layout_fingerprint(), key, lambda: layout_document(title_text, subtitle_text, paragraphs, doc_title))
+    return to_pdf(laid_out)
+
+def chapter_pdf(tractate_name, chapter_num, mishnayot_texts):
+    """PDF of a full chapter, one numbered paragraph per mishnah"""
+    title_text = f"מסכת {hebrew_title(tractate_name)}"
+    chapter_text = f"פרק {number_to_hebrew_gematria(chapter_num)}"
+    paragraphs = [f"{number_to_hebrew_gematria(idx)}. {text}" for idx, text in enumerate(mishnayot_texts, 1)]
+    return render_document(('chapter', tractate_name, chapter_num, mishnayot_texts),
+                           title_text, chapter_text, paragraphs, f"{title_text} {chapter_text}")
+
+def single_pdf(tractate_name, chapter_num, mishnah_num, mishnah_text):
+    """PDF of a single mishnah"""
+    title_text = f"מסכת {hebrew_title(tractate_name)}"
+    chapter_text = f"פרק {number_to_hebrew_gematria(chapter_num)} משנה {number_to_hebrew_gematria(mishnah_num)}"
+    return render_document(('single', tractate_name, chapter_num, mishnah_num, mishnah_text),
+                           title_text, chapter_text, [mishnah_text], f"{title_text} {chapter_text}")
+
+def unit_documents(unit, fingerprint):
+    """(output path, digest, render function) for every PDF of a work unit"""
+    tractate_name, chapter_num, mishnayot_texts, chapter_number, first_mishnah_number = unit
+    
+    documents = [(OUTPUT_DIR_CHAPTERS / f"{chapter_number}.pdf",
+                  output_digest(fingerprint, 'chapter', tractate_name, chapter_num, mishnayot_texts),
+                  lambda: chapter_pdf(tractate_name, chapter_num, mishnayot_texts))]
+    for mishnah_idx, mishnah_text in enumerate(mishnayot_texts, 1):
+        documents.append((OUTPUT_DIR_SINGLE / f"{first_mishnah_number + mishnah_idx - 1}.pdf",
+                          output_digest(fingerprint, 'single', tractate_name, chapter_num, mishnah_idx, mishnah_text),
+                          lambda idx=mishnah_idx, text=mishnah_text: single_pdf(tractate_name, chapter_num, idx, text)))
+    return documents
+
+def check_chapter_pdf(source):
+    """Generate one chapter PDF, parse it back and compare its font subset and text with the chapter, returning the failures
+    
+    The chapter is the one using the most distinct characters, so the subset
+    check covers as much of the font as a single document can. Body lines are
+    read back in logical order by reversing each run and un-mirroring brackets,
+    which undoes visual_order for Hebrew and punctuation; combining marks are
+    compared as a count per mark, since their order around a letter depends on the font.
+    """
+    chapter = max(open_source(source), key=lambda chapter: len(set(''.join(chapter[2]))), default=None)
+    if chapter is None:
+        print(f"❌ No chapters to check from source {source!r}")
+        return ["no chapters"]
+    tractate_name, chapter_num, mishnayot_texts = chapter
+    title_text = f"מסכת {hebrew_title(tractate_name)}"
+    chapter_text = f"פרק {number_to_hebrew_gematria(chapter_num)}"
+    paragraphs = [f"{number_to_hebrew_gematria(idx)}. {text}" for idx, text in enumerate(mishnayot_texts, 1)]
+    data = chapter_pdf(tractate_name, chapter_num, mishnayot_texts)
+    
+    failures = []
+    try:
+        parsed = read_pdf(data)
+    except (ValueError, zlib.error) as e:
+        failures.append(f"does not parse: {e}")
+        parsed = None
+    
+    if parsed:
+        font = load_font(resolve_font_path())
+        subset = None if font.cff else subset_glyphs(parsed['font'])
+        cids = {char: cid for cid, char in parsed['to_unicode'].items()}
+        scale = 1000 / font.units_per_em
+        for char in sorted(set(title_text + chapter_text + FOOTER_TEXT + ''.join(paragraphs))):
+            gid = font.glyph_id(char)
+            cid = cids.get(char)
+            if not gid:
+                failures.append(f"U+{ord(char):04X} has no glyph in {font.path}")
+            elif cid is None or (subset is not None and cid >= len(subset)):
+                failures.append(f"U+{ord(char):04X} is missing from the embedded subset")
+            elif parsed['widths'].get(cid) != round(font.advance(gid) * scale) or \
+                    (subset is not None and subset[cid][0] != font.advance(gid)):
+                failures.append(f"U+{ord(char):04X} has the wrong advance width in the subset")
+            elif subset is not None and len(subset[cid][1].rstrip(b'\0')) != len(font.glyph(gid).rstrip(b'\0')):
+                failures.append(f"U+{ord(char):04X} has a different outline in the subset")
+        
+        runs = {}
+        for page in parsed['pages']:
+            for size, run in page:
+                chars = [parsed['to_unicode'].get(cid, '\ufffd') for cid in run]
+                runs.setdefault(size, []).append(chars)
+        
+        def logical(chars):
+            return ''.join(MIRRORED.get(char, char) for char in reversed(chars) if not unicodedata.combining(char))
+        
+        def bases(text):
+            return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+        
+        def marks(text):
+            return Counter(char for char in text if unicodedata.combining(char))
+        
+        body = [''.join(chars) for chars in runs.get(TEXT_FONT_SIZE, [])]
+        expected = ' '.join(paragraphs)
+        if ' '.join(logical(line) for line in body) != bases(expected):
+            failures.append("extracted body text does not match the chapter")
+        if marks(''.join(body)) != marks(expected):
+            failures.append("extracted body text has different combining marks from the chapter")
+        for size, text in ((TITLE_FONT_SIZE, title_text), (CHAPTER_FONT_SIZE, chapter_text)):
+            if [logical(chars) for chars in runs.get(size, [])] != [bases(text)]:
+                failures.append(f"extracted heading does not match {text!r}")
+        footers = runs.get(FOOTER_FONT_SIZE, [])
+        if len(footers) != len(parsed['pages']) or any(Counter(chars) != Counter(FOOTER_TEXT) for chars in footers):
+            failures.append("footer is missing or garbled on some pages")
+    
+    print(f"🧪 Checked {tractate_name} פרק {chapter_num} "
+          f"({len(parsed['pages']) if parsed else '?'} pages, {len(data) / 1024:.0f} KB): "
+          f"{'PDF parses, subset and text match' if not failures else f'{len(failures)} failures'}")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    return failures
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate all Mishnah PDFs")
+    parser.add_argument("--source", choices=SOURCES, default="auto",
+                        help="where chapters come from (default: the corpus if built, else mishnayot_texts/)")
+    parser.add_argument("--font", metavar="PATH",
+                        help="Hebrew TrueType font to embed (default: auto-detect)")
+    parser.add_argument("--force", action="store_true",
+                        help=f"ignore {PDF_BUILD_CACHE_FILE} and rewrite every PDF")
+    parser.add_argument("--check", action="store_true",
+                        help="generate one chapter PDF, check that it parses back to the chapter, then exit")
+    return parser.parse_args()
+
+def main():
+    """Generate all Mishnah PDFs in both versions"""
+    args = parse_args()
+    
+    if args.font:
+        configure_font(args.font)
+    font_path = resolve_font_path()
+    if not font_path:
+        raise SystemExit("❌ No Hebrew TrueType font found to embed (see scripts/mishnah_fonts.py)")
+    if args.check:
+        raise SystemExit(1 if check_chapter_pdf(args.source) else 0)
+    
+    OUTPUT_DIR_CHAPTERS.mkdir(exist_ok=True)
+    OUTPUT_DIR_SINGLE.mkdir(exist_ok=True)
+    
+    print("🎨 Generating ALL Mishnah PDFs...")
+    print(f"🔤 Embedding subsets of {font_path}\n")
+    
+    cache = BuildCache(PDF_BUILD_CACHE_FILE)
+    if args.force:
+        cache.forget()
+    fingerprint = config_fingerprint(pdf_config())
+    
+    started = time.perf_counter()
+    chapter_count = mishnah_count = 0
+    current_tractate = None
+    changed = []
+    written_bytes = 0
+    
+    try:
+        for unit in numbered(open_source(args.source)):
+            tractate_name, chapter_num, mishnayot_texts, chapter_number, _ = unit
+            chapter_count += 1
+            mishnah_count += len(mishnayot_texts)
+            
+            redrawn = 0
+            for output_path, digest, render in unit_documents(unit, fingerprint):
+                if cache.is_fresh(output_path, digest):
+                    continue
+                data = render()
+                output_path.write_bytes(data)
+                cache.record(output_path, digest)
+                changed.append(str(output_path))
+                written_bytes += len(data)
+                redrawn += 1
+            
+            if redrawn:
+                if tractate_name != current_tractate:
+                    current_tractate = tractate_name
+                    print(f"\n📖 Processing {tractate_name}...")
+                print(f"  ✅ Chapter {chapter_number}: {tractate_name} פרק {chapter_num} "
+                      f"({redrawn} of {len(mishnayot_texts) + 1} PDFs)")
+    finally:
+        # Keep whatever finished, so an interrupted run resumes where it stopped
+        cache.save()
+        write_changed_list(changed, PDF_CHANGED_LIST_FILE)
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n\n🎉 Done! {len(changed)} PDFs written in {elapsed:.1f}s "
+          f"({len(changed) / elapsed if elapsed else 0:.0f}/s, {written_bytes / 1024 / 1024:.1f} MB)")
+    print(f"📊 Statistics:")
+    print(f"   - Chapters: {chapter_count} PDFs in {OUTPUT_DIR_CHAPTERS}/")
+    print(f"   - Individual Mishnayot: {mishnah_count} PDFs in {OUTPUT_DIR_SINGLE}/")
+    print(f"   - Written this run: {len(changed)} (listed in {PDF_CHANGED_LIST_FILE})")
+    print(f"\n✅ Ready for S3 upload!")
+
+if __name__ == "__main__":
+    main()
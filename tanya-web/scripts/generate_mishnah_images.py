@@ -6,9 +6,12 @@ This test version generates 3 examples for approval before processing all files
 
 import json
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import textwrap
-import re
+
+from mishnah_corpus import CORPUS_FILE, normalize_mishnah, open_corpus
+from mishnah_fonts import get_font
+from mishnah_layout import wrap_hebrew_text
 
 # Directories
 MISHNAYOT_DIR = Path("mishnayot_texts")
@@ -22,37 +25,15 @@ TEXT_COLOR = (40, 40, 40)  # Dark gray (softer than black)
 HEADER_COLOR = (4, 71, 142)  # Your brand blue #04478E
 BORDER_COLOR = (4, 71, 142)
 
+# Line breaking: exact textbbox checks near the margin (False is ~4x faster, breaks may shift)
+WRAP_VERIFY = True
+
 # Font settings (system fonts that work on macOS)
 TITLE_FONT_SIZE = 48
 CHAPTER_FONT_SIZE = 36
 TEXT_FONT_SIZE = 32
 MISHNAH_NUMBER_FONT_SIZE = 28
 
-def get_font(size):
-    """Try to get Hebrew font, fallback to system fonts"""
-    font_options = [
-        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-        "/System/Library/Fonts/Supplemental/Arial.ttf",
-        "/Library/Fonts/Arial Unicode.ttf",
-    ]
-    
-    for font_path in font_options:
-        try:
-            return ImageFont.truetype(font_path, size)
-        except:
-            continue
-    
-    # Fallback to default
-    return ImageFont.load_default()
-
-def strip_html_tags(text):
-    """Remove HTML tags and entities from text"""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text.strip()
-
 def number_to_hebrew_gematria(num):
     """Convert number to Hebrew gematria letter"""
     # Hebrew letters for numbers 1-22
@@ -80,31 +61,6 @@ def number_to_hebrew_gematria(num):
         # For larger numbers, just use the first 22 letters cyclically
         return hebrew_letters[(num - 1) % 22]
 
-def wrap_hebrew_text(text, font, max_width):
-    """Wrap Hebrew text to fit within max_width"""
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        width = bbox[2] - bbox[0]
-        
-        if width <= max_width:
-            current_line.append(word)
-        else:
-            if current_line:
-                lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
-
 def extract_text_from_chapter(chapter_data):
     """Extract Hebrew text and metadata from chapter JSON"""
     try:
@@ -118,7 +74,7 @@ def extract_text_from_chapter(chapter_data):
         # Alternative structure
         if 'he' in chapter_data:
             return chapter_data['he']
-            
+        
         return []
     except Exception as e:
         print(f"Error extracting text: {e}")
@@ -247,15 +203,12 @@ def create_mishnah_image(tractate_name, chapter_num, mishnayot_texts, output_pat
         if y > IMAGE_HEIGHT - 100:  # Stop if we're running out of space
             break
         
-        # Strip HTML tags from the text
-        mishnah_text = strip_html_tags(mishnah_text)
-        
         # Add Hebrew gematria letter at the beginning
         hebrew_num = number_to_hebrew_gematria(idx)
         mishnah_with_number = f"{hebrew_num}. {mishnah_text}"
         
         # Wrap and draw text (RTL)
-        lines = wrap_hebrew_text(mishnah_with_number, text_font, max_text_width)
+        lines = wrap_hebrew_text(mishnah_with_number, text_font, max_text_width, verify=WRAP_VERIFY)
         
         for line in lines[:3]:  # Max 3 lines per mishnah to save space
             # Right-align for Hebrew (RTL)
@@ -298,19 +251,25 @@ def main():
         ("Mishnah_Avot", 1),      # Pirkei Avot - Ethics of the Fathers
     ]
     
+    # Prefer the compact corpus when it has been built
+    corpus = open_corpus() if CORPUS_FILE.exists() else None
+    
     for tractate_name, chapter_num in test_cases:
-        # Load chapter JSON
-        chapter_file = MISHNAYOT_DIR / tractate_name / f"chapter_{chapter_num}.json"
-        
-        if not chapter_file.exists():
-            print(f"⚠️  File not found: {chapter_file}")
-            continue
-        
-        with open(chapter_file, 'r', encoding='utf-8') as f:
-            chapter_data = json.load(f)
-        
-        # Extract text
-        mishnayot_texts = extract_text_from_chapter(chapter_data)
+        if corpus:
+            mishnayot_texts = corpus.get_chapter(tractate_name, chapter_num)
+        else:
+            # Load chapter JSON
+            chapter_file = MISHNAYOT_DIR / tractate_name / f"chapter_{chapter_num}.json"
+            
+            if not chapter_file.exists():
+                print(f"⚠️  File not found: {chapter_file}")
+                continue
+            
+            with open(chapter_file, 'r', encoding='utf-8') as f:
+                chapter_data = json.load(f)
+            
+            # Extract text and clean it up as the corpus build would
+            mishnayot_texts = [normalize_mishnah(text) for text in extract_text_from_chapter(chapter_data)]
         
         if not mishnayot_texts:
             print(f"⚠️  No text found in {tractate_name} chapter {chapter_num}")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the Mishnah image pipeline
+
+Renders a fixed subset of chapters from the checked-in mishnayot_texts/
+(no network, no corpus build needed), covering the shortest, median and
+longest chapters plus heavy Kelim and Shabbat chapters, and times each
+stage separately:
+
+    load    read and parse the chapter JSON
+    strip   normalize_mishnah (done once at corpus build time in real runs)
+    wrap    line breaking into rows (wrap_hebrew_text)
+    draw    page chrome, header strips and body text
+    encode  OUTPUT_FORMAT encoding (png by default)
+    write   writing the files (to a temp directory)
+
+Each stage is the median over --repeat runs, after one warm-up run. The
+report includes images per second and peak RSS, and is compared against a
+stored baseline: a total slowdown beyond --threshold exits non-zero, so a
+change can be proven or rejected with numbers from the same machine. The
+baseline is a reference run of this harness on the current tree (it needs
+the corpus, display-list and encoder modules), saved before the change
+under test.
+
+Usage:
+    python3 scripts/mishnah_benchmark.py --save-baseline    # reference run, before making a change
+    python3 scripts/mishnah_benchmark.py                    # after the change: compare
+    python3 scripts/mishnah_benchmark.py --full             # also time a full generate_all run
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import PIL
+
+import generate_all_mishnah_images as renderer
+from mishnah_corpus import MISHNAYOT_DIR, extract_text_from_chapter, normalize_mishnah
+from mishnah_encoders import encode_image
+from mishnah_fonts import configure_font, has_rtl_layout, resolve_font_path
+
+BASELINE_FILE = Path("mishnah_benchmark_baseline.json")
+STAGES = ("load", "strip", "wrap", "draw", "encode", "write")
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 10.0  # percent
+
+# Fixed subset: shortest, median and longest chapters, plus Kelim and Shabbat
+BENCH_CHAPTERS = [
+    ("Mishnah_Shabbat", 4),     # shortest chapter in the corpus
+    ("Mishnah_Tamid", 6),
+    ("Mishnah_Shabbat", 21),
+    ("Mishnah_Berakhot", 1),
+    ("Mishnah_Shevuot", 5),     # median (by text length, 263rd of 524)
+    ("Mishnah_Kiddushin", 1),
+    ("Mishnah_Demai", 6),
+    ("Mishnah_Shabbat", 1),
+    ("Mishnah_Kelim", 5),
+    ("Mishnah_Kelim", 17),      # longest Kelim chapter
+    ("Mishnah_Sotah", 9),
+    ("Mishnah_Yadayim", 4),
+    ("Mishnah_Avot", 5),        # most mishnayot in one chapter
+    ("Mishnah_Avot", 6),        # longest chapter in the corpus
+]
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return peak / 1024
+
+def machine_info():
+    """What the numbers depend on besides the code - compared before trusting a baseline"""
+    font_path = resolve_font_path()
+    return {
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'raqm': has_rtl_layout(),
+        'font': font_path and os.path.basename(font_path),
+        'cpus': os.cpu_count(),
+    }
+
+def run_once(source_dir, output_dir):
+    """Render the subset once, returning (seconds per stage, images written)"""
+    stages = dict.fromkeys(STAGES, 0.0)
+    images = 0
+    clock = time.perf_counter
+    
+    for tractate_name, chapter_num in BENCH_CHAPTERS:
+        started = clock()
+        with open(source_dir / tractate_name / f"chapter_{chapter_num}.json", 'r', encoding='utf-8') as f:
+            texts = extract_text_from_chapter(json.load(f))
+        stages['load'] += clock() - started
+        
+        started = clock()
+        stripped = [normalize_mishnah(text) for text in texts]
+        stages['strip'] += clock() - started
+        
+        started = clock()
+        specs = [renderer.chapter_page_spec(tractate_name, chapter_num, stripped)]
+        for mishnah_num, text in enumerate(stripped, 1):
+            specs.append(renderer.single_page_spec(tractate_name, chapter_num, mishnah_num, text))
+        stages['wrap'] += clock() - started
+        
+        for spec_num, spec in enumerate(specs):
+            started = clock()
+            pages = renderer.render_pages(*spec)
+            stages['draw'] += clock() - started
+            
+            for page_num, img in enumerate(pages, 1):
+                started = clock()
+                data = encode_image(img, renderer.OUTPUT_FORMAT, renderer.output_palette())
+                stages['encode'] += clock() - started
+                
+                started = clock()
+                with open(output_dir / f"{tractate_name}_{chapter_num}_{spec_num}_{page_num}", 'wb') as f:
+                    f.write(data)
+                stages['write'] += clock() - started
+                images += 1
+    
+    return stages, images
+
+def run_subset(repeat, source_dir=MISHNAYOT_DIR):
+    """Warm up, then run the subset `repeat` times and take the median of every stage"""
+    with tempfile.TemporaryDirectory(prefix="mishnah-bench-") as tmp:
+        run_once(source_dir, Path(tmp))
+        runs = [run_once(source_dir, Path(tmp)) for _ in range(repeat)]
+    
+    stages = {stage: statistics.median(run[0][stage] for run in runs) for stage in STAGES}
+    images = runs[0][1]
+    total = sum(stages.values())
+    return {
+        'chapters': len(BENCH_CHAPTERS),
+        'chapter_list': [f"{tractate_name} {chapter_num}" for tractate_name, chapter_num in BENCH_CHAPTERS],
+        'images': images,
+        'stages': stages,
+        'total': total,
+        'images_per_second': images / total if total else 0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_full(source_dir=MISHNAYOT_DIR):
+    """Time a complete generate_all_mishnah_images.py run over the whole corpus in a temp directory"""
+    script = Path(__file__).resolve().parent / "generate_all_mishnah_images.py"
+    
+    with tempfile.TemporaryDirectory(prefix="mishnah-bench-full-") as tmp:
+        os.symlink(Path(source_dir).resolve(), Path(tmp) / MISHNAYOT_DIR.name)
+        started = time.perf_counter()
+        subprocess.run([sys.executable, str(script), "--force"], cwd=tmp, check=True,
+                       stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - started
+        images = sum(1 for directory in (renderer.OUTPUT_DIR_CHAPTERS, renderer.OUTPUT_DIR_SINGLE)
+                     for _ in (Path(tmp) / directory).iterdir())
+    
+    return {
+        'images': images,
+        'total': elapsed,
+        'images_per_second': images / elapsed,
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+def change(current, baseline):
+    """Percentage change from baseline (positive = slower / bigger)"""
+    if not baseline:
+        return 0.0
+    return (current - baseline) / baseline * 100
+
+def print_report(result, baseline, threshold):
+    """Print the stage table, with deltas against the baseline when there is one"""
+    subset = result['subset']
+    base = baseline['subset'] if baseline else None
+    
+    print(f"\n⏱️  Subset: {subset['chapters']} chapters -> {subset['images']} images "
+          f"(median of {result['repeat']} runs, {result['meta']['output_format']})")
+    print(f"   {'stage':<8} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for stage in STAGES + ('total',):
+        current = subset['total'] if stage == 'total' else subset['stages'][stage]
+        if base:
+            previous = base['total'] if stage == 'total' else base['stages'][stage]
+            delta = change(current, previous)
+            mark = "❌" if delta > threshold else ("✅" if delta < -threshold else "  ")
+            print(f"   {stage:<8} {current * 1000:>10.1f} {previous * 1000:>10.1f} {delta:>+7.1f}% {mark}")
+        else:
+            print(f"   {stage:<8} {current * 1000:>10.1f}")
+    
+    print(f"\n🖼️  {subset['images_per_second']:.1f} images/s, peak RSS {subset['peak_rss_mb']:.0f} MB", end="")
+    if base:
+        print(f" (baseline {base['images_per_second']:.1f} images/s, {base['peak_rss_mb']:.0f} MB)")
+    else:
+        print()
+    
+    if 'full' in result:
+        full = result['full']
+        print(f"🏁 Full run: {full['images']} images in {full['total']:.1f}s "
+              f"({full['images_per_second']:.1f} images/s, peak RSS {full['peak_rss_mb']:.0f} MB)", end="")
+        if baseline and 'full' in baseline:
+            print(f" - baseline {baseline['full']['total']:.1f}s ({change(full['total'], baseline['full']['total']):+.1f}%)")
+        else:
+            print()
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the Mishnah rendering pipeline")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs over the subset (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--full", action="store_true",
+                        help="also time a full generate_all_mishnah_images.py run over the whole corpus")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE,
+                        help=f"baseline file to compare with or save to (default: {BASELINE_FILE})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"percent slowdown of the total that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--font", metavar="PATH",
+                        help="Hebrew TrueType/OpenType font to render with (default: auto-detect)")
+    return parser.parse_args()
+
+def main():
+    """Run the benchmark, compare with the baseline and optionally store a new one"""
+    args = parse_args()
+    
+    if args.font:
+        configure_font(args.font)
+    if not MISHNAYOT_DIR.is_dir():
+        raise SystemExit(f"❌ {MISHNAYOT_DIR}/ not found - run this from tanya-web/")
+    
+    print(f"🧪 Benchmarking {len(BENCH_CHAPTERS)} chapters from {MISHNAYOT_DIR}/ ...")
+    result = {
+        'meta': dict(machine_info(), output_format=renderer.OUTPUT_FORMAT),
+        'repeat': args.repeat,
+        'subset': run_subset(args.repeat),
+    }
+    if args.full:
+        print("🏁 Timing a full generate_all_mishnah_images.py run ...")
+        result['full'] = run_full()
+    
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta') != result['meta']:
+            print(f"⚠️  {args.baseline} was recorded with a different setup - comparisons may not mean much")
+            print(f"   baseline: {baseline.get('meta')}")
+            print(f"   now:      {result['meta']}")
+        if baseline['subset'].get('chapter_list') != result['subset']['chapter_list']:
+            print(f"⚠️  {args.baseline} timed a different set of chapters - re-save it with --save-baseline")
+    
+    print_report(result, baseline, args.threshold)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.baseline}")
+        return
+    
+    if baseline and change(result['subset']['total'], baseline['subset']['total']) > args.threshold:
+        print(f"\n❌ Total time regressed by more than {args.threshold:.0f}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Content-addressed build cache for the Mishnah image renderers
+
+Every output image is keyed by a SHA-256 digest of its input text and the
+render configuration (layout constants, font file, Pillow version and the
+renderer source itself). The digests of the last successful build are kept
+in mishnah_build_cache.json beside the output directories, so a rerun only
+redraws images whose digest changed or whose file is missing - e.g. after a
+small upstream text correction or a single-tractate refetch.
+
+The paths rendered by the last run are written to mishnah_images_changed.txt
+so an upload can ship just those files:
+    xargs -a mishnah_images_changed.txt -I{} aws s3 cp {} s3://<bucket>/{}
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+from pathlib import Path
+
+BUILD_CACHE_FILE = Path("mishnah_build_cache.json")
+CHANGED_LIST_FILE = Path("mishnah_images_changed.txt")
+CACHE_VERSION = 1
+
+def file_digest(path):
+    """SHA-256 of a file's contents, or None if it doesn't exist"""
+    if not path or not os.path.exists(path):
+        return None
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_digest(*objects):
+    """SHA-256 of the source of some functions and classes, so a cache can be keyed on just the code that shapes it"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode('utf-8'))
+    return digest.hexdigest()
+
+def config_fingerprint(config):
+    """Digest of the render configuration - any change invalidates every output"""
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def output_digest(fingerprint, *parts):
+    """Digest of one output image: render configuration plus everything drawn on it"""
+    payload = json.dumps([fingerprint, *parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Continuation page of a paginated output: N_2.png is page 2 of N.png
+CONTINUATION_PAGE = re.compile(r'(.+)_(\d+)(\.\w+)')
+
+class BuildCache:
+    """Output path -> input digest of the last build that wrote it, plus the page count of paginated outputs"""
+    
+    def __init__(self, path=BUILD_CACHE_FILE):
+        self.path = Path(path)
+        self.outputs = {}
+        self.pages = {}
+        
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️  Ignoring unreadable build cache {self.path}")
+                data = {}
+            if data.get('version') == CACHE_VERSION:
+                self.outputs = data.get('outputs', {})
+                # Caches from before page counts were kept: find out from the directories, once
+                self.pages = data['pages'] if 'pages' in data else None
+    
+    def is_fresh(self, output_path, digest):
+        """Whether output_path exists and was built from exactly this input"""
+        return self.outputs.get(str(output_path)) == digest and Path(output_path).exists()
+    
+    def record(self, output_path, digest, pages=1):
+        """Remember that output_path now holds the render of digest, over `pages` pages"""
+        self.outputs[str(output_path)] = digest
+        if self.pages is None:
+            self.scan_pages()
+        if pages > 1:
+            self.pages[str(output_path)] = pages
+        else:
+            self.pages.pop(str(output_path), None)
+    
+    def page_count(self, output_path):
+        """Pages the last build wrote for output_path (1 unless it was paginated)"""
+        if self.pages is None:
+            self.scan_pages()
+        return self.pages.get(str(output_path), 1)
+    
+    def scan_pages(self):
+        """Page counts from the continuation pages on disk, with one listing per output directory"""
+        self.pages = {}
+        for directory in {Path(output).parent for output in self.outputs}:
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory):
+                match = CONTINUATION_PAGE.fullmatch(entry.name)
+                if match:
+                    output = str(directory / f"{match.group(1)}{match.group(3)}")
+                    self.pages[output] = max(self.pages.get(output, 1), int(match.group(2)))
+    
+    def forget(self):
+        """Drop every entry (forces a full rebuild)"""
+        self.outputs = {}
+    
+    def save(self):
+        """Write the cache atomically, so an interrupted run keeps what it finished"""
+        if self.pages is None:
+            self.scan_pages()
+        payload = json.dumps({'version': CACHE_VERSION, 'outputs': self.outputs, 'pages': self.pages},
+                             sort_keys=True, indent=0).encode('utf-8')
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+def natural_key(path):
+    """Sort key putting numbered outputs in numeric order (2.png before 10.png)"""
+    path = Path(path)
+    parts = re.split(r'(\d+)', path.name)
+    return path.parent.name, [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in parts]
+
+def write_changed_list(paths, list_path=CHANGED_LIST_FILE):
+    """Write the outputs rendered by this run, one path per line, for incremental uploads"""
+    with open(list_path, 'w', encoding='utf-8') as f:
+        # Natural order: 2.png, 10.png, 10_2.png (continuation pages)
+        for path in sorted(paths, key=natural_key):
+            f.write(f"{path}\n")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Sharded bundles for the Mishnah image and PDF sets
+
+Instead of thousands of small files (one S3 object and one request each),
+outputs are streamed into a few large, uncompressed shards with a JSON
+offset index beside them:
+
+    mishnah_bundles/mishnah_images_single-000-3f9c2a1b7e40.tar
+    mishnah_bundles/mishnah_images_single-001-c81d04e5a9f2.tar
+    mishnah_bundles/mishnah_images_single.index.json
+
+The index maps every file name to [shard, offset, length], where offset is
+the position of the file's bytes inside the shard. A client can fetch one
+page with a single HTTP Range request:
+
+    Range: bytes=<offset>-<offset + length - 1>
+
+Formats: tar and zip (stored, no compression) can still be unpacked with
+standard tools; pack is a bare concatenation with no headers at all.
+
+Shard names end in a digest of their contents, so a rebuilt shard never
+reuses the name of a published one: an index fetched before a rebuild keeps
+pointing at the bytes it describes. Shards are written under temporary
+names and only renamed into place, with the index written last, when the
+bundle is closed after a successful run. Shards referenced by neither the
+new index nor the one it replaced are deleted after that, so clients and
+caches holding the previous index keep working for one more generation. A
+failed or interrupted run discards its temporary shards and leaves the last
+published bundle as it was.
+
+Usage:
+    python3 scripts/mishnah_bundles.py mishnah_pdfs_single           # bundle an existing directory
+    python3 scripts/mishnah_bundles.py mishnah_pdfs_single --format zip --shard-size 32
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+from mishnah_build_cache import file_digest, natural_key
+
+BUNDLE_DIR = Path("mishnah_bundles")
+BUNDLE_FORMATS = ("tar", "zip", "pack")
+DEFAULT_SHARD_SIZE = 64 * 1024 * 1024
+INDEX_VERSION = 1
+
+class BundleWriter:
+    """Streams named blobs into size-limited shards and records where each one landed"""
+    
+    def __init__(self, name, output_dir=BUNDLE_DIR, bundle_format="tar", shard_size=DEFAULT_SHARD_SIZE):
+        if bundle_format not in BUNDLE_FORMATS:
+            raise ValueError(f"unknown bundle format {bundle_format!r} (expected one of {', '.join(BUNDLE_FORMATS)})")
+        
+        self.name = name
+        self.output_dir = Path(output_dir)
+        self.format = bundle_format
+        self.shard_size = shard_size
+        self.shards = []  # published shard names, known once the bundle is closed
+        self.files = {}
+        self.lock = threading.Lock()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._file = None
+        self._archive = None
+        self._shard_bytes = 0
+        self._shard_count = 0
+    
+    def _shard_name(self, index, digest):
+        return f"{self.name}-{index:03d}-{digest[:12]}.{self.format}"
+    
+    def _temp_path(self, index):
+        return self.output_dir / f".{self.name}-{index:03d}.{self.format}.{os.getpid()}.tmp"
+    
+    def _open_shard(self):
+        self._file = open(self._temp_path(self._shard_count), 'wb')
+        self._shard_count += 1
+        if self.format == "tar":
+            self._archive = tarfile.open(fileobj=self._file, mode='w', format=tarfile.PAX_FORMAT)
+        elif self.format == "zip":
+            self._archive = zipfile.ZipFile(self._file, mode='w', compression=zipfile.ZIP_STORED)
+        self._shard_bytes = 0
+    
+    def _close_shard(self):
+        if self._archive is not None:
+            self._archive.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._archive = None
+    
+    def add(self, file_name, data):
+        """Append one file to the current shard, starting a new shard when it would overflow"""
+        with self.lock:
+            if self._file is None or (self._shard_bytes and self._shard_bytes + len(data) > self.shard_size):
+                self._close_shard()
+                self._open_shard()
+            
+            if self.format == "tar":
+                info = tarfile.TarInfo(file_name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                self._archive.addfile(info, io.BytesIO(data))
+                # The data ends the member, padded out to whole blocks
+                blocks = -(-len(data) // tarfile.BLOCKSIZE)
+                offset = self._archive.offset - blocks * tarfile.BLOCKSIZE
+            elif self.format == "zip":
+                info = zipfile.ZipInfo(file_name, date_time=time.localtime()[:6])
+                self._archive.writestr(info, data)
+                offset = self._file.tell() - len(data)
+            else:
+                offset = self._file.tell()
+                self._file.write(data)
+            
+            self._shard_bytes += len(data)
+            self.files[file_name] = [self._shard_count - 1, offset, len(data)]
+    
+    def index_path(self):
+        """Path of this bundle's offset index"""
+        return self.output_dir / f"{self.name}.index.json"
+    
+    def published_shards(self):
+        """Shard names listed by the bundle's current index, if it has one"""
+        try:
+            with open(self.index_path(), 'r', encoding='utf-8') as f:
+                return set(json.load(f)['shards'])
+        except (OSError, ValueError, KeyError):
+            return set()
+    
+    def close(self):
+        """Finish the last shard, publish the shards under content-addressed names, write the index
+        and only then drop shards of older generations"""
+        with self.lock:
+            self._close_shard()
+            previous = self.published_shards()
+            
+            self.shards = []
+            for index in range(self._shard_count):
+                temp_path = self._temp_path(index)
+                name = self._shard_name(index, file_digest(temp_path))
+                os.replace(temp_path, self.output_dir / name)
+                self.shards.append(name)
+            
+            index = {
+                'version': INDEX_VERSION,
+                'format': self.format,
+                'shards': self.shards,
+                'files': self.files,
+            }
+            payload = json.dumps(index, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            tmp_path = self.index_path().with_name(f".{self.index_path().name}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path())
+            
+            # Keep the generation the old index points at; anything older is unreachable
+            keep = previous | set(self.shards)
+            shard_name = re.compile(rf"{re.escape(self.name)}-\d{{3}}(-[0-9a-f]{{12}})?\.{self.format}")
+            for path in self.output_dir.glob(f"{self.name}-*.{self.format}"):
+                if shard_name.fullmatch(path.name) and path.name not in keep:
+                    path.unlink()
+        
+        return [self.output_dir / shard for shard in self.shards] + [self.index_path()]
+    
+    def discard(self):
+        """Abandon the bundle: delete this run's temporary shards, keeping the published bundle"""
+        with self.lock:
+            self._close_shard()
+            for index in range(self._shard_count):
+                self._temp_path(index).unlink(missing_ok=True)
+            self._shard_count = 0
+            self.shards = []
+            self.files = {}
+
+class BundleSet:
+    """One BundleWriter per output directory, so chapter and single images land in separate bundles"""
+    
+    def __init__(self, output_dir=BUNDLE_DIR, bundle_format="tar", shard_size=DEFAULT_SHARD_SIZE):
+        self.output_dir = output_dir
+        self.format = bundle_format
+        self.shard_size = shard_size
+        self.writers = {}
+    
+    def add(self, path, data):
+        """Add the file that would have been written to `path`"""
+        path = Path(path)
+        bundle_name = path.parent.name
+        if bundle_name not in self.writers:
+            self.writers[bundle_name] = BundleWriter(bundle_name, self.output_dir, self.format, self.shard_size)
+        self.writers[bundle_name].add(path.name, data)
+    
+    def close(self):
+        """Close every bundle, returning all shard and index paths written"""
+        written = []
+        for writer in self.writers.values():
+            written += writer.close()
+        return written
+    
+    def discard(self):
+        """Abandon every bundle of a failed run"""
+        for writer in self.writers.values():
+            writer.discard()
+
+def read_entry(index_path, file_name):
+    """Read one file back out of a bundle through its index (what a client's Range request returns)"""
+    index_path = Path(index_path)
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    
+    shard, offset, length = index['files'][file_name]
+    with open(index_path.parent / index['shards'][shard], 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+def bundle_directory(source_dir, output_dir=BUNDLE_DIR, bundle_format="tar", shard_size=DEFAULT_SHARD_SIZE):
+    """Stream every file of an existing output directory into a bundle"""
+    source_dir = Path(source_dir)
+    writer = BundleWriter(source_dir.name, output_dir, bundle_format, shard_size)
+    
+    files = sorted((p for p in source_dir.iterdir() if p.is_file()), key=natural_key)
+    try:
+        for path in files:
+            writer.add(path.name, path.read_bytes())
+    except BaseException:
+        writer.discard()
+        raise
+    
+    writer.close()
+    return writer, len(files)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Pack a Mishnah output directory into sharded bundles")
+    parser.add_argument("directories", nargs="+", type=Path,
+                        help="output directories to bundle, e.g. mishnah_pdfs_single")
+    parser.add_argument("--format", choices=BUNDLE_FORMATS, default="tar",
+                        help="shard format (default: tar)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE // (1024 * 1024), metavar="MB",
+                        help=f"maximum shard size in MB (default: {DEFAULT_SHARD_SIZE // (1024 * 1024)})")
+    parser.add_argument("--output", type=Path, default=BUNDLE_DIR,
+                        help=f"where to write shards and indexes (default: {BUNDLE_DIR})")
+    return parser.parse_args()
+
+def main():
+    """Bundle each directory given on the command line"""
+    args = parse_args()
+    
+    for source_dir in args.directories:
+        if not source_dir.is_dir():
+            print(f"❌ {source_dir} is not a directory")
+            continue
+        
+        writer, count = bundle_directory(source_dir, args.output, args.format, args.shard_size * 1024 * 1024)
+        total = sum((args.output / shard).stat().st_size for shard in writer.shards)
+        print(f"📦 {source_dir}: {count} files -> {len(writer.shards)} shard(s), {total / 1024 / 1024:.1f} MB")
+        print(f"   Index: {writer.index_path()}")
+
+if __name__ == "__main__":
+    main()
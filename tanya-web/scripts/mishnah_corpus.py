@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+Build and read the compact Mishnah corpus store
+
+The Sefaria chapter JSONs in mishnayot_texts/ are ~11 MB of pretty-printed
+API responses, while the renderers only need the Hebrew mishnah strings and
+the tractate titles. This module normalises them into a single binary file:
+
+    header      magic, version, flags, record counts and table offsets
+    tractates   per tractate: first chapter, chapter count, name, Hebrew title
+    chapters    per chapter: tractate index, chapter number, first mishnah,
+                mishnah count, output number
+    numbered    per output chapter number: chapter index
+    mishnayot   per mishnah: offset and length of its UTF-8 text, chapter index
+    strings     the UTF-8 string data
+
+Every table has fixed-size records, so the file is memory-mapped and any
+chapter or mishnah is located without parsing the rest of it.
+
+Mishnah texts are normalised once, while the corpus is built: Sefaria's
+HTML tags (topic links, italics) are removed, entities decoded and
+whitespace collapsed in a single pass, so the renderers get clean text and
+never run a regex per image. --strip-nikud also drops vowel points and
+cantillation marks.
+
+The header also records a SHA-256 digest of the chapter files it was built
+from. Opening the default corpus (and iter_chapters) checks it against
+mishnayot_texts/ and rebuilds the corpus, keeping its nikud setting, when a
+refetch has changed the tree, so the renderers, PDFs, pipeline and search
+never quietly serve old text. The check is cheap: the header also keeps a
+digest of every chapter file's name, size and mtime, and file contents are
+only hashed when those have changed (and the stat digest is then updated in
+place if the contents turn out to be the same, e.g. after a fresh checkout). A corpus shipped without the JSON tree is used
+as it is. --source json (mishnah_pipeline.py, generate_all_mishnah_pdfs.py)
+bypasses the corpus entirely.
+
+Output numbers are the global sequential numbers used for the rendered
+files ({n}.png / {n}.pdf): chapters with text are numbered 1..525 and
+mishnayot 1..N in traditional order, so mishnah number n is simply the
+n-th mishnah record.
+
+Usage:
+    python3 scripts/mishnah_corpus.py                # rebuild mishnah_corpus.bin
+    python3 scripts/mishnah_corpus.py --strip-nikud  # rebuild it without nikud
+    python3 scripts/mishnah_corpus.py --chapter 12   # show what chapters/12.png holds
+    python3 scripts/mishnah_corpus.py --mishnah 100  # show what single/100.png holds
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+
+from mishnah_profiling import stage
+
+# Files
+MISHNAYOT_DIR = Path("mishnayot_texts")
+CORPUS_FILE = Path("mishnah_corpus.bin")
+
+# Binary layout (little-endian)
+MAGIC = b"MSHNCRPS"
+VERSION = 5
+HEADER = struct.Struct("<8sIIIIIIQQQQQ32s32s")  # magic, version, flags, counts, table offsets, source and stat digests
+STAT_DIGEST_OFFSET = HEADER.size - 32
+FLAG_NIKUD_STRIPPED = 1
+TRACTATE_RECORD = struct.Struct("<IIIIII")  # first chapter, count, name off/len, title off/len
+CHAPTER_RECORD = struct.Struct("<IIIII")  # tractate index, chapter number, first mishnah, count, output number
+NUMBERED_RECORD = struct.Struct("<I")  # chapter index
+MISHNAH_RECORD = struct.Struct("<III")  # text offset, length, chapter index
+
+# Traditional Mishnah order (6 Sedarim)
+MISHNAH_TRACTATES = [
+    # סדר זרעים
+    "Mishnah_Berakhot", "Mishnah_Peah", "Mishnah_Demai", "Mishnah_Kilayim",
+    "Mishnah_Sheviit", "Mishnah_Terumot", "Mishnah_Maasrot", "Mishnah_Maaser_Sheni",
+    "Mishnah_Challah", "Mishnah_Orlah", "Mishnah_Bikkurim",
+    # סדר מועד
+    "Mishnah_Shabbat", "Mishnah_Eruvin", "Mishnah_Pesachim", "Mishnah_Shekalim",
+    "Mishnah_Yoma", "Mishnah_Sukkah", "Mishnah_Beitzah", "Mishnah_Rosh_Hashanah",
+    "Mishnah_Taanit", "Mishnah_Megillah", "Mishnah_Moed_Katan", "Mishnah_Chagigah",
+    # סדר נשים
+    "Mishnah_Yevamot", "Mishnah_Ketubot", "Mishnah_Nedarim", "Mishnah_Nazir",
+    "Mishnah_Sotah", "Mishnah_Gittin", "Mishnah_Kiddushin",
+    # סדר נזיקין
+    "Mishnah_Bava_Kamma", "Mishnah_Bava_Metzia", "Mishnah_Bava_Batra",
+    "Mishnah_Sanhedrin", "Mishnah_Makkot", "Mishnah_Shevuot", "Mishnah_Eduyot",
+    "Mishnah_Avodah_Zarah", "Mishnah_Avot", "Mishnah_Horayot",
+    # סדר קודשים
+    "Mishnah_Zevachim", "Mishnah_Menachot", "Mishnah_Chullin", "Mishnah_Bekhorot",
+    "Mishnah_Arakhin", "Mishnah_Temurah", "Mishnah_Keritot", "Mishnah_Meilah",
+    "Mishnah_Tamid", "Mishnah_Middot", "Mishnah_Kinnim",
+    # סדר טהרות
+    "Mishnah_Kelim", "Mishnah_Oholot", "Mishnah_Negaim", "Mishnah_Parah",
+    "Mishnah_Tahorot", "Mishnah_Mikvaot", "Mishnah_Niddah", "Mishnah_Makhshirin",
+    "Mishnah_Zavim", "Mishnah_Tevul_Yom", "Mishnah_Yadayim", "Mishnah_Oktzin",
+]
+
+# Hebrew tractate names mapping
+TRACTATE_HEBREW = {
+    "Mishnah_Berakhot": "ברכות",
+    "Mishnah_Peah": "פאה",
+    "Mishnah_Demai": "דמאי",
+    "Mishnah_Kilayim": "כלאים",
+    "Mishnah_Sheviit": "שביעית",
+    "Mishnah_Terumot": "תרומות",
+    "Mishnah_Maasrot": "מעשרות",
+    "Mishnah_Maaser_Sheni": "מעשר שני",
+    "Mishnah_Challah": "חלה",
+    "Mishnah_Orlah": "ערלה",
+    "Mishnah_Bikkurim": "ביכורים",
+    "Mishnah_Shabbat": "שבת",
+    "Mishnah_Eruvin": "עירובין",
+    "Mishnah_Pesachim": "פסחים",
+    "Mishnah_Shekalim": "שקלים",
+    "Mishnah_Yoma": "יומא",
+    "Mishnah_Sukkah": "סוכה",
+    "Mishnah_Beitzah": "ביצה",
+    "Mishnah_Rosh_Hashanah": "ראש השנה",
+    "Mishnah_Taanit": "תענית",
+    "Mishnah_Megillah": "מגילה",
+    "Mishnah_Moed_Katan": "מועד קטן",
+    "Mishnah_Chagigah": "חגיגה",
+    "Mishnah_Yevamot": "יבמות",
+    "Mishnah_Ketubot": "כתובות",
+    "Mishnah_Nedarim": "נדרים",
+    "Mishnah_Nazir": "נזיר",
+    "Mishnah_Sotah": "סוטה",
+    "Mishnah_Gittin": "גיטין",
+    "Mishnah_Kiddushin": "קידושין",
+    "Mishnah_Bava_Kamma": "בבא קמא",
+    "Mishnah_Bava_Metzia": "בבא מציעא",
+    "Mishnah_Bava_Batra": "בבא בתרא",
+    "Mishnah_Sanhedrin": "סנהדרין",
+    "Mishnah_Makkot": "מכות",
+    "Mishnah_Shevuot": "שבועות",
+    "Mishnah_Eduyot": "עדיות",
+    "Mishnah_Avodah_Zarah": "עבודה זרה",
+    "Mishnah_Avot": "אבות",
+    "Mishnah_Horayot": "הוריות",
+    "Mishnah_Zevachim": "זבחים",
+    "Mishnah_Menachot": "מנחות",
+    "Mishnah_Chullin": "חולין",
+    "Mishnah_Bekhorot": "בכורות",
+    "Mishnah_Arakhin": "ערכין",
+    "Mishnah_Temurah": "תמורה",
+    "Mishnah_Keritot": "כריתות",
+    "Mishnah_Meilah": "מעילה",
+    "Mishnah_Tamid": "תמיד",
+    "Mishnah_Middot": "מידות",
+    "Mishnah_Kinnim": "קינים",
+    "Mishnah_Kelim": "כלים",
+    "Mishnah_Oholot": "אהלות",
+    "Mishnah_Negaim": "נגעים",
+    "Mishnah_Parah": "פרה",
+    "Mishnah_Tahorot": "טהרות",
+    "Mishnah_Mikvaot": "מקואות",
+    "Mishnah_Niddah": "נדה",
+    "Mishnah_Makhshirin": "מכשירין",
+    "Mishnah_Zavim": "זבים",
+    "Mishnah_Tevul_Yom": "טבול יום",
+    "Mishnah_Yadayim": "ידיים",
+    "Mishnah_Oktzin": "עוקצין",
+}
+
+def hebrew_title(tractate_name):
+    """Hebrew name of a tractate, falling back to the English slug"""
+    return TRACTATE_HEBREW.get(tractate_name, tractate_name.replace("Mishnah_", ""))
+
+# Vowel points and cantillation marks - maqaf, paseq, sof pasuq and nun hafukha are punctuation and stay
+NIKUD = [*range(0x0591, 0x05be), 0x05bf, 0x05c1, 0x05c2, 0x05c4, 0x05c5, 0x05c7]
+NIKUD_TABLE = dict.fromkeys(NIKUD)
+
+# Tags, plus the entities that only ever stand for a space
+MARKUP = r'(?:<[^>]*>|&(?:nbsp|ensp|emsp|thinsp|#160|#[xX][aA]0);)'
+TAG = re.compile(r'<[^>]*>')
+
+# One token per thing to rewrite - plain text and single spaces never match, so they are copied as is
+TEXT_TOKENS = (rf'(?P<markup>\s*{MARKUP}(?:\s*{MARKUP})*\s*)'
+               r'|(?P<space>\s{2,}|[^\S ])'
+               r'|(?P<entity>&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);)')
+
+# The lookahead on each token's first character lets the scanner skip ordinary text quickly
+TEXT_TOKENIZER = re.compile(rf'(?=[\s<&])(?:{TEXT_TOKENS})')
+
+def _normalized_token(match):
+    kind = match.lastgroup
+    if kind == 'markup':
+        # A space if anything besides tags (whitespace, &nbsp;) is in the run, else nothing ("a<b>c" -> "ac")
+        return ' ' if TAG.sub('', match.group()) else ''
+    if kind == 'entity':
+        return html.unescape(match.group())
+    return ' '
+
+def normalize_mishnah(text, strip_nikud=False):
+    """Clean a raw Sefaria mishnah in one pass: drop tags, decode entities, collapse whitespace
+    (and drop nikud, a str.translate)"""
+    if strip_nikud:
+        text = text.translate(NIKUD_TABLE)
+    return TEXT_TOKENIZER.sub(_normalized_token, text).strip()
+
+def extract_text_from_chapter(chapter_data):
+    """Extract Hebrew text from chapter JSON"""
+    try:
+        if 'versions' in chapter_data:
+            for version in chapter_data['versions']:
+                if version.get('language') == 'he':
+                    return version.get('text', [])
+        
+        if 'he' in chapter_data:
+            return chapter_data['he']
+        
+        return []
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+        return []
+
+def chapter_files(tractate_dir):
+    """Chapter JSON files of a tractate in numeric chapter order"""
+    files = tractate_dir.glob("chapter_*.json")
+    return sorted(files, key=lambda f: int(f.stem.replace("chapter_", "")))
+
+def chapter_texts(chapter_data, strip_nikud=False):
+    """Normalised mishnah texts of one Sefaria chapter response"""
+    with stage('extract'):
+        mishnayot_texts = extract_text_from_chapter(chapter_data)
+    with stage('strip'):
+        return [normalize_mishnah(text, strip_nikud) for text in mishnayot_texts]
+
+def iter_json_chapters(source_dir=MISHNAYOT_DIR, strip_nikud=False, tractates=None):
+    """Yield (tractate_name, chapter_num, mishnayot_texts) from the raw Sefaria JSON tree, normalised"""
+    for tractate_name in MISHNAH_TRACTATES:
+        if tractates is not None and tractate_name not in tractates:
+            continue
+        tractate_dir = source_dir / tractate_name
+        
+        if not tractate_dir.exists() or not tractate_dir.is_dir():
+            print(f"⚠️  Skipping {tractate_name} - not found")
+            continue
+        
+        for chapter_file in chapter_files(tractate_dir):
+            chapter_num = int(chapter_file.stem.replace("chapter_", ""))
+            
+            with stage('parse'), open(chapter_file, 'r', encoding='utf-8') as f:
+                chapter_data = json.load(f)
+            yield tractate_name, chapter_num, chapter_texts(chapter_data, strip_nikud)
+
+def source_files(source_dir):
+    """(tractate_name, chapter file) of every chapter file a corpus is built from, in corpus order"""
+    for tractate_name in MISHNAH_TRACTATES:
+        tractate_dir = source_dir / tractate_name
+        if tractate_dir.is_dir():
+            for chapter_file in chapter_files(tractate_dir):
+                yield tractate_name, chapter_file
+
+def source_digest(source_dir=MISHNAYOT_DIR):
+    """SHA-256 of every chapter file a corpus is built from (names and contents), or None without a tree"""
+    source_dir = Path(source_dir)
+    if not source_dir.is_dir():
+        return None
+    
+    digest = hashlib.sha256()
+    for tractate_name, chapter_file in source_files(source_dir):
+        data = chapter_file.read_bytes()
+        digest.update(f"{tractate_name}/{chapter_file.name}:{len(data)}\n".encode('utf-8'))
+        digest.update(data)
+    return digest.digest()
+
+def source_stat_digest(source_dir=MISHNAYOT_DIR):
+    """SHA-256 of the name, size and mtime of every chapter file - the quick freshness check - or None without a tree"""
+    source_dir = Path(source_dir)
+    if not source_dir.is_dir():
+        return None
+    
+    digest = hashlib.sha256()
+    for tractate_name, chapter_file in source_files(source_dir):
+        stat = chapter_file.stat()
+        digest.update(f"{tractate_name}/{chapter_file.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.digest()
+
+def build_corpus(source_dir=MISHNAYOT_DIR, output_path=CORPUS_FILE, strip_nikud=False):
+    """Normalise the JSON tree into the compact corpus file and return its stats"""
+    strings = bytearray()
+    tractate_records = []
+    chapter_records = []
+    numbered_records = []
+    mishnah_records = []
+    
+    def add_string(text):
+        data = text.encode('utf-8')
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+    
+    # Digest first, so a tree changed mid-build is caught by the next freshness check
+    digest = source_digest(source_dir) or bytes(32)
+    stat_digest = source_stat_digest(source_dir) or bytes(32)
+    
+    current_tractate = None
+    for tractate_name, chapter_num, mishnayot_texts in iter_json_chapters(source_dir, strip_nikud):
+        if tractate_name != current_tractate:
+            current_tractate = tractate_name
+            name = add_string(tractate_name)
+            title = add_string(hebrew_title(tractate_name))
+            tractate_records.append([len(chapter_records), 0, *name, *title])
+        
+        chapter_index = len(chapter_records)
+        tractate_records[-1][1] += 1
+        
+        # Only chapters with text get an output number (matches the renderers' chapter_counter)
+        output_number = 0
+        if mishnayot_texts:
+            numbered_records.append((chapter_index,))
+            output_number = len(numbered_records)
+        
+        chapter_records.append((len(tractate_records) - 1, chapter_num, len(mishnah_records),
+                                len(mishnayot_texts), output_number))
+        for mishnah_text in mishnayot_texts:
+            mishnah_records.append((*add_string(mishnah_text), chapter_index))
+    
+    # Tables are laid out back to back after the header
+    tractates_offset = HEADER.size
+    chapters_offset = tractates_offset + TRACTATE_RECORD.size * len(tractate_records)
+    numbered_offset = chapters_offset + CHAPTER_RECORD.size * len(chapter_records)
+    mishnayot_offset = numbered_offset + NUMBERED_RECORD.size * len(numbered_records)
+    strings_offset = mishnayot_offset + MISHNAH_RECORD.size * len(mishnah_records)
+    
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        flags = FLAG_NIKUD_STRIPPED if strip_nikud else 0
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(tractate_records), len(chapter_records),
+                            len(numbered_records), len(mishnah_records), tractates_offset,
+                            chapters_offset, numbered_offset, mishnayot_offset, strings_offset, digest,
+                            stat_digest))
+        for table, record_struct in ((tractate_records, TRACTATE_RECORD), (chapter_records, CHAPTER_RECORD),
+                                     (numbered_records, NUMBERED_RECORD), (mishnah_records, MISHNAH_RECORD)):
+            for record in table:
+                f.write(record_struct.pack(*record))
+        f.write(strings)
+    os.replace(tmp_path, output_path)
+    
+    return {
+        'tractates': len(tractate_records),
+        'chapters': len(chapter_records),
+        'numbered_chapters': len(numbered_records),
+        'mishnayot': len(mishnah_records),
+        'bytes': strings_offset + len(strings),
+    }
+
+class MishnahCorpus:
+    """Read-only, memory-mapped view of a corpus file built by build_corpus
+    
+    All lookups are constant time: they index straight into the fixed-size
+    tables instead of scanning the tree or parsing JSON.
+    """
+    
+    def __init__(self, path=CORPUS_FILE):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version = struct.unpack_from("<8sI", self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} Mishnah corpus - rebuild it")
+        
+        (_, _, flags, self.tractate_count, self.chapter_count, self.numbered_count, self.mishnah_count,
+         self.tractates_offset, self.chapters_offset, self.numbered_offset, self.mishnayot_offset,
+         self.strings_offset, self.source_digest, self.stat_digest) = HEADER.unpack_from(self.data, 0)
+        self.nikud_stripped = bool(flags & FLAG_NIKUD_STRIPPED)
+        
+        # 63 entries - cheap to keep as a dict for name lookups
+        self.tractate_index = {}
+        for index in range(self.tractate_count):
+            _, _, name_off, name_len, _, _ = self._tractate(index)
+            self.tractate_index[self._string(name_off, name_len)] = index
+    
+    def close(self):
+        self.data.close()
+    
+    def _string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.data[start:start + length].decode('utf-8')
+    
+    def _tractate(self, index):
+        return TRACTATE_RECORD.unpack_from(self.data, self.tractates_offset + index * TRACTATE_RECORD.size)
+    
+    def _chapter(self, index):
+        return CHAPTER_RECORD.unpack_from(self.data, self.chapters_offset + index * CHAPTER_RECORD.size)
+    
+    def _mishnah_record(self, index):
+        return MISHNAH_RECORD.unpack_from(self.data, self.mishnayot_offset + index * MISHNAH_RECORD.size)
+    
+    def _mishnah(self, index):
+        offset, length, _ = self._mishnah_record(index)
+        return self._string(offset, length)
+    
+    def _tractate_name(self, index):
+        _, _, name_off, name_len, _, _ = self._tractate(index)
+        return self._string(name_off, name_len)
+    
+    def _chapter_index(self, tractate_name, chapter_num):
+        """Index of a chapter record; chapters are stored 1..n so this is direct arithmetic"""
+        if not tractate_name.startswith("Mishnah_"):
+            tractate_name = f"Mishnah_{tractate_name}"
+        if tractate_name not in self.tractate_index:
+            raise KeyError(f"Unknown tractate: {tractate_name}")
+        
+        first_chapter, chapter_count, _, _, _, _ = self._tractate(self.tractate_index[tractate_name])
+        chapter_index = first_chapter + chapter_num - 1
+        if 1 <= chapter_num <= chapter_count and self._chapter(chapter_index)[1] == chapter_num:
+            return chapter_index
+        
+        # Gap in the source tree (a chapter file was missing) - fall back to a scan of this tractate
+        for chapter_index in range(first_chapter, first_chapter + chapter_count):
+            if self._chapter(chapter_index)[1] == chapter_num:
+                return chapter_index
+        raise KeyError(f"{tractate_name} has no chapter {chapter_num}")
+    
+    def tractates(self):
+        """List of (tractate_name, hebrew_title) in corpus order"""
+        result = []
+        for index in range(self.tractate_count):
+            _, _, name_off, name_len, title_off, title_len = self._tractate(index)
+            result.append((self._string(name_off, name_len), self._string(title_off, title_len)))
+        return result
+    
+    def tractate_counts(self):
+        """Dict of tractate_name -> (chapters with text, mishnayot), in corpus order"""
+        counts = {}
+        for tractate_index in range(self.tractate_count):
+            first_chapter, chapter_count, name_off, name_len, _, _ = self._tractate(tractate_index)
+            chapters = [self._chapter(i) for i in range(first_chapter, first_chapter + chapter_count)]
+            counts[self._string(name_off, name_len)] = (sum(1 for chapter in chapters if chapter[4]),
+                                                        sum(chapter[3] for chapter in chapters))
+        return counts
+    
+    def iter_chapters(self, tractates=None):
+        """Yield (tractate_name, chapter_num, mishnayot_texts) in corpus order (only `tractates`, if given)"""
+        for tractate_index in range(self.tractate_count):
+            first_chapter, chapter_count, name_off, name_len, _, _ = self._tractate(tractate_index)
+            tractate_name = self._string(name_off, name_len)
+            if tractates is not None and tractate_name not in tractates:
+                continue
+            
+            for chapter_index in range(first_chapter, first_chapter + chapter_count):
+                with stage('extract'):
+                    _, chapter_num, first_mishnah, mishnah_count, _ = self._chapter(chapter_index)
+                    mishnayot_texts = [self._mishnah(i) for i in range(first_mishnah, first_mishnah + mishnah_count)]
+                yield tractate_name, chapter_num, mishnayot_texts
+    
+    def get_chapter(self, tractate_name, chapter_num):
+        """All mishnah texts of a chapter"""
+        _, _, first_mishnah, mishnah_count, _ = self._chapter(self._chapter_index(tractate_name, chapter_num))
+        return [self._mishnah(i) for i in range(first_mishnah, first_mishnah + mishnah_count)]
+    
+    def get_mishnah(self, tractate_name, chapter_num, mishnah_num):
+        """Text of a single mishnah (mishnah_num is 1-based)"""
+        _, _, first_mishnah, mishnah_count, _ = self._chapter(self._chapter_index(tractate_name, chapter_num))
+        if not 1 <= mishnah_num <= mishnah_count:
+            raise KeyError(f"{tractate_name} {chapter_num} has no mishnah {mishnah_num}")
+        return self._mishnah(first_mishnah + mishnah_num - 1)
+    
+    def chapter_ref(self, number):
+        """(tractate_name, chapter_num) rendered as chapter output number {number}"""
+        if not 1 <= number <= self.numbered_count:
+            raise KeyError(f"No chapter number {number} (1-{self.numbered_count})")
+        (chapter_index,) = NUMBERED_RECORD.unpack_from(self.data, self.numbered_offset + (number - 1) * NUMBERED_RECORD.size)
+        tractate_index, chapter_num, _, _, _ = self._chapter(chapter_index)
+        return self._tractate_name(tractate_index), chapter_num
+    
+    def mishnah_ref(self, number):
+        """(tractate_name, chapter_num, mishnah_num) rendered as single-mishnah output number {number}"""
+        if not 1 <= number <= self.mishnah_count:
+            raise KeyError(f"No mishnah number {number} (1-{self.mishnah_count})")
+        _, _, chapter_index = self._mishnah_record(number - 1)
+        tractate_index, chapter_num, first_mishnah, _, _ = self._chapter(chapter_index)
+        return self._tractate_name(tractate_index), chapter_num, number - first_mishnah
+    
+    def chapter_number(self, tractate_name, chapter_num):
+        """Chapter output number of a chapter (None if it has no text and is not rendered)"""
+        output_number = self._chapter(self._chapter_index(tractate_name, chapter_num))[4]
+        return output_number or None
+    
+    def mishnah_number(self, tractate_name, chapter_num, mishnah_num):
+        """Single-mishnah output number of a mishnah"""
+        _, _, first_mishnah, mishnah_count, _ = self._chapter(self._chapter_index(tractate_name, chapter_num))
+        if not 1 <= mishnah_num <= mishnah_count:
+            raise KeyError(f"{tractate_name} {chapter_num} has no mishnah {mishnah_num}")
+        return first_mishnah + mishnah_num
+
+def ensure_fresh_corpus(corpus_path=CORPUS_FILE, source_dir=MISHNAYOT_DIR):
+    """Rebuild the corpus if the JSON tree has changed since it was built (e.g. after a refetch)
+    
+    Returns True if a corpus file exists afterwards. Without a JSON tree to
+    compare against, an existing corpus is trusted as it is.
+    """
+    corpus_path = Path(corpus_path)
+    if not corpus_path.exists():
+        return False
+    
+    stats = source_stat_digest(source_dir)
+    if stats is None:
+        return True
+    
+    try:
+        corpus = MishnahCorpus(corpus_path)
+    except ValueError:
+        built_from, built_stats, strip_nikud = None, None, False
+    else:
+        built_from, built_stats, strip_nikud = corpus.source_digest, corpus.stat_digest, corpus.nikud_stripped
+        corpus.close()
+    
+    # Same names, sizes and mtimes: no need to read the ~11 MB of JSON
+    if stats == built_stats:
+        return True
+    
+    if built_from != source_digest(source_dir):
+        print(f"♻️  {corpus_path} is out of date with {source_dir}/ - rebuilding it"
+              f"{' without nikud' if strip_nikud else ''}")
+        build_corpus(Path(source_dir), corpus_path, strip_nikud)
+    else:
+        # Touched but unchanged (a checkout, a copy): remember the new stats so the next check is quick again
+        try:
+            with open(corpus_path, 'r+b') as f:
+                f.seek(STAT_DIGEST_OFFSET)
+                f.write(stats)
+        except OSError:
+            pass
+    return True
+
+_default_corpus = None
+
+def open_corpus(path=CORPUS_FILE):
+    """Shared MishnahCorpus for the default corpus file, opened (and rebuilt if stale) on first use"""
+    global _default_corpus
+    if _default_corpus is None:
+        ensure_fresh_corpus(path)
+        _default_corpus = MishnahCorpus(path)
+    return _default_corpus
+
+def get_chapter(tractate_name, chapter_num):
+    """All mishnah texts of a chapter from the default corpus"""
+    return open_corpus().get_chapter(tractate_name, chapter_num)
+
+def get_mishnah(tractate_name, chapter_num, mishnah_num):
+    """Text of a single mishnah from the default corpus"""
+    return open_corpus().get_mishnah(tractate_name, chapter_num, mishnah_num)
+
+def served_source_digest(corpus_path=CORPUS_FILE, source_dir=MISHNAYOT_DIR):
+    """Source digest of the chapters iter_chapters serves: the (freshened) corpus's, else the JSON tree's"""
+    if ensure_fresh_corpus(corpus_path, source_dir):
+        corpus = MishnahCorpus(corpus_path)
+        digest = corpus.source_digest
+        corpus.close()
+        return digest
+    return source_digest(source_dir)
+
+def iter_chapters(corpus_path=CORPUS_FILE, source_dir=MISHNAYOT_DIR):
+    """Yield chapters from the compact corpus if it has been built (rebuilt if stale), else from the JSON tree"""
+    if ensure_fresh_corpus(corpus_path, source_dir):
+        print(f"📦 Loading texts from {corpus_path}")
+        corpus = MishnahCorpus(corpus_path)
+        try:
+            yield from corpus.iter_chapters()
+        finally:
+            corpus.close()
+    else:
+        print(f"📂 {corpus_path} not found - reading {source_dir}/ (run scripts/mishnah_corpus.py to build it)")
+        yield from iter_json_chapters(source_dir)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Build or query the compact Mishnah corpus")
+    parser.add_argument("--chapter", type=int, metavar="N", help="show which chapter is rendered as chapter number N")
+    parser.add_argument("--mishnah", type=int, metavar="N", help="show which mishnah is rendered as mishnah number N")
+    parser.add_argument("--strip-nikud", action="store_true", help="build the corpus without vowel points and cantillation")
+    return parser.parse_args()
+
+def show_refs(corpus, chapter_number, mishnah_number):
+    """Print what a chapter and/or mishnah output number refers to"""
+    if chapter_number:
+        tractate_name, chapter_num = corpus.chapter_ref(chapter_number)
+        print(f"📖 Chapter {chapter_number}: {tractate_name} פרק {chapter_num}")
+    if mishnah_number:
+        tractate_name, chapter_num, mishnah_num = corpus.mishnah_ref(mishnah_number)
+        print(f"📖 Mishnah {mishnah_number}: {tractate_name} פרק {chapter_num} משנה {mishnah_num}")
+        print(corpus.get_mishnah(tractate_name, chapter_num, mishnah_num))
+
+def main():
+    """Build the compact corpus from mishnayot_texts, or look up an output number"""
+    args = parse_args()
+    
+    if args.chapter or args.mishnah:
+        try:
+            show_refs(open_corpus(), args.chapter, args.mishnah)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+        return
+    
+    print(f"📚 Building {CORPUS_FILE} from {MISHNAYOT_DIR}/...")
+    
+    stats = build_corpus(strip_nikud=args.strip_nikud)
+    
+    print(f"\n🎉 Done! {stats['tractates']} tractates, {stats['chapters']} chapters "
+          f"({stats['numbered_chapters']} with text), {stats['mishnayot']} mishnayot"
+          f"{' without nikud' if args.strip_nikud else ''}")
+    print(f"📦 {CORPUS_FILE}: {stats['bytes'] / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
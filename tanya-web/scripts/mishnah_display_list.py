@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Display lists: the laid-out form of a Mishnah image or PDF
+
+Rendering is split in two. The layout phase (chapter_display_list and
+single_display_list in generate_all_mishnah_images.py, layout_document in
+generate_all_mishnah_pdfs.py) does all the text measurement - line breaking,
+alignment, page splitting - and produces a display list: plain data that
+places every rectangle, line and text run of every page. The backends here
+replay a display list without measuring anything:
+
+    to_images(display_list, scale)   Pillow pages, encoded by mishnah_encoders (png, png8, webp, avif)
+    to_pdf(display_list)             vector PDF bytes, via mishnah_pdf.py
+
+Display lists are cached on disk as JSON (mishnah_layout_cache/), keyed by
+the text, the layout configuration and the source of the layout functions
+only - not the output format, scale, CLI or backend code - so re-encoding in
+another format, at another resolution or after an encoder or PDF writer
+change skips layout entirely. Each generator keeps its entries under its own
+namespace, one directory per layout fingerprint:
+
+    mishnah_layout_cache/images/<fingerprint>/<key>.json
+    mishnah_layout_cache/pdfs/<fingerprint>/<key>.json
+
+The first time a run uses a fingerprint, the namespace's other fingerprint
+directories - layouts of a configuration or layout code that has since
+changed - are deleted, so the cache holds one generation per generator.
+
+Format:
+    {"unit": "px" | "pt", "title": str | null,
+     "pages": [{"size": [w, h], "chrome": [item, ...], "items": [item, ...]}, ...]}
+
+Coordinates are in `unit` from the top-left corner. Items:
+    ["rect", x, y, w, h, fill, outline, width]   colours are [r, g, b] or null; the outline lies inside the box
+    ["line", x1, y1, x2, y2, color, width]
+    ["text", x, baseline, text, size, color, justify]
+    ["label", x, baseline, text, size, color, justify]
+
+x is where the pen starts; justify is null, or the width the line is
+stretched to by widening its spaces. A label is short text repeated across
+many pages (titles, subtitles), which raster backends keep as a pre-rendered
+strip. `chrome` holds what every page of that size in a document style shares
+(background, border, rules, footer). Raster backends draw its shapes straight
+onto a blank page and paste its text from the same strips as labels - only
+the strips are cached, keyed by text rather than position, so memory stays
+small however many page heights a run produces.
+
+Usage:
+    python3 scripts/mishnah_display_list.py mishnah_layout_cache/pdfs/<fp>/<key>.json out.pdf       # replay as PDF
+    python3 scripts/mishnah_display_list.py mishnah_layout_cache/images/<fp>/<key>.json out.png --scale 2
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+from mishnah_fonts import get_font, resolve_font_path
+from mishnah_layout import word_width
+from mishnah_pdf import PdfDocument
+
+LAYOUT_CACHE_DIR = Path("mishnah_layout_cache")
+DISPLAY_LIST_VERSION = 1
+
+# Points per unit, for the PDF backend (CSS pixels are 1/96 in)
+UNIT_POINTS = {'pt': 1.0, 'px': 0.75}
+
+# Pre-rendered text strips kept per process (a few hundred distinct titles and footers, a few KB each)
+STRIP_CACHE_SIZE = 512
+
+def freeze(value):
+    """Nested lists (as loaded from JSON) to tuples, so items can key the raster caches"""
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def display_list(unit, pages, title=None):
+    """A display list from (size, chrome, items) pages"""
+    return {
+        'version': DISPLAY_LIST_VERSION,
+        'unit': unit,
+        'title': title,
+        'pages': [{'size': size, 'chrome': chrome, 'items': items} for size, chrome, items in pages],
+    }
+
+def dumps(display_list):
+    """Serialise a display list to compact JSON bytes"""
+    return json.dumps(display_list, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """Parse a display list, with its pages' items frozen into tuples"""
+    loaded = json.loads(data)
+    for page in loaded['pages']:
+        page['size'] = freeze(page['size'])
+        page['chrome'] = freeze(page['chrome'])
+        page['items'] = freeze(page['items'])
+    return loaded
+
+class DisplayListCache:
+    """Display lists on disk, one JSON file per layout digest, in one directory per layout fingerprint"""
+    
+    def __init__(self, namespace, cache_dir=LAYOUT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.root = self.cache_dir / namespace
+        self.opened = set()
+        self.hits = 0
+        self.misses = 0
+    
+    def directory(self, fingerprint):
+        """Entry directory of a fingerprint, pruning the other fingerprints' on first use"""
+        directory = self.root / fingerprint[:16]
+        if fingerprint not in self.opened:
+            self.opened.add(fingerprint)
+            self.prune(directory)
+        return directory
+    
+    def prune(self, keep):
+        """Delete every fingerprint directory of this namespace but `keep`, and any flat legacy entries"""
+        for legacy in self.cache_dir.glob("*.json"):
+            legacy.unlink(missing_ok=True)
+        if not self.root.is_dir():
+            return
+        for entry in self.root.iterdir():
+            if entry != keep and entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+    
+    def path(self, fingerprint, key):
+        return self.directory(fingerprint) / f"{key}.json"
+    
+    def get(self, fingerprint, key):
+        """The cached display list, or None"""
+        try:
+            data = self.path(fingerprint, key).read_bytes()
+        except OSError:
+            return None
+        try:
+            loaded = loads(data)
+        except (ValueError, KeyError):
+            return None
+        return loaded if loaded.get('version') == DISPLAY_LIST_VERSION else None
+    
+    def put(self, fingerprint, key, display_list):
+        """Store a display list atomically (worker processes may race on the same key)
+        
+        Best effort: a run with another configuration may prune the directory meanwhile.
+        """
+        path = self.path(fingerprint, key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(dumps(display_list))
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+    
+    def layout(self, fingerprint, key, layout):
+        """Cached display list for key, computing and storing it with layout() on a miss"""
+        cached = self.get(fingerprint, key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        
+        self.misses += 1
+        result = layout()
+        self.put(fingerprint, key, result)
+        # Replay the frozen form either way, so a cold run draws exactly what a warm one would
+        return loads(dumps(result))
+
+# Raster backend
+
+def scaled_box(x, y, w, h, scale):
+    """Pillow's inclusive corner box of a rectangle"""
+    return [round(x * scale), round(y * scale), round((x + w) * scale) - 1, round((y + h) * scale) - 1]
+
+def draw_shape(draw, item, scale):
+    """Draw a rect or line item"""
+    if item[0] == 'rect':
+        _, x, y, w, h, fill, outline, width = item
+        draw.rectangle(scaled_box(x, y, w, h, scale), fill=fill, outline=outline,
+                       width=max(round(width * scale), 1) if outline else 0)
+    elif item[0] == 'line':
+        _, x1, y1, x2, y2, fill, width = item
+        draw.line([(x1 * scale, y1 * scale), (x2 * scale, y2 * scale)], fill=fill, width=max(round(width * scale), 1))
+
+def draw_run(draw, item, scale):
+    """Draw a text or label item directly"""
+    _, x, baseline, text, size, fill, justify = item
+    font = get_font(round(size * scale))
+    if not justify or ' ' not in text:
+        draw.text((x * scale, baseline * scale), text, fill=fill, font=font, anchor='ls')
+        return
+    
+    # Justified lines are Hebrew: words go right to left, spaces take up the slack
+    words = text.split(' ')
+    widths = [word_width(font, word) for word in words]
+    gap = (justify * scale - sum(widths)) / (len(words) - 1)
+    right = (x + justify) * scale
+    for word, width in zip(words, widths):
+        draw.text((right - width, baseline * scale), word, fill=fill, font=font, anchor='ls')
+        right -= width + gap
+
+# Scratch canvas for measuring text strips
+_strip_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+@lru_cache(maxsize=STRIP_CACHE_SIZE)
+def text_strip(text, size, fill, scale):
+    """Pre-rendered RGBA strip of a run of text, plus its box's offset from the pen position
+    
+    The strip is cropped to the text's box and its colour is the fill everywhere, with
+    the glyph coverage in the alpha channel, so pasting it with itself as the mask blends
+    exactly like drawing the text onto the page.
+    """
+    font = get_font(round(size * scale))
+    left, top, right, bottom = _strip_draw.textbbox((0, 0), text, font=font, anchor='ls')
+    strip = Image.new('RGBA', (max(right - left, 1), max(bottom - top, 1)), fill + (0,))
+    ImageDraw.Draw(strip).text((-left, -top), text, fill=fill, font=font, anchor='ls')
+    return strip, (left, top)
+
+def paste_run(img, item, scale):
+    """Paste an unjustified text or label item from its pre-rendered strip"""
+    _, x, baseline, text, size, fill, _ = item
+    strip, (left, top) = text_strip(text, size, fill, scale)
+    img.paste(strip, (round(x * scale) + left, round(baseline * scale) + top), strip)
+
+def draw_item(img, draw, item, scale, pasted_kinds):
+    """Draw one item, pasting unjustified runs of the pasted kinds from their strips"""
+    if item[0] in pasted_kinds and not item[6]:
+        paste_run(img, item, scale)
+    elif item[0] in ('text', 'label'):
+        draw_run(draw, item, scale)
+    else:
+        draw_shape(draw, item, scale)
+
+def draw_display_page(page, scale=1):
+    """Replay one page onto a blank canvas - chrome text repeats like labels, so it is pasted too"""
+    width, height = page['size']
+    img = Image.new('RGB', (round(width * scale), round(height * scale)), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for item in page['chrome']:
+        draw_item(img, draw, item, scale, ('text', 'label'))
+    for item in page['items']:
+        draw_item(img, draw, item, scale, ('label',))
+    return img
+
+def to_images(display_list, scale=1):
+    """Replay a display list as Pillow images, one per page (scale = pixels per unit)"""
+    return [draw_display_page(page, scale) for page in display_list['pages']]
+
+# Vector backend
+
+def draw_pdf_item(page, document, item, k):
+    """Replay one item onto a PdfPage (k = points per unit)"""
+    kind = item[0]
+    if kind == 'rect':
+        _, x, y, w, h, fill, outline, width = item
+        if fill:
+            page.fill_rect(x * k, y * k, w * k, h * k, fill)
+        if outline and width:
+            # Strokes are centred on the path; keep the outline inside the box like the raster backend
+            inset = width / 2
+            page.stroke_rect((x + inset) * k, (y + inset) * k, (w - width) * k, (h - width) * k, outline, width * k)
+    elif kind == 'line':
+        _, x1, y1, x2, y2, fill, width = item
+        page.line(x1 * k, y1 * k, x2 * k, y2 * k, fill, width * k)
+    else:
+        _, x, baseline, text, size, fill, justify = item
+        font = document.font_at(size * k)
+        if justify:
+            page.text(font, (x + justify) * k, baseline * k, text, fill, align='justify', width=justify * k)
+        else:
+            page.text(font, x * k, baseline * k, text, fill)
+
+def to_pdf(display_list, font_path=None):
+    """Replay a display list as a PDF with one embedded font subset, returning the bytes"""
+    k = UNIT_POINTS[display_list['unit']]
+    document = PdfDocument(font_path or resolve_font_path(), title=display_list.get('title'))
+    for display_page in display_list['pages']:
+        width, height = display_page['size']
+        page = document.add_page(width * k, height * k)
+        for item in display_page['chrome'] + display_page['items']:
+            draw_pdf_item(page, document, item, k)
+    return document.to_bytes()
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Replay a cached display list as a PDF or as images")
+    parser.add_argument("display_list", type=Path, help=f"a display list JSON file (e.g. from {LAYOUT_CACHE_DIR}/)")
+    parser.add_argument("output", type=Path, help="output .pdf, or an image name (pages after the first get _2, _3...)")
+    parser.add_argument("--scale", type=float, default=1, help="image pixels per layout unit (default: 1)")
+    return parser.parse_args()
+
+def main():
+    """Replay one display list"""
+    args = parse_args()
+    loaded = loads(args.display_list.read_bytes())
+    
+    if args.output.suffix.lower() == '.pdf':
+        args.output.write_bytes(to_pdf(loaded))
+        print(f"✅ {args.output}: {len(loaded['pages'])} pages")
+        return
+    
+    for page_num, img in enumerate(to_images(loaded, args.scale), 1):
+        path = args.output if page_num == 1 else args.output.with_name(f"{args.output.stem}_{page_num}{args.output.suffix}")
+        img.save(path)
+        print(f"✅ {path}: {img.width}x{img.height}")
+
+if __name__ == "__main__":
+    main()
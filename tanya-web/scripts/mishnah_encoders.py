@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Output encoders for the Mishnah image renderers
+
+The pages only contain a background, three ink colours (text, brand blue,
+footer grey) and the anti-aliasing ramps between them, so a full 24-bit
+RGB PNG wastes most of its bytes. Modes:
+
+- png   24-bit RGB PNG (the original output, and still the default)
+- png8  palettised PNG - snapped to a fixed palette of background->ink
+        ramps (or an adaptive one), zlib level PNG8_COMPRESS_LEVEL
+- webp  lossless WebP
+- avif  AVIF at AVIF_QUALITY (lossy; needs Pillow 11.2+ or pillow-avif-plugin)
+
+The other modes are opt-in (--format). Use encoder_report()
+(generate_all_mishnah_images.py --encoder-report) to compare bytes and
+encode time per mode on real pages before switching.
+"""
+
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from PIL import Image, features
+
+from mishnah_profiling import stage, tally
+
+PNG8_COMPRESS_LEVEL = 9
+WEBP_METHOD = 6
+AVIF_QUALITY = 90
+AVIF_SPEED = 6
+
+# Background encode/write stage: threads per process and pages allowed in flight
+ENCODE_THREADS = 2
+ENCODE_QUEUE_DEPTH = 8
+
+def configure_png8(compress_level):
+    """Trade png8 size for speed (zlib level 0-9) - e.g. for on-demand rendering"""
+    global PNG8_COMPRESS_LEVEL
+    PNG8_COMPRESS_LEVEL = compress_level
+
+def blend_palette(background, inks):
+    """Palette image holding the background and an even ramp from it to each ink colour
+    
+    The 255 entries after the background are shared evenly between the inks
+    (85 shades each for text, brand blue and footer grey).
+    """
+    steps = 255 // len(inks)
+    colors = [tuple(background)]
+    for ink in inks:
+        for step in range(1, steps + 1):
+            t = step / steps
+            colors.append(tuple(round(b + (c - b) * t) for b, c in zip(background, ink)))
+    
+    flat = [value for color in colors for value in color]
+    palette = Image.new('P', (1, 1))
+    palette.putpalette(flat + [0] * (768 - len(flat)))
+    return palette
+
+@lru_cache(maxsize=None)
+def cached_palette(background, inks):
+    """blend_palette, built once per colour scheme"""
+    return blend_palette(background, inks)
+
+def save_png(img, output_path, palette=None):
+    """24-bit RGB PNG, as the renderers always wrote"""
+    img.save(output_path, 'PNG')
+
+def save_png8(img, output_path, palette=None):
+    """Palettised PNG snapped to `palette` (adaptive octree palette if none is given)"""
+    if palette is not None:
+        indexed = img.quantize(palette=palette, dither=Image.Dither.NONE)
+    else:
+        indexed = img.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    indexed.save(output_path, 'PNG', compress_level=PNG8_COMPRESS_LEVEL)
+
+def save_webp(img, output_path, palette=None):
+    """Lossless WebP"""
+    img.save(output_path, 'WEBP', lossless=True, method=WEBP_METHOD)
+
+def has_avif():
+    """Whether Pillow can write AVIF (built in since 11.2, otherwise via pillow-avif-plugin)"""
+    if 'avif' in features.modules and features.check('avif'):
+        return True
+    try:
+        import pillow_avif  # noqa: F401 - registers the AVIF plugin
+    except ImportError:
+        return False
+    return True
+
+def save_avif(img, output_path, palette=None):
+    """AVIF at AVIF_QUALITY"""
+    img.save(output_path, 'AVIF', quality=AVIF_QUALITY, speed=AVIF_SPEED)
+
+# mode -> (file extension, save function, availability check)
+ENCODERS = {
+    'png': ('.png', save_png, lambda: True),
+    'png8': ('.png', save_png8, lambda: True),
+    'webp': ('.webp', save_webp, lambda: features.check('webp')),
+    'avif': ('.avif', save_avif, has_avif),
+}
+
+def available_modes():
+    """Encoder modes this Pillow build can write"""
+    return [mode for mode, (_, _, available) in ENCODERS.items() if available()]
+
+def extension(mode):
+    """File extension written by an encoder mode"""
+    return ENCODERS[mode][0]
+
+def save_image(img, output_path, mode, palette=None):
+    """Encode and write one page in the given mode"""
+    ENCODERS[mode][1](img, output_path, palette)
+
+def encode_image(img, mode, palette=None):
+    """Encode one page in the given mode and return the bytes"""
+    buffer = io.BytesIO()
+    save_image(img, buffer, mode, palette)
+    return buffer.getvalue()
+
+def output_page(img, output_path, mode, palette=None, to_memory=False):
+    """Write a page to output_path -> (output_path, None), or with to_memory just encode it -> (output_path, bytes)"""
+    with stage('encode'):
+        data = encode_image(img, mode, palette)
+    tally('encoded_bytes', len(data))
+    if to_memory:
+        return output_path, data
+    
+    with stage('write'):
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    return output_path, None
+
+class ImageWriter:
+    """Encodes and writes pages on a small thread pool while the caller keeps drawing
+    
+    Pillow releases the GIL while quantising and compressing, so encoding overlaps
+    with layout and drawing even inside one process. At most `depth` pages are
+    queued or being encoded at a time - submit() blocks beyond that, which keeps
+    memory bounded no matter how far drawing runs ahead. threads=0 encodes inline.
+    With to_memory=True pages are only encoded, and their bytes are handed back by
+    wait_written() instead of being written to disk (used for bundle output).
+    """
+    
+    def __init__(self, mode, palette=None, threads=ENCODE_THREADS, depth=ENCODE_QUEUE_DEPTH, to_memory=False):
+        self.mode = mode
+        self.palette = palette
+        self.to_memory = to_memory
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="encode") if threads else None
+        self.slots = threading.BoundedSemaphore(max(depth, 1))
+        self.pending = []
+    
+    def submit(self, img, output_path):
+        """Queue one page for encoding, blocking while the queue is full"""
+        if self.executor is None:
+            future = Future()
+            future.set_result(output_page(img, output_path, self.mode, self.palette, self.to_memory))
+            self.pending.append(future)
+            return
+        
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(output_page, img, output_path, self.mode, self.palette, self.to_memory)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        self.pending.append(future)
+    
+    def take_pending(self):
+        """Hand over the pages submitted since the last call, to be awaited with wait_written()"""
+        pending, self.pending = self.pending, []
+        return pending
+    
+    def flush(self):
+        """Wait until every page submitted so far is on disk (or encoded), returning wait_written()'s results"""
+        return wait_written(self.take_pending())
+    
+    def close(self):
+        """Flush and stop the encoder threads"""
+        try:
+            self.flush()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+def wait_written(pending):
+    """Block until the given submitted pages are done, re-raising the first encode error
+    
+    Returns (output_path, bytes or None) per page, in submission order.
+    """
+    return [future.result() for future in pending]
+
+def encoder_report(images, palette=None, modes=None):
+    """Encode every image in every mode, print bytes and time per mode and return the rows"""
+    modes = modes or available_modes()
+    rows = []
+    
+    for mode in modes:
+        total_bytes = 0
+        started = time.perf_counter()
+        for img in images:
+            total_bytes += len(encode_image(img, mode, palette))
+        elapsed = time.perf_counter() - started
+        rows.append({'mode': mode, 'bytes': total_bytes, 'seconds': elapsed})
+    
+    baseline = rows[0]['bytes'] if rows else 0
+    print(f"\n📐 Encoder report ({len(images)} pages)")
+    print(f"   {'mode':<6} {'total KB':>10} {'KB/page':>9} {'vs ' + modes[0]:>8} {'ms/page':>9}")
+    for row in rows:
+        per_page = len(images) or 1
+        ratio = row['bytes'] / baseline if baseline else 0
+        print(f"   {row['mode']:<6} {row['bytes'] / 1024:>10.1f} {row['bytes'] / 1024 / per_page:>9.1f} "
+              f"{ratio:>8.2f} {row['seconds'] * 1000 / per_page:>9.1f}")
+    
+    return rows
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Hebrew font registry for the Mishnah renderers
+
+Resolves a Hebrew-capable TrueType font once per process and keeps one
+ImageFont instance per size, instead of re-opening and re-parsing the font
+file for every title, header and text line of every image.
+
+Lookup order:
+1. MISHNAH_FONT environment variable (or configure_font(path))
+2. Any .ttf/.otf bundled in scripts/fonts/
+3. fontconfig (fc-match :lang=he) on Linux
+4. Well-known macOS and Linux font paths
+5. Pillow's built-in default font (cannot draw Hebrew - a warning is printed)
+
+Usage:
+    python3 scripts/mishnah_fonts.py    # show which font the renderers will use
+"""
+
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont, features
+
+FONT_ENV_VAR = "MISHNAH_FONT"
+BUNDLED_FONT_DIR = Path(__file__).resolve().parent / "fonts"
+
+FONT_CANDIDATES = [
+    # macOS
+    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    # Linux (fonts-noto, culmus, fonts-freefont, fonts-dejavu)
+    "/usr/share/fonts/truetype/noto/NotoSansHebrew-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansHebrew-Regular.ttf",
+    "/usr/share/fonts/truetype/culmus/DavidCLM-Medium.otf",
+    "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+]
+
+def configure_font(path):
+    """Force a specific font file (also picked up by worker processes)"""
+    os.environ[FONT_ENV_VAR] = str(path)
+    resolve_font_path.cache_clear()
+    get_font.cache_clear()
+
+def supports_hebrew(font_path):
+    """Whether a font has real Hebrew glyphs (missing glyphs all render as the same .notdef box)"""
+    try:
+        font = ImageFont.truetype(str(font_path), 32)
+    except OSError:
+        return False
+    
+    draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+    masks = set()
+    for letter in "אבש":
+        bbox = draw.textbbox((0, 0), letter, font=font)
+        masks.add((bbox, bytes(font.getmask(letter))))
+    return len(masks) == 3
+
+def fontconfig_candidates():
+    """Hebrew fonts known to fontconfig, best match first"""
+    if not shutil.which("fc-match"):
+        return []
+    
+    try:
+        result = subprocess.run(["fc-match", "-s", "-f", "%{file}\\n", ":lang=he"],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return [line for line in result.stdout.splitlines()[:10] if line]
+
+def font_candidates():
+    """Every font path worth trying, in priority order"""
+    candidates = []
+    if os.environ.get(FONT_ENV_VAR):
+        candidates.append(os.environ[FONT_ENV_VAR])
+    if BUNDLED_FONT_DIR.is_dir():
+        candidates += sorted(str(p) for p in BUNDLED_FONT_DIR.iterdir() if p.suffix.lower() in (".ttf", ".otf"))
+    candidates += fontconfig_candidates()
+    candidates += FONT_CANDIDATES
+    return candidates
+
+@lru_cache(maxsize=None)
+def resolve_font_path():
+    """Path of the Hebrew font to use, or None if no usable font was found (resolved once)"""
+    explicit = os.environ.get(FONT_ENV_VAR)
+    
+    for font_path in font_candidates():
+        if not os.path.exists(font_path):
+            if font_path == explicit:
+                print(f"⚠️  {FONT_ENV_VAR}={explicit} does not exist, looking for another font")
+            continue
+        if supports_hebrew(font_path):
+            return font_path
+        if font_path == explicit:
+            print(f"⚠️  {FONT_ENV_VAR}={explicit} has no Hebrew glyphs, looking for another font")
+    
+    print("⚠️  No Hebrew-capable font found - falling back to Pillow's default font.")
+    print(f"   Set {FONT_ENV_VAR}=/path/to/font.ttf or install fonts-noto / culmus / fonts-dejavu")
+    return None
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """Hebrew font at the given size - one shared instance per size per process"""
+    font_path = resolve_font_path()
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    
+    return ImageFont.load_default()
+
+def has_rtl_layout():
+    """Whether Pillow can lay out right-to-left text (needs libraqm + fribidi)"""
+    return features.check('raqm')
+
+def describe_font_setup():
+    """Print the font and layout engine the renderers will use"""
+    font_path = resolve_font_path()
+    print(f"🔤 Font: {font_path or 'Pillow default (no Hebrew support)'}")
+    if not has_rtl_layout():
+        print("⚠️  libraqm/fribidi not available - Pillow will draw Hebrew in logical (reversed) order.")
+        print("   Install libraqm0 / libfribidi0 (Linux) or fribidi (Homebrew) on render boxes")
+
+if __name__ == "__main__":
+    describe_font_setup()
@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+Minimal vector PDF writer for the Mishnah renderers
+
+Writes text-based PDFs directly, without a browser: pages hold filled and
+stroked rectangles, lines and glyph runs, and every document embeds one
+TrueType subset containing only the glyphs it uses (CIDFontType2,
+Identity-H, with a ToUnicode map so the text stays searchable and copyable).
+
+Pillow lays out right-to-left text only when libraqm is installed, and a
+PDF has no layout engine at all, so runs are put into visual order here:
+each base letter keeps its combining marks (nikud, cantillation - zero-width
+in Hebrew fonts, placed by their outline on either side of the letter's
+pen position), Hebrew runs are reversed, runs of Latin letters and digits
+keep their order and brackets are mirrored. That covers Mishnah text; it is not a full Unicode
+bidirectional algorithm and does no OpenType mark positioning.
+
+Fonts with CFF outlines (.otf) cannot be subset without fontTools and are
+embedded whole.
+
+Usage:
+    python3 scripts/mishnah_pdf.py "מִשְׁנָה א" out.pdf    # write a one-line test document
+"""
+
+import hashlib
+import re
+import struct
+import sys
+import unicodedata
+import zlib
+from functools import lru_cache
+
+A4 = (595.28, 841.89)  # points
+
+# Composite glyph flags (TrueType 'glyf')
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+# Tables copied into a subset as they are (hinting programs are shared by every glyph)
+SUBSET_COPY_TABLES = (b'cvt ', b'fpgm', b'prep')
+
+MIRRORED = {'(': ')', ')': '(', '[': ']', ']': '[', '{': '}', '}': '{', '<': '>', '>': '<'}
+
+def table_checksum(data):
+    """TrueType table checksum: sum of big-endian uint32s, zero-padded"""
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+def build_sfnt(tables):
+    """Assemble tables (dict of tag -> bytes) into a TrueType font file with valid checksums"""
+    tags = sorted(tables)
+    count = len(tags)
+    entry_selector = count.bit_length() - 1
+    search_range = (1 << entry_selector) * 16
+    header = struct.pack(">IHHHH", 0x00010000, count, search_range, entry_selector, count * 16 - search_range)
+    
+    directory = b''
+    body = b''
+    offset = len(header) + 16 * count
+    for tag in tags:
+        data = tables[tag]
+        directory += struct.pack(">4sIII", tag, table_checksum(data), offset + len(body), len(data))
+        body += data + b'\0' * (-len(data) % 4)
+    
+    font = bytearray(header + directory + body)
+    head_offset = offset + sum(len(tables[tag]) + (-len(tables[tag]) % 4) for tag in tags[:tags.index(b'head')])
+    struct.pack_into(">I", font, head_offset + 8, (0xB1B0AFBA - table_checksum(bytes(font))) & 0xFFFFFFFF)
+    return bytes(font)
+
+class TrueTypeFont:
+    """Metrics, character map and glyph data of a TrueType/OpenType font file"""
+    
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self.data = f.read()
+        
+        base = 0
+        if self.data[:4] == b'ttcf':
+            (base,) = struct.unpack_from(">I", self.data, 12)  # first font of a collection
+        (num_tables,) = struct.unpack_from(">H", self.data, base + 4)
+        self.tables = {}
+        for index in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", self.data, base + 12 + 16 * index)
+            self.tables[tag] = (offset, length)
+        
+        head = self.table(b'head')
+        self.units_per_em = struct.unpack_from(">H", head, 18)[0]
+        self.bbox = struct.unpack_from(">4h", head, 36)
+        self.long_loca = struct.unpack_from(">h", head, 50)[0] == 1
+        
+        hhea = self.table(b'hhea')
+        self.ascent, self.descent = struct.unpack_from(">2h", hhea, 4)
+        (metric_count,) = struct.unpack_from(">H", hhea, 34)
+        (self.glyph_count,) = struct.unpack_from(">H", self.table(b'maxp'), 4)
+        
+        hmtx = self.table(b'hmtx')
+        self.metrics = [struct.unpack_from(">Hh", hmtx, 4 * i) for i in range(metric_count)]
+        last_advance = self.metrics[-1][0]
+        for gid in range(metric_count, self.glyph_count):
+            self.metrics.append((last_advance, struct.unpack_from(">h", hmtx, 4 * metric_count + 2 * (gid - metric_count))[0]))
+        
+        self.cff = b'CFF ' in self.tables
+        self.cmap = self.read_cmap()
+        self.cap_height = self.ascent
+        if b'OS/2' in self.tables:
+            os2 = self.table(b'OS/2')
+            if struct.unpack_from(">H", os2, 0)[0] >= 2 and len(os2) >= 90:
+                self.cap_height = struct.unpack_from(">h", os2, 88)[0]
+        self.italic_angle = struct.unpack_from(">i", self.table(b'post'), 4)[0] / 65536 if b'post' in self.tables else 0
+        self.name = self.postscript_name()
+    
+    def table(self, tag):
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+    
+    def read_cmap(self):
+        """Dict of code point -> glyph id from the best Unicode subtable"""
+        cmap = self.table(b'cmap')
+        (count,) = struct.unpack_from(">H", cmap, 2)
+        subtables = {}
+        for index in range(count):
+            platform, encoding, offset = struct.unpack_from(">HHI", cmap, 4 + 8 * index)
+            subtables[(platform, encoding)] = offset
+        
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3), (0, 1), (0, 0)):
+            if key not in subtables:
+                continue
+            offset = subtables[key]
+            (fmt,) = struct.unpack_from(">H", cmap, offset)
+            if fmt == 12:
+                return self.read_cmap12(cmap, offset)
+            if fmt == 4:
+                return self.read_cmap4(cmap, offset)
+        raise ValueError(f"{self.path} has no Unicode cmap subtable this writer can read")
+    
+    @staticmethod
+    def read_cmap4(cmap, offset):
+        (seg_count,) = struct.unpack_from(">H", cmap, offset + 6)
+        seg_count //= 2
+        ends = struct.unpack_from(f">{seg_count}H", cmap, offset + 14)
+        starts = struct.unpack_from(f">{seg_count}H", cmap, offset + 16 + 2 * seg_count)
+        deltas = struct.unpack_from(f">{seg_count}h", cmap, offset + 16 + 4 * seg_count)
+        range_base = offset + 16 + 6 * seg_count
+        range_offsets = struct.unpack_from(f">{seg_count}H", cmap, range_base)
+        
+        mapping = {}
+        for i in range(seg_count):
+            for code in range(starts[i], ends[i] + 1):
+                if code == 0xFFFF:
+                    continue
+                if range_offsets[i] == 0:
+                    gid = (code + deltas[i]) & 0xFFFF
+                else:
+                    (gid,) = struct.unpack_from(">H", cmap, range_base + 2 * i + range_offsets[i] + 2 * (code - starts[i]))
+                    if gid:
+                        gid = (gid + deltas[i]) & 0xFFFF
+                if gid:
+                    mapping[code] = gid
+        return mapping
+    
+    @staticmethod
+    def read_cmap12(cmap, offset):
+        (groups,) = struct.unpack_from(">I", cmap, offset + 12)
+        mapping = {}
+        for index in range(groups):
+            start, end, gid = struct.unpack_from(">III", cmap, offset + 16 + 12 * index)
+            for code in range(start, end + 1):
+                mapping[code] = gid + code - start
+        return mapping
+    
+    def postscript_name(self):
+        """PostScript name (name ID 6), falling back to the file name"""
+        if b'name' in self.tables:
+            name = self.table(b'name')
+            count, strings = struct.unpack_from(">HH", name, 2)
+            for index in range(count):
+                platform, _, _, name_id, length, offset = struct.unpack_from(">6H", name, 6 + 12 * index)
+                if name_id != 6:
+                    continue
+                raw = name[strings + offset:strings + offset + length]
+                text = raw.decode('utf-16-be' if platform in (0, 3) else 'latin-1', errors='ignore')
+                if text:
+                    return ''.join(ch for ch in text if ch.isalnum() or ch in '-_')
+        return ''.join(ch for ch in self.path.rsplit('/', 1)[-1].rsplit('.', 1)[0] if ch.isalnum() or ch in '-_')
+    
+    def glyph_id(self, char):
+        return self.cmap.get(ord(char), 0)
+    
+    def advance(self, gid):
+        """Advance width of a glyph in font units"""
+        return self.metrics[gid][0]
+    
+    def marks_before_base(self, gid):
+        """Whether a zero-width mark is drawn from the base letter's left edge (its outline lies right
+        of its origin, as in fonts designed for right-to-left pens) rather than hanging back from its right edge"""
+        if self.cff:
+            return True
+        glyph = self.glyph(gid)
+        if len(glyph) < 10:
+            return True
+        x_min, _, x_max = struct.unpack_from(">3h", glyph, 2)
+        return x_min + x_max >= 0
+    
+    def glyph(self, gid):
+        """Raw 'glyf' data of a glyph (empty for glyphs without outlines)"""
+        loca_offset, _ = self.tables[b'loca']
+        if self.long_loca:
+            start, end = struct.unpack_from(">II", self.data, loca_offset + 4 * gid)
+        else:
+            start, end = (2 * value for value in struct.unpack_from(">HH", self.data, loca_offset + 2 * gid))
+        glyf_offset, _ = self.tables[b'glyf']
+        return self.data[glyf_offset + start:glyf_offset + end]
+    
+    @staticmethod
+    def components(glyph):
+        """(byte offset of the glyph index, component glyph id) of every component of a composite glyph"""
+        if len(glyph) < 10 or struct.unpack_from(">h", glyph, 0)[0] >= 0:
+            return []
+        
+        result = []
+        offset = 10
+        while True:
+            flags, gid = struct.unpack_from(">HH", glyph, offset)
+            result.append((offset + 2, gid))
+            offset += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & WE_HAVE_A_SCALE:
+                offset += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                offset += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                offset += 8
+            if not flags & MORE_COMPONENTS:
+                return result
+    
+    def subset(self, gids):
+        """Font file holding only the given glyphs (plus .notdef and composite parts)
+        
+        Returns (font bytes, dict of old glyph id -> new glyph id). CFF fonts
+        are returned whole, with their glyph ids unchanged.
+        """
+        if self.cff:
+            return self.data, {gid: gid for gid in gids}
+        
+        keep = {0}
+        pending = list(gids)
+        while pending:
+            gid = pending.pop()
+            if gid in keep and gid != 0:
+                continue
+            keep.add(gid)
+            pending += [component for _, component in self.components(self.glyph(gid)) if component not in keep]
+        
+        order = sorted(keep)
+        new_ids = {gid: new_id for new_id, gid in enumerate(order)}
+        
+        glyf = bytearray()
+        loca = []
+        hmtx = bytearray()
+        for gid in order:
+            glyph = bytearray(self.glyph(gid))
+            for offset, component in self.components(glyph):
+                struct.pack_into(">H", glyph, offset, new_ids[component])
+            loca.append(len(glyf))
+            glyf += glyph + b'\0' * (-len(glyph) % 4)
+            hmtx += struct.pack(">Hh", *self.metrics[gid])
+        loca.append(len(glyf))
+        
+        head = bytearray(self.table(b'head'))
+        struct.pack_into(">I", head, 8, 0)  # checkSumAdjustment, set by build_sfnt
+        struct.pack_into(">h", head, 50, 1)  # long loca
+        hhea = bytearray(self.table(b'hhea'))
+        struct.pack_into(">H", hhea, 34, len(order))
+        maxp = bytearray(self.table(b'maxp'))
+        struct.pack_into(">H", maxp, 4, len(order))
+        post = bytearray(self.table(b'post')[:32]) if b'post' in self.tables else bytearray(32)
+        struct.pack_into(">I", post, 0, 0x00030000)  # no glyph names
+        
+        tables = {
+            b'head': bytes(head),
+            b'hhea': bytes(hhea),
+            b'maxp': bytes(maxp),
+            b'hmtx': bytes(hmtx),
+            b'loca': struct.pack(f">{len(loca)}I", *loca),
+            b'glyf': bytes(glyf),
+            b'post': bytes(post),
+        }
+        for tag in SUBSET_COPY_TABLES:
+            if tag in self.tables:
+                tables[tag] = self.table(tag)
+        return build_sfnt(tables), new_ids
+
+@lru_cache(maxsize=None)
+def load_font(path):
+    """Parsed font file - one per path per process"""
+    return TrueTypeFont(path)
+
+def clusters(text):
+    """Split text into base characters, each with the combining marks that follow it"""
+    result = []
+    for char in text:
+        if result and unicodedata.combining(char):
+            result[-1] += char
+        else:
+            result.append(char)
+    return result
+
+def bidi_class(cluster):
+    """'R' for Hebrew, 'L' for Latin letters and digits, 'N' for everything else (spaces, punctuation)"""
+    code = ord(cluster[0])
+    if 0x0590 <= code <= 0x05FF or 0xFB1D <= code <= 0xFB4F:
+        return 'R'
+    if cluster[0].isalnum():
+        return 'L'
+    return 'N'
+
+def visual_order(text):
+    """Clusters of a right-to-left line in left-to-right drawing order"""
+    items = clusters(text)
+    classes = [bidi_class(cluster) for cluster in items]
+    
+    # Neutrals between two left-to-right clusters join them; all others take the line's RTL direction
+    resolved = []
+    for index, cls in enumerate(classes):
+        if cls == 'N':
+            before = next((c for c in reversed(classes[:index]) if c != 'N'), 'R')
+            after = next((c for c in classes[index + 1:] if c != 'N'), 'R')
+            cls = 'L' if before == after == 'L' else 'R'
+        resolved.append(cls)
+    
+    visual = []
+    run = []
+    for cluster, cls in zip(reversed(items), reversed(resolved)):
+        if cls == 'L':
+            run.append(cluster)
+            continue
+        if run:
+            visual += reversed(run)
+            run = []
+        if cluster[0] in MIRRORED:
+            cluster = MIRRORED[cluster[0]] + cluster[1:]
+        visual.append(cluster)
+    visual += reversed(run)
+    return visual
+
+class PdfFont:
+    """A font at one size, measuring text like a Pillow font (getlength), for wrap_hebrew_text"""
+    
+    def __init__(self, font, size):
+        self.font = font
+        self.size = size
+        self.scale = size / font.units_per_em
+    
+    def getlength(self, text):
+        return sum(self.font.advance(self.font.glyph_id(char)) for char in text) * self.scale
+    
+    def shape(self, text):
+        """(glyph ids in drawing order, the character each stands for, width in points) of a line"""
+        gids = []
+        chars = []
+        for cluster in visual_order(text):
+            base = cluster[0]
+            marks = [(self.font.glyph_id(char), char) for char in cluster[1:]]
+            before = [mark for mark in marks if self.font.marks_before_base(mark[0])]
+            after = [mark for mark in marks if mark not in before]
+            for gid, char in before + [(self.font.glyph_id(base), base)] + after:
+                gids.append(gid)
+                chars.append(char)
+        width = sum(self.font.advance(gid) for gid in gids) * self.scale
+        return gids, chars, width
+
+@lru_cache(maxsize=None)
+def pdf_font(path, size):
+    """Shared PdfFont per font file and size (word widths are cached per font object)"""
+    return PdfFont(load_font(path), size)
+
+def num(value):
+    """Compact PDF number"""
+    text = f"{value:.3f}".rstrip('0').rstrip('.')
+    return text if text not in ('', '-0') else '0'
+
+def color(rgb):
+    return ' '.join(num(c / 255) for c in rgb)
+
+def pdf_string(text):
+    """PDF text string (UTF-16BE with BOM) as a hex literal"""
+    return f"<FEFF{text.encode('utf-16-be').hex().upper()}>"
+
+class PdfPage:
+    """One page; coordinates are in points from the top-left corner, like the image renderers"""
+    
+    def __init__(self, document, width, height):
+        self.document = document
+        self.width = width
+        self.height = height
+        self.parts = []  # content stream pieces: str, or (gids, word spacing gid, spacing) for glyph runs
+    
+    def fill_rect(self, x, y, w, h, rgb):
+        self.parts.append(f"{color(rgb)} rg {num(x)} {num(self.height - y - h)} {num(w)} {num(h)} re f\n")
+    
+    def stroke_rect(self, x, y, w, h, rgb, width):
+        self.parts.append(f"{color(rgb)} RG {num(width)} w {num(x)} {num(self.height - y - h)} {num(w)} {num(h)} re S\n")
+    
+    def line(self, x1, y1, x2, y2, rgb, width):
+        self.parts.append(f"{color(rgb)} RG {num(width)} w {num(x1)} {num(self.height - y1)} m "
+                          f"{num(x2)} {num(self.height - y2)} l S\n")
+    
+    def text(self, font, x, baseline, text, rgb, align='left', width=None):
+        """Draw a line of text with its baseline at `baseline`
+        
+        align is 'left' (x is the left edge), 'right' (x is the right edge),
+        'centre' (x is the middle) or 'justify' (spaces stretched so the line
+        fills `width` points to the left of x). Returns the drawn width.
+        """
+        gids, chars, natural = font.shape(text)
+        self.document.use(gids, chars)
+        
+        spacing = 0
+        if align == 'justify' and width and ' ' in chars:
+            spacing = (width - natural) / chars.count(' ')
+            left = x - width
+        elif align in ('right', 'justify'):
+            left = x - natural
+        elif align == 'centre':
+            left = x - natural / 2
+        else:
+            left = x
+        
+        self.parts.append(f"BT {color(rgb)} rg /F1 {num(font.size)} Tf {num(left)} {num(self.height - baseline)} Td ")
+        self.parts.append((gids, font.font.glyph_id(' '), -spacing * 1000 / font.size if spacing else 0))
+        self.parts.append(" TJ ET\n")
+        return natural if not spacing else width
+    
+    def content(self, new_ids):
+        """The content stream, with glyph ids mapped into the subset font"""
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            gids, space, adjust = part
+            pieces = []
+            run = ''
+            for gid in gids:
+                run += f"{new_ids[gid]:04X}"
+                if adjust and gid == space:
+                    pieces.append(f"<{run}> {num(adjust)}")
+                    run = ''
+            if run:
+                pieces.append(f"<{run}>")
+            out.append(f"[{' '.join(pieces)}]")
+        return ''.join(out).encode('latin-1')
+
+class PdfDocument:
+    """Pages drawn with one embedded font, serialised to a compact PDF"""
+    
+    def __init__(self, font_path, title=None, lang='he'):
+        self.font = load_font(font_path)
+        self.title = title
+        self.lang = lang
+        self.pages = []
+        self.used = {}  # glyph id -> the character it stands for
+    
+    def font_at(self, size):
+        return pdf_font(self.font.path, size)
+    
+    def add_page(self, width=A4[0], height=A4[1]):
+        page = PdfPage(self, width, height)
+        self.pages.append(page)
+        return page
+    
+    def use(self, gids, chars):
+        for gid, char in zip(gids, chars):
+            self.used.setdefault(gid, char)
+    
+    def to_unicode(self, new_ids):
+        """ToUnicode CMap of the subset glyphs"""
+        entries = [f"<{new_ids[gid]:04X}> <{char.encode('utf-16-be').hex().upper()}>"
+                   for gid, char in sorted(self.used.items(), key=lambda item: new_ids[item[0]]) if gid]
+        blocks = []
+        for start in range(0, len(entries), 100):
+            chunk = entries[start:start + 100]
+            blocks.append(f"{len(chunk)} beginbfchar\n" + '\n'.join(chunk) + "\nendbfchar\n")
+        return ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+                "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+                "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n" + ''.join(blocks) +
+                "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n").encode('ascii')
+    
+    def widths(self, new_ids):
+        """/W array: advance widths of the subset glyphs in 1/1000 em"""
+        scale = 1000 / self.font.units_per_em
+        by_new_id = sorted((new_id, gid) for gid, new_id in new_ids.items())
+        values = ' '.join(str(round(self.font.advance(gid) * scale)) for _, gid in by_new_id)
+        return f"[{by_new_id[0][0]} [{values}]]"
+    
+    def to_bytes(self):
+        """Serialise the document"""
+        font_data, new_ids = self.font.subset(self.used)
+        new_ids.setdefault(0, 0)
+        tag = ''.join(chr(65 + b % 26) for b in hashlib.sha256(repr(sorted(new_ids)).encode()).digest()[:6])
+        base_font = f"{tag}+{self.font.name}"
+        scale = 1000 / self.font.units_per_em
+        
+        objects = []
+        
+        def add(body):
+            objects.append(body)
+            return len(objects)
+        
+        def stream(data, extra=''):
+            packed = zlib.compress(data, 9)
+            return f"<< /Length {len(packed)} /Filter /FlateDecode{extra} >>\nstream\n".encode('ascii') + packed + b"\nendstream"
+        
+        catalog = add(None)
+        pages = add(None)
+        if self.font.cff:
+            font_file = add(stream(font_data, " /Subtype /OpenType"))
+            file_key, cid_type = "FontFile3", "CIDFontType0"
+        else:
+            font_file = add(stream(font_data, f" /Length1 {len(font_data)}"))
+            file_key, cid_type = "FontFile2", "CIDFontType2"
+        descriptor = add(
+            f"<< /Type /FontDescriptor /FontName /{base_font} /Flags 4 "
+            f"/FontBBox [{' '.join(str(round(v * scale)) for v in self.font.bbox)}] "
+            f"/ItalicAngle {num(self.font.italic_angle)} /Ascent {round(self.font.ascent * scale)} "
+            f"/Descent {round(self.font.descent * scale)} /CapHeight {round(self.font.cap_height * scale)} "
+            f"/StemV 80 /{file_key} {font_file} 0 R >>".encode('ascii'))
+        cid_font = add(
+            f"<< /Type /Font /Subtype /{cid_type} /BaseFont /{base_font} "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {descriptor} 0 R /W {self.widths(new_ids)}"
+            f"{' /CIDToGIDMap /Identity' if not self.font.cff else ''} >>".encode('ascii'))
+        to_unicode = add(stream(self.to_unicode(new_ids)))
+        font = add(f"<< /Type /Font /Subtype /Type0 /BaseFont /{base_font} /Encoding /Identity-H "
+                   f"/DescendantFonts [{cid_font} 0 R] /ToUnicode {to_unicode} 0 R >>".encode('ascii'))
+        
+        page_ids = []
+        for page in self.pages:
+            contents = add(stream(page.content(new_ids)))
+            page_ids.append(add(
+                f"<< /Type /Page /Parent {pages} 0 R /MediaBox [0 0 {num(page.width)} {num(page.height)}] "
+                f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {contents} 0 R >>".encode('ascii')))
+        
+        objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages} 0 R /Lang ({self.lang}) >>".encode('ascii')
+        objects[pages - 1] = (f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] "
+                              f"/Count {len(page_ids)} >>").encode('ascii')
+        info = add(f"<< /Title {pdf_string(self.title)} /Producer (mishnah_pdf.py) >>".encode('ascii')
+                   if self.title else b"<< /Producer (mishnah_pdf.py) >>")
+        
+        out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+        out += ''.join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('ascii')
+        out += (f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\n"
+                f"startxref\n{xref}\n%%EOF\n").encode('ascii')
+        return bytes(out)
+    
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+def subset_glyphs(font_data):
+    """(advance width, raw 'glyf' data) of every glyph of a subset written by TrueTypeFont.subset"""
+    (num_tables,) = struct.unpack_from(">H", font_data, 4)
+    tables = {}
+    for index in range(num_tables):
+        tag, _, offset, length = struct.unpack_from(">4sIII", font_data, 12 + 16 * index)
+        tables[tag] = font_data[offset:offset + length]
+    (glyph_count,) = struct.unpack_from(">H", tables[b'maxp'], 4)
+    (metric_count,) = struct.unpack_from(">H", tables[b'hhea'], 34)
+    loca = struct.unpack_from(f">{glyph_count + 1}I", tables[b'loca'])
+    advances = [struct.unpack_from(">H", tables[b'hmtx'], 4 * min(gid, metric_count - 1))[0] for gid in range(glyph_count)]
+    return [(advances[gid], tables[b'glyf'][loca[gid]:loca[gid + 1]]) for gid in range(glyph_count)]
+
+def read_pdf(data):
+    """Parse a PDF written by PdfDocument back into its parts, raising ValueError where it is malformed
+    
+    Returns a dict with 'pages' (per page, the (font size, CIDs) of every glyph
+    run in drawing order), 'to_unicode' (CID -> character), 'widths' (CID ->
+    advance in 1/1000 em) and 'font' (the embedded font file). Only reads what
+    to_bytes writes: a classic xref table, direct dictionaries, Flate streams.
+    """
+    def search(pattern, text, what):
+        match = re.search(pattern, text)
+        if not match:
+            raise ValueError(f"no {what}")
+        return match
+    
+    if not data.startswith(b"%PDF-"):
+        raise ValueError("no %PDF header")
+    match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data)
+    if not match:
+        raise ValueError("no startxref at the end of the file")
+    xref = int(match.group(1))
+    match = re.match(rb"xref\s+0 (\d+)\s+", data[xref:])
+    if not match:
+        raise ValueError(f"startxref {xref} does not point at an xref table")
+    count = int(match.group(1))
+    entries = data[xref + match.end():xref + match.end() + 20 * count]
+    offsets = {number: int(entries[20 * number:20 * number + 10]) for number in range(1, count)}
+    trailer = data[xref + match.end() + 20 * count:]
+    if not re.match(rb"trailer\s+<<", trailer) or f"/Size {count} ".encode('ascii') not in trailer:
+        raise ValueError(f"trailer /Size does not match the {count} xref entries")
+    
+    objects = {}
+    for number, offset in offsets.items():
+        header = f"{number} 0 obj\n".encode('ascii')
+        if data[offset:offset + len(header)] != header:
+            raise ValueError(f"xref offset {offset} of object {number} does not start it")
+        end = data.find(b"\nendobj\n", offset)
+        body = data[offset + len(header):end]
+        if b"\nstream\n" not in body:
+            objects[number] = (body.decode('latin-1'), None)
+            continue
+        head, packed = body.split(b"\nstream\n", 1)
+        head = head.decode('latin-1')
+        length = int(search(r"/Length (\d+)", head, f"/Length in object {number}").group(1))
+        if packed[length:] != b"\nendstream":
+            raise ValueError(f"/Length of object {number} does not end at endstream")
+        packed = packed[:length]
+        objects[number] = (head, zlib.decompress(packed) if "/FlateDecode" in head else packed)
+    
+    def ref(number, key):
+        match = re.search(rf"/{key} \[?(\d+) 0 R", objects[number][0])
+        if not match or int(match.group(1)) not in objects:
+            raise ValueError(f"object {number} has no valid /{key} reference")
+        return int(match.group(1))
+    
+    match = re.search(rb"/Root (\d+) 0 R", trailer)
+    if not match or int(match.group(1)) not in objects:
+        raise ValueError("trailer has no valid /Root")
+    catalog = int(match.group(1))
+    pages = ref(catalog, "Pages")
+    kids = [int(kid) for kid in re.findall(r"(\d+) 0 R", search(r"/Kids \[([^\]]*)\]", objects[pages][0], "/Kids").group(1))]
+    if f"/Count {len(kids)} " not in objects[pages][0]:
+        raise ValueError(f"/Count does not match the {len(kids)} page objects")
+    
+    result = {'pages': [], 'to_unicode': {}, 'widths': {}, 'font': None}
+    fonts = set()
+    for kid in kids:
+        fonts.add(ref(kid, "F1"))
+        content = objects[ref(kid, "Contents")][1].decode('latin-1')
+        runs = []
+        for size, array in re.findall(r"/F1 ([\d.]+) Tf [^\[]*\[([^\]]*)\] TJ", content):
+            codes = ''.join(re.findall(r"<([0-9A-F]*)>", array))
+            runs.append((float(size), [int(codes[i:i + 4], 16) for i in range(0, len(codes), 4)]))
+        result['pages'].append(runs)
+    if len(fonts) != 1:
+        raise ValueError(f"pages use {len(fonts)} different fonts, expected one")
+    
+    font = fonts.pop()
+    cmap = objects[ref(font, "ToUnicode")][1].decode('ascii')
+    for block in re.findall(r"beginbfchar\n(.*?)endbfchar", cmap, re.S):
+        for cid, utf16 in re.findall(r"<([0-9A-F]{4})> <([0-9A-F]+)>", block):
+            result['to_unicode'][int(cid, 16)] = bytes.fromhex(utf16).decode('utf-16-be')
+    cid_font = ref(font, "DescendantFonts")
+    first, values = search(r"/W \[(\d+) \[([^\]]*)\]\]", objects[cid_font][0], "/W array").groups()
+    result['widths'] = {int(first) + index: int(value) for index, value in enumerate(values.split())}
+    descriptor = ref(cid_font, "FontDescriptor")
+    file_key = "FontFile3" if "/FontFile3" in objects[descriptor][0] else "FontFile2"
+    result['font'] = objects[ref(descriptor, file_key)][1]
+    return result
+
+if __name__ == "__main__":
+    from mishnah_fonts import resolve_font_path
+    
+    if len(sys.argv) != 3:
+        raise SystemExit("Usage: mishnah_pdf.py TEXT OUTPUT.pdf")
+    document = PdfDocument(resolve_font_path(), title=sys.argv[1])
+    page = document.add_page()
+    page.text(document.font_at(24), A4[0] - 50, 100, sys.argv[1], (40, 40, 40), align='right')
+    document.save(sys.argv[2])
+    print(f"📄 {sys.argv[2]}")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Streaming fetch -> normalise -> render pipeline for the Mishnah images
+
+generate_all_mishnah_images.py renders from files that an earlier
+fetch_mishnayot.py run left behind. This module chains the same steps as
+generators instead, so every chapter flows straight from its source
+through normalisation into rendering:
+
+    source      (tractate_name, chapter_num, texts), one chapter at a time:
+                  corpus  the compact store (mishnah_corpus.bin)
+                  json    the mishnayot_texts/ tree
+                  fetch   the Sefaria API, chapters fetched concurrently and
+                          handed on in order as they arrive
+    numbered    output numbers, as generate_all_mishnah_images.py assigns them
+    builds      only the images the build cache says are missing or stale
+    render      drawn and encoded in this process, or in -j worker processes
+
+Nothing is read ahead of need: the fetch stage keeps at most --window
+chapters in flight and the render stage at most --window chapters queued
+for the workers, so a slow stage holds back the ones before it and memory
+stays bounded however large the source is. A fresh tractate goes from the
+network to images in one pass, without writing the JSON tree (unless
+--save-json asks for it).
+
+Output numbers depend on how many chapters and mishnayot come before a
+tractate, so rendering a few tractates (--tractates) takes the counts of
+the tractates before them from the corpus. The build cache and changed-file
+list are shared with generate_all_mishnah_images.py.
+
+Usage:
+    python3 scripts/mishnah_pipeline.py                                        # corpus (or JSON tree) -> images
+    python3 scripts/mishnah_pipeline.py --source fetch --tractates Mishnah_Kinnim
+    python3 scripts/mishnah_pipeline.py --source fetch --base-url http://127.0.0.1:8765 -j 4
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
+
+import fetch_mishnayot
+import generate_all_mishnah_images as renderer
+from mishnah_build_cache import CHANGED_LIST_FILE, BuildCache, config_fingerprint, write_changed_list
+from mishnah_corpus import (CORPUS_FILE, MISHNAH_TRACTATES, MISHNAYOT_DIR, MishnahCorpus, chapter_texts,
+                            ensure_fresh_corpus, iter_json_chapters)
+from mishnah_encoders import ENCODE_THREADS, ENCODERS, available_modes
+from mishnah_fonts import configure_font, describe_font_setup
+from mishnah_profiling import merge_profile, print_run_report, profiling_enabled, write_run_report
+
+SOURCES = ("auto", "corpus", "json", "fetch")
+DEFAULT_WINDOW = 8  # chapters in flight per stage
+RUN_REPORT_FILE = Path("mishnah_pipeline_report.json")
+PIPELINE_STAGES = fetch_mishnayot.FETCH_STAGES + renderer.PIPELINE_STAGES
+
+def ordered_prefetch(tasks, run, workers, window):
+    """Yield (task, run(*task)) in task order, running at most `window` tasks ahead on a thread pool
+    
+    Tasks are only drawn from `tasks` as results are consumed, so a slow
+    consumer holds the producers back.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for task in tasks:
+            in_flight.append((task, executor.submit(run, *task)))
+            if len(in_flight) >= window:
+                task, future = in_flight.popleft()
+                yield task, future.result()
+        while in_flight:
+            task, future = in_flight.popleft()
+            yield task, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def corpus_chapters(tractates=None, corpus_path=CORPUS_FILE):
+    """Chapters from the compact corpus (already normalised when it was built, rebuilt if stale)"""
+    ensure_fresh_corpus(corpus_path)
+    corpus = MishnahCorpus(corpus_path)
+    try:
+        yield from corpus.iter_chapters(tractates)
+    finally:
+        corpus.close()
+
+def json_chapters(tractates=None, source_dir=MISHNAYOT_DIR, strip_nikud=False):
+    """Chapters parsed and normalised from the mishnayot_texts/ tree"""
+    yield from iter_json_chapters(source_dir, strip_nikud, tractates)
+
+def fetch_chapters(tractates=None, concurrency=fetch_mishnayot.DEFAULT_CONCURRENCY, rate=fetch_mishnayot.DEFAULT_RATE,
+                   window=DEFAULT_WINDOW, max_retries=fetch_mishnayot.DEFAULT_MAX_RETRIES, strip_nikud=False,
+                   save_json=False):
+    """Chapters fetched live from the Sefaria API and normalised as they arrive
+    
+    Chapter counts come from one index request per tractate, made when the
+    stream reaches it. A chapter that still fails after all retries stops the
+    stream (RuntimeError): skipping it would shift every later output number.
+    With save_json the responses are also saved to mishnayot_texts/ and the
+    fetch manifest, as fetch_mishnayot.py would.
+    """
+    limiter = fetch_mishnayot.TokenBucket(rate)
+    manifest = fetch_mishnayot.load_manifest() if save_json else None
+    
+    def chapter_tasks():
+        for tractate_name in tractates or MISHNAH_TRACTATES:
+            num_chapters, meta = fetch_mishnayot.fetch_index(tractate_name, limiter, max_retries=max_retries)
+            if not num_chapters:
+                raise RuntimeError(f"could not fetch the chapter count of {tractate_name} ({meta.get('error')})")
+            for chapter_num in range(1, num_chapters + 1):
+                yield tractate_name, chapter_num
+    
+    def fetch(tractate_name, chapter_num):
+        return fetch_mishnayot.fetch_chapter(tractate_name, chapter_num, limiter, max_retries=max_retries)
+    
+    try:
+        for (tractate_name, chapter_num), (chapter_data, meta) in ordered_prefetch(chapter_tasks(), fetch,
+                                                                                   concurrency, window):
+            if not chapter_data:
+                raise RuntimeError(f"{tractate_name} {chapter_num} could not be fetched "
+                                   f"({meta.get('error') or meta.get('status')})")
+            if save_json:
+                sha256 = fetch_mishnayot.save_chapter(tractate_name, chapter_num, chapter_data)
+                fetch_mishnayot.record_chapter(manifest, tractate_name, chapter_num, meta, sha256)
+            yield tractate_name, chapter_num, chapter_texts(chapter_data, strip_nikud)
+    finally:
+        if save_json:
+            fetch_mishnayot.save_manifest(manifest)
+
+def open_source(kind, tractates=None, **options):
+    """Chapter stream of the given source kind ("auto" picks the corpus if it has been built)"""
+    if kind == "auto":
+        kind = "corpus" if CORPUS_FILE.exists() else "json"
+    if kind == "corpus":
+        return corpus_chapters(tractates)
+    if kind == "json":
+        return json_chapters(tractates, strip_nikud=options.get('strip_nikud', False))
+    if kind == "fetch":
+        return fetch_chapters(tractates, **options)
+    raise ValueError(f"unknown source {kind!r} (expected one of {', '.join(SOURCES)})")
+
+def first_numbers(counts, tractate_name):
+    """Chapter and mishnah output numbers used up by the tractates before `tractate_name`"""
+    chapters = mishnayot = 0
+    for name in MISHNAH_TRACTATES[:MISHNAH_TRACTATES.index(tractate_name)]:
+        if name not in counts:
+            raise RuntimeError(f"{name} is not in {CORPUS_FILE}, so the output numbers of {tractate_name} "
+                               f"are unknown - include {name} or rebuild the corpus")
+        chapters += counts[name][0]
+        mishnayot += counts[name][1]
+    return chapters, mishnayot
+
+def numbered(chapters, counts=None):
+    """Turn a chapter stream into work units (tractate_name, chapter_num, texts, chapter_number, first_mishnah_number)
+    
+    Without counts the stream must start at the first tractate and numbers
+    simply run on, as in plan_work_units. With counts (chapters with text and
+    mishnayot per tractate, e.g. from the corpus), each tractate starts after
+    the tractates before it; counts of tractates already streamed replace the
+    given ones. Chapters without text get no number and are dropped.
+    """
+    counts = dict(counts) if counts is not None else None
+    chapter_number = mishnah_number = 0
+    current_tractate = None
+    streamed = [0, 0]
+    
+    for tractate_name, chapter_num, mishnayot_texts in chapters:
+        if tractate_name != current_tractate:
+            if counts is not None:
+                if current_tractate is not None:
+                    counts[current_tractate] = tuple(streamed)
+                chapter_number, mishnah_number = first_numbers(counts, tractate_name)
+            current_tractate = tractate_name
+            streamed = [0, 0]
+        
+        if not mishnayot_texts:
+            continue
+        
+        chapter_number += 1
+        streamed[0] += 1
+        streamed[1] += len(mishnayot_texts)
+        yield tractate_name, chapter_num, mishnayot_texts, chapter_number, mishnah_number + 1
+        mishnah_number += len(mishnayot_texts)
+
+def stale_builds(units, cache, fingerprint, force=False):
+    """Pair each unit with its missing or stale outputs (all of them with force), skipping up-to-date units"""
+    for unit in units:
+        outputs = renderer.unit_outputs(unit, fingerprint)
+        stale = outputs if force else [output for output in outputs if not cache.is_fresh(output[1], output[2])]
+        if stale:
+            yield unit, stale
+
+def render_stream_parallel(builds, cache, changed, jobs, window=DEFAULT_WINDOW):
+    """Render a stream of builds on a pool of worker processes, with at most `window` chapters queued"""
+    print(f"⚡ Rendering with {jobs} worker processes\n")
+    done = 0
+    
+    def finish(futures):
+        nonlocal done
+        for future in futures:
+            stale = in_flight.pop(future)
+            result, profile = future.result()
+            merge_profile(profile)
+            tractate_name, chapter_num, chapter_number, mishnah_count, written, pages = result
+            renderer.record_build(cache, changed, stale, written, pages)
+            done += 1
+            print(f"  ✅ [{done}] Chapter {chapter_number}: {tractate_name} פרק {chapter_num} "
+                  f"({len(stale)} of {mishnah_count + 1} images)")
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=renderer.configure_render,
+                             initargs=(renderer.FIT_TO_CONTENT, renderer.MAX_PAGE_HEIGHT, renderer.OUTPUT_FORMAT,
+                                       renderer.ENCODE_THREADS, None, profiling_enabled(), renderer.RENDER_SCALE,
+                                       renderer.LAYOUT_CACHE)) as executor:
+        in_flight = {}
+        for unit, stale in builds:
+            in_flight[executor.submit(renderer.run_work_unit, unit, {output[0] for output in stale})] = stale
+            if len(in_flight) >= window:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finish(finished)
+        finish(list(as_completed(in_flight)))
+
+def run_pipeline(chapters, counts=None, jobs=1, window=DEFAULT_WINDOW, force=False):
+    """Number, plan and render a chapter stream into the image directories; returns (units seen, files written)"""
+    renderer.OUTPUT_DIR_CHAPTERS.mkdir(exist_ok=True)
+    renderer.OUTPUT_DIR_SINGLE.mkdir(exist_ok=True)
+    
+    cache = BuildCache()
+    fingerprint = config_fingerprint(renderer.render_config())
+    seen = 0
+    
+    def counted(units):
+        nonlocal seen
+        for unit in units:
+            seen += 1
+            yield unit
+    
+    builds = stale_builds(counted(numbered(chapters, counts)), cache, fingerprint, force)
+    changed = []
+    try:
+        if jobs > 1:
+            render_stream_parallel(builds, cache, changed, jobs, window)
+        else:
+            renderer.render_serial(builds, cache, changed)
+    finally:
+        # Keep whatever finished, so an interrupted run resumes where it stopped
+        renderer.close_writer()
+        cache.save()
+        write_changed_list(changed)
+    
+    return seen, changed
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Stream Mishnah chapters from a source straight into images")
+    parser.add_argument("--source", choices=SOURCES, default="auto",
+                        help=f"where chapters come from (default: auto = {CORPUS_FILE} if built, else {MISHNAYOT_DIR}/)")
+    parser.add_argument("--tractates", nargs="+", metavar="NAME",
+                        help="only these tractates (e.g. Mishnah_Kinnim); numbers come from the corpus")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of rendering processes (0 = one per CPU core, default: 1)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"chapters in flight per stage - bounds memory (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--force", action="store_true", help="redraw every image of the streamed chapters")
+    parser.add_argument("--font", metavar="PATH",
+                        help="Hebrew TrueType/OpenType font to render with (default: auto-detect)")
+    parser.add_argument("--format", choices=sorted(ENCODERS), default=renderer.OUTPUT_FORMAT,
+                        help=f"output encoding (default: {renderer.OUTPUT_FORMAT})")
+    parser.add_argument("--fixed-height", action="store_true", help="draw every image on a fixed-height page")
+    parser.add_argument("--max-page-height", type=int, default=renderer.MAX_PAGE_HEIGHT, metavar="PX",
+                        help="split content-sized images taller than this into numbered pages")
+    parser.add_argument("--scale", type=float, default=renderer.RENDER_SCALE,
+                        help="pixels per layout pixel (default: 1; reuses cached layouts)")
+    parser.add_argument("--no-layout-cache", action="store_true",
+                        help="lay out every image again instead of replaying cached display lists")
+    parser.add_argument("--strip-nikud", action="store_true",
+                        help="drop vowel points and cantillation (json and fetch sources)")
+    parser.add_argument("--concurrency", type=int, default=fetch_mishnayot.DEFAULT_CONCURRENCY,
+                        help=f"fetch workers (default: {fetch_mishnayot.DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=fetch_mishnayot.DEFAULT_RATE,
+                        help=f"max requests per second (default: {fetch_mishnayot.DEFAULT_RATE})")
+    parser.add_argument("--max-retries", type=int, default=fetch_mishnayot.DEFAULT_MAX_RETRIES,
+                        help=f"retries per request (default: {fetch_mishnayot.DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--base-url", metavar="URL", default=os.environ.get("SEFARIA_BASE_URL"),
+                        help="API server to fetch from (default: $SEFARIA_BASE_URL or Sefaria)")
+    parser.add_argument("--save-json", action="store_true",
+                        help=f"also save fetched chapters to {MISHNAYOT_DIR}/ and the fetch manifest")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time every stage and write {RUN_REPORT_FILE}")
+    return parser.parse_args()
+
+def main():
+    """Stream chapters from the chosen source into images"""
+    args = parse_args()
+    jobs = args.jobs or os.cpu_count()
+    
+    tractates = None
+    if args.tractates:
+        unknown = [name for name in args.tractates if name not in MISHNAH_TRACTATES]
+        if unknown:
+            raise SystemExit(f"❌ Unknown tractates: {', '.join(unknown)}")
+        tractates = [name for name in MISHNAH_TRACTATES if name in args.tractates]
+    if args.format not in available_modes():
+        raise SystemExit(f"❌ This Pillow build cannot write {args.format} "
+                         f"(available: {', '.join(available_modes())})")
+    
+    if args.scale <= 0:
+        raise SystemExit("❌ --scale must be positive")
+    
+    renderer.configure_render(not args.fixed_height, args.max_page_height, args.format, ENCODE_THREADS, None,
+                              args.profile, args.scale, not args.no_layout_cache)
+    fetch_mishnayot.configure_api(args.base_url)
+    if args.font:
+        configure_font(args.font)
+    describe_font_setup()
+    started = time.perf_counter()
+    
+    # A subset needs the counts of the tractates before it to number its images
+    counts = None
+    if tractates:
+        if ensure_fresh_corpus(CORPUS_FILE):
+            corpus = MishnahCorpus(CORPUS_FILE)
+            counts = corpus.tractate_counts()
+            corpus.close()
+        else:
+            counts = {}
+    
+    options = {'strip_nikud': args.strip_nikud}
+    if args.source == "fetch":
+        options.update(concurrency=args.concurrency, rate=args.rate, window=args.window,
+                       max_retries=args.max_retries, save_json=args.save_json)
+    
+    print(f"🌊 Streaming {', '.join(tractates) if tractates else 'all tractates'} from {args.source} "
+          f"(window {args.window})")
+    try:
+        seen, changed = run_pipeline(open_source(args.source, tractates, **options), counts, jobs, args.window,
+                                     args.force)
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    elapsed = time.perf_counter() - started
+    
+    if profiling_enabled():
+        report = write_run_report(RUN_REPORT_FILE, "mishnah_pipeline.py", elapsed, {
+            'source': args.source,
+            'tractates': tractates,
+            'jobs': jobs,
+            'window': args.window,
+            'output_format': args.format,
+        }, PIPELINE_STAGES)
+        print_run_report(report)
+        print(f"📝 Run report: {RUN_REPORT_FILE}")
+    
+    print(f"\n🎉 Done! {seen} chapters streamed, {len(changed)} files written in {elapsed:.1f}s "
+          f"(listed in {CHANGED_LIST_FILE})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-stage profiling for the Mishnah scripts
+
+The fetch and render scripts wrap each pipeline stage in stage():
+
+    fetch    HTTP requests to Sefaria (one per attempt)
+    parse    JSON decoding
+    extract  picking the Hebrew texts out of a chapter
+    strip    HTML tag / whitespace stripping
+    wrap     line breaking
+    draw     page drawing
+    encode   image encoding
+    write    writing files
+
+While profiling is off (the default) stage() is a shared no-op context
+manager, so the hooks cost next to nothing. With --profile every stage
+records a call count, total/min/max time and a latency histogram, the
+scripts add counters (requests, pages, bytes...) and the slowest items
+(chapters, requests) are kept so outliers stand out. The run then writes
+a JSON report next to its outputs.
+
+--profile-code cprofile|sample additionally dumps a cProfile .prof file
+(open with `python3 -m pstats` or snakeviz) or a sampled collapsed-stack
+file (flamegraph.pl / speedscope).
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+# Histogram bucket upper bounds in milliseconds (the last bucket catches everything slower)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+OUTLIER_COUNT = 10
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+CODE_PROFILERS = ("cprofile", "sample")
+
+REPORT_VERSION = 1
+
+_NO_STAGE = nullcontext()
+
+class StageTimer:
+    """Times one pass through a stage and records it on exit"""
+    
+    __slots__ = ('profiler', 'name', 'item', 'started')
+    
+    def __init__(self, profiler, name, item):
+        self.profiler = profiler
+        self.name = name
+        self.item = item
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.started, self.item)
+        return False
+
+class Profiler:
+    """Thread-safe per-stage counts, times and latency histograms, plus free-form counters"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.stages = {}
+        self.counters = Counter()
+        self.items = {}
+    
+    def stage(self, name, item=None):
+        """Context manager timing one pass through `name`; `item` (e.g. a chapter) is tracked for outliers"""
+        return StageTimer(self, name, item)
+    
+    def record(self, name, seconds, item=None):
+        """Add one timed pass through a stage"""
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {'count': 0, 'total': 0.0, 'min': seconds, 'max': seconds,
+                                             'buckets': [0] * (len(BUCKETS_MS) + 1)}
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['min'] = min(stats['min'], seconds)
+            stats['max'] = max(stats['max'], seconds)
+            stats['buckets'][bucket] += 1
+            if item is not None:
+                items = self.items.setdefault(name, {})
+                items[item] = items.get(item, 0.0) + seconds
+    
+    def count(self, name, n=1):
+        """Bump a counter"""
+        with self.lock:
+            self.counters[name] += n
+    
+    def snapshot(self):
+        """Plain-data copy of everything recorded (picklable, so workers can send it back)"""
+        with self.lock:
+            return {
+                'stages': {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self.stages.items()},
+                'counters': dict(self.counters),
+                'items': {name: dict(items) for name, items in self.items.items()},
+            }
+    
+    def drain(self):
+        """Snapshot and start over - a worker process hands its numbers back this way"""
+        with self.lock:
+            snapshot = {'stages': self.stages, 'counters': dict(self.counters), 'items': self.items}
+            self.reset()
+        return snapshot
+    
+    def merge(self, snapshot):
+        """Add another profiler's snapshot (e.g. from a worker process) to this one"""
+        with self.lock:
+            for name, other in snapshot['stages'].items():
+                stats = self.stages.get(name)
+                if stats is None:
+                    self.stages[name] = dict(other, buckets=list(other['buckets']))
+                    continue
+                stats['count'] += other['count']
+                stats['total'] += other['total']
+                stats['min'] = min(stats['min'], other['min'])
+                stats['max'] = max(stats['max'], other['max'])
+                stats['buckets'] = [a + b for a, b in zip(stats['buckets'], other['buckets'])]
+            self.counters.update(snapshot['counters'])
+            for name, other in snapshot['items'].items():
+                items = self.items.setdefault(name, {})
+                for item, seconds in other.items():
+                    items[item] = items.get(item, 0.0) + seconds
+
+def percentile_ms(buckets, fraction):
+    """Upper bound of the histogram bucket holding the given fraction of samples (None past the last bound)"""
+    target = fraction * sum(buckets)
+    seen = 0
+    for bound, count in zip(BUCKETS_MS + (None,), buckets):
+        seen += count
+        if count and seen >= target:
+            return bound
+    return None
+
+def stage_summary(stats):
+    """Report entry for one stage: counts, times in ms, estimated percentiles and the raw histogram"""
+    return {
+        'count': stats['count'],
+        'total_ms': round(stats['total'] * 1000, 3),
+        'mean_ms': round(stats['total'] * 1000 / stats['count'], 3),
+        'min_ms': round(stats['min'] * 1000, 3),
+        'max_ms': round(stats['max'] * 1000, 3),
+        'p50_ms': percentile_ms(stats['buckets'], 0.5),
+        'p95_ms': percentile_ms(stats['buckets'], 0.95),
+        'p99_ms': percentile_ms(stats['buckets'], 0.99),
+        'histogram': {f"<={bound}" if bound is not None else f">{BUCKETS_MS[-1]}": count
+                      for bound, count in zip(BUCKETS_MS + (None,), stats['buckets']) if count},
+    }
+
+# The active profiler (None while profiling is off)
+_profiler = None
+
+def enable_profiling():
+    """Start recording stages in this process from scratch (also used to set up worker processes,
+    which must not send back numbers inherited from the parent through fork)"""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+def profiling_enabled():
+    """Whether stage() is recording"""
+    return _profiler is not None
+
+def stage(name, item=None):
+    """Time a stage if profiling is on; a no-op context manager otherwise"""
+    if _profiler is None:
+        return _NO_STAGE
+    return _profiler.stage(name, item)
+
+def tally(name, n=1):
+    """Bump a counter if profiling is on"""
+    if _profiler is not None:
+        _profiler.count(name, n)
+
+def drain_profile():
+    """This process's numbers since the last drain (None while profiling is off)"""
+    return _profiler.drain() if _profiler is not None else None
+
+def merge_profile(snapshot):
+    """Fold a worker's drained numbers into this process's profiler"""
+    if _profiler is not None and snapshot:
+        _profiler.merge(snapshot)
+
+def run_report(script, elapsed, meta=None, stage_order=()):
+    """Structured report of the run so far"""
+    snapshot = _profiler.snapshot()
+    names = [name for name in stage_order if name in snapshot['stages']]
+    names += sorted(name for name in snapshot['stages'] if name not in names)
+    
+    return {
+        'version': REPORT_VERSION,
+        'script': script,
+        'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'elapsed_s': round(elapsed, 3),
+        'meta': dict({
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'argv': sys.argv[1:],
+        }, **(meta or {})),
+        'stages': {name: stage_summary(snapshot['stages'][name]) for name in names},
+        'counters': snapshot['counters'],
+        'outliers': {
+            name: [{'item': item, 'ms': round(seconds * 1000, 3)}
+                   for item, seconds in sorted(items.items(), key=lambda entry: entry[1], reverse=True)[:OUTLIER_COUNT]]
+            for name, items in snapshot['items'].items()
+        },
+    }
+
+def write_run_report(path, script, elapsed, meta=None, stage_order=()):
+    """Write the run report as JSON (atomically) and return it"""
+    report = run_report(script, elapsed, meta, stage_order)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return report
+
+def print_run_report(report):
+    """Short per-stage summary of a run report"""
+    print(f"\n⏱️  Stage timings ({report['elapsed_s']:.1f}s wall)")
+    print(f"   {'stage':<8} {'calls':>7} {'total s':>9} {'mean ms':>9} {'p95 ms':>8} {'max ms':>9}")
+    for name, stats in report['stages'].items():
+        p95 = stats['p95_ms'] if stats['p95_ms'] is not None else f">{BUCKETS_MS[-1]}"
+        print(f"   {name:<8} {stats['count']:>7} {stats['total_ms'] / 1000:>9.2f} {stats['mean_ms']:>9.2f} "
+              f"{p95:>8} {stats['max_ms']:>9.1f}")
+    for name, outliers in report['outliers'].items():
+        if outliers:
+            slowest = outliers[0]
+            print(f"   🐢 slowest {name}: {slowest['item']} ({slowest['ms']:.0f} ms)")
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval and counts collapsed stacks
+    
+    Much lower overhead than cProfile and it sees the encoder threads too; the
+    output is one "frame;frame;frame count" line per stack, as read by
+    flamegraph.pl and speedscope.
+    """
+    
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+    
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+
+@contextmanager
+def code_profiler(kind, path_stem):
+    """Profile the enclosed code with cProfile or the sampler, dumping to path_stem.prof / .stacks.txt
+    
+    Only this process is profiled - render with -j 1 to see the drawing code.
+    """
+    if kind is None:
+        yield None
+        return
+    
+    if kind == "cprofile":
+        profiler = cProfile.Profile()
+        path = path_stem.with_name(f"{path_stem.name}.prof")
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"🔬 cProfile dump: {path} (python3 -m pstats {path})")
+    elif kind == "sample":
+        sampler = SamplingProfiler()
+        path = path_stem.with_name(f"{path_stem.name}.stacks.txt")
+        sampler.start()
+        try:
+            yield path
+        finally:
+            sampler.stop()
+            sampler.dump(path)
+            print(f"🔬 Sampled stacks: {path} ({sum(sampler.stacks.values())} samples, flamegraph.pl / speedscope)")
+    else:
+        raise ValueError(f"unknown code profiler {kind!r} (expected one of {', '.join(CODE_PROFILERS)})")
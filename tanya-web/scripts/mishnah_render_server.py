@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+On-demand Mishnah image server
+
+Serves the same images as generate_all_mishnah_images.py, numbered the same
+way, but renders each one on its first request instead of pre-rendering the
+whole corpus:
+
+    GET /chapter/{n}.png     chapter image n     (also .webp / .avif)
+    GET /mishnah/{n}.png     single-mishnah image n
+    GET /health
+
+Rendered images are kept in a size-bounded in-memory LRU, backed by a
+content-addressed disk cache (mishnah_render_cache/), so restarts stay warm.
+Concurrent requests for the same image are collapsed into a single render.
+Layouts come from the display-list cache (mishnah_layout_cache/), so the
+.webp of an image already served as .png only replays and encodes it. Fonts
+and pre-rendered title and footer strips stay warm inside the server process,
+so a cold render costs tens of milliseconds.
+
+Usage:
+    python3 scripts/mishnah_render_server.py                 # http://localhost:8080
+    python3 scripts/mishnah_render_server.py --port 9000 --memory-cache 128
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import generate_all_mishnah_images as renderer
+from mishnah_build_cache import config_fingerprint, output_digest
+from mishnah_corpus import CORPUS_FILE, open_corpus
+import mishnah_encoders
+from mishnah_encoders import available_modes, configure_png8, encode_image, extension
+from mishnah_fonts import configure_font, describe_font_setup
+
+DEFAULT_PORT = 8080
+RENDER_CACHE_DIR = Path("mishnah_render_cache")
+MEMORY_CACHE_MB = 64
+CACHE_MAX_AGE = 86400  # seconds browsers and the CDN may reuse an image
+
+# zlib level 9 spends ~100 ms on a chapter page for the last ~8% of bytes - too slow per request
+SERVER_PNG8_COMPRESS_LEVEL = 6
+
+CONTENT_TYPES = {'.png': 'image/png', '.webp': 'image/webp', '.avif': 'image/avif'}
+ROUTE = re.compile(r'^/(chapter|mishnah)/(\d+)(\.png|\.webp|\.avif)$')
+
+class ByteLRU:
+    """Thread-safe LRU of bytes values, bounded by their total size"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            return self.items[key]
+    
+    def put(self, key, value):
+        with self.lock:
+            if key in self.items:
+                self.size -= len(self.items.pop(key))
+            if len(value) > self.max_bytes:
+                return
+            self.items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+class SingleFlight:
+    """Runs one call per key at a time - concurrent callers for the same key share its result"""
+    
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+    
+    def do(self, key, fn):
+        """(result, shared) - shared is True when another caller's in-flight call produced it"""
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        
+        if not leader:
+            return future.result(), True
+        
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result(), False
+
+class RenderService:
+    """Looks up, renders, encodes and caches images by (kind, number, extension)"""
+    
+    def __init__(self, corpus, cache_dir=RENDER_CACHE_DIR, memory_bytes=MEMORY_CACHE_MB * 1024 * 1024):
+        self.corpus = corpus
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory = ByteLRU(memory_bytes)
+        self.flights = SingleFlight()
+        self.fingerprint = config_fingerprint(renderer.render_config())
+        
+        # One encoder per extension: .png uses the renderers' PNG mode
+        png_mode = renderer.OUTPUT_FORMAT if extension(renderer.OUTPUT_FORMAT) == '.png' else 'png8'
+        self.modes = {extension(mode): mode for mode in available_modes() if mode not in ('png', 'png8')}
+        self.modes['.png'] = png_mode
+    
+    def page_spec(self, kind, number):
+        """Cache key parts and display list loader of image `number` (KeyError if there is no such image)"""
+        if kind == 'chapter':
+            tractate_name, chapter_num = self.corpus.chapter_ref(number)
+            texts = self.corpus.get_chapter(tractate_name, chapter_num)
+            return ('chapter', tractate_name, chapter_num, texts), \
+                lambda: renderer.chapter_display_list(tractate_name, chapter_num, texts)
+        
+        tractate_name, chapter_num, mishnah_num = self.corpus.mishnah_ref(number)
+        text = self.corpus.get_mishnah(tractate_name, chapter_num, mishnah_num)
+        return ('single', tractate_name, chapter_num, mishnah_num, text), \
+            lambda: renderer.single_display_list(tractate_name, chapter_num, mishnah_num, text)
+    
+    def image(self, kind, number, ext):
+        """(digest, bytes, cache status) of an image
+        
+        Status is 'memory', 'disk', 'rendered', or 'coalesced' when the request waited
+        for an identical one that was already rendering.
+        """
+        mode = self.modes.get(ext)
+        if mode is None:
+            raise KeyError(f"{ext} output is not available in this Pillow build")
+        
+        key_parts, spec = self.page_spec(kind, number)
+        digest = output_digest(self.fingerprint, mode, mishnah_encoders.PNG8_COMPRESS_LEVEL, *key_parts)
+        
+        data = self.memory.get(digest)
+        if data is not None:
+            return digest, data, 'memory'
+        
+        def load_or_render():
+            disk_path = self.cache_dir / f"{digest}{ext}"
+            if disk_path.exists():
+                return disk_path.read_bytes(), 'disk'
+            
+            # The server never paginates, so this is always a single page
+            pages = renderer.render_display_list(spec())
+            data = encode_image(pages[0], mode, renderer.output_palette())
+            
+            tmp_path = disk_path.with_name(f".{disk_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, disk_path)
+            return data, 'rendered'
+        
+        (data, status), shared = self.flights.do(digest, load_or_render)
+        self.memory.put(digest, data)
+        return digest, data, 'coalesced' if shared else status
+    
+    def warm_up(self):
+        """Load fonts and render the title and footer strips before the first request arrives"""
+        started = time.perf_counter()
+        renderer.render_display_list(self.page_spec('chapter', 1)[1]())
+        renderer.render_display_list(self.page_spec('mishnah', 1)[1]())
+        return time.perf_counter() - started
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """GET /chapter/{n}.png and /mishnah/{n}.png"""
+    
+    service = None
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_body(200, b'ok\n', 'text/plain')
+            return
+        
+        match = ROUTE.match(self.path.split('?', 1)[0])
+        if not match:
+            self.send_body(404, b'not found\n', 'text/plain')
+            return
+        
+        kind, number, ext = match.group(1), int(match.group(2)), match.group(3)
+        started = time.perf_counter()
+        try:
+            digest, data, status = self.service.image(kind, number, ext)
+        except KeyError as e:
+            self.send_body(404, f"{e.args[0]}\n".encode('utf-8'), 'text/plain; charset=utf-8')
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        etag = f'"{digest}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_body(200, data, CONTENT_TYPES[ext], {
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={CACHE_MAX_AGE}',
+            'X-Render-Cache': status,
+            'X-Render-Ms': f'{elapsed_ms:.1f}',
+        })
+    
+    def send_body(self, code, body, content_type, headers=None):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Serve Mishnah images, rendering them on demand")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--memory-cache", type=int, default=MEMORY_CACHE_MB, metavar="MB",
+                        help=f"in-memory LRU size (default: {MEMORY_CACHE_MB} MB)")
+    parser.add_argument("--cache-dir", type=Path, default=RENDER_CACHE_DIR,
+                        help=f"on-disk cache (default: {RENDER_CACHE_DIR})")
+    parser.add_argument("--font", metavar="PATH",
+                        help="Hebrew TrueType/OpenType font to render with (default: auto-detect)")
+    return parser.parse_args()
+
+def main():
+    """Start the render server"""
+    args = parse_args()
+    
+    if args.font:
+        configure_font(args.font)
+    if not CORPUS_FILE.exists():
+        raise SystemExit(f"❌ {CORPUS_FILE} not found - run scripts/mishnah_corpus.py first")
+    
+    # Content-sized single pages, encoded in the request thread
+    renderer.configure_render(True, 0, renderer.OUTPUT_FORMAT, 0)
+    configure_png8(SERVER_PNG8_COMPRESS_LEVEL)
+    describe_font_setup()
+    
+    service = RenderService(open_corpus(), args.cache_dir, args.memory_cache * 1024 * 1024)
+    print(f"🔥 Warmed up in {service.warm_up() * 1000:.0f} ms")
+    
+    RenderRequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), RenderRequestHandler)
+    print(f"🌐 Serving Mishnah images on http://{args.host}:{args.port}/chapter/1.png")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the Mishnah corpus
+
+Builds an inverted index of the Hebrew words of every mishnah into one
+compact binary file that can be served statically and searched in place -
+no database or search backend. Like the corpus, every table has
+fixed-size records and the file is memory-mapped:
+
+    header     magic, version, flags, counts, average mishnah length, offsets,
+               source digest of the corpus it was built from
+    tractates  per tractate: name offset/length
+    docs       per mishnah: tractate index, chapter, mishnah number, word count
+    terms      per distinct word, sorted by UTF-8 bytes: string offset/length,
+               postings offset/length, number of mishnayot containing it
+    postings   per term: (mishnah id delta, occurrences) pairs as LEB128 varints
+    strings    UTF-8 tractate names and words
+
+Mishnah ids are the single-mishnah output numbers minus one, so a hit maps
+straight to single/{id + 1}.png. Those numbers shift when a refetch adds or
+drops mishnayot, so the index records the source digest of the corpus (see
+mishnah_corpus.py) and is rebuilt, with its --keep-nikud setting, when it is
+opened against different texts.
+
+Text and queries are NFC-normalised, so the order nikud marks were typed
+in does not matter, then words are folded: nikud and cantillation are
+removed (unless --keep-nikud) and final letters are written as regular
+ones, so "מקום" matches "מָקוֹם". A query word also matches the word with
+the one-letter prefixes ו ה ב ל מ ש כ in front of it ("שבת" finds "בשבת",
+"ובשבת", "שבשבת"...). Hits have to contain every query word and are
+ranked with BM25.
+
+In a --keep-nikud index, a query word typed without nikud has its marks
+folded before prefix expansion, so it matches every vocalisation of the
+word and its prefixed forms ("שבת" finds "שַׁבָּת", "שֶׁבֶת", "בְּשַׁבָּת"). A
+word typed with nikud matches only that exact vocalisation and gets no
+prefix expansion - a prefix carries its own vowel, so type it too
+("בְּשַׁבָּת").
+
+Usage:
+    python3 scripts/mishnah_search.py --build             # write mishnah_search.bin
+    python3 scripts/mishnah_search.py "תפילין"             # search
+    python3 scripts/mishnah_search.py "ערב שבת" --limit 5
+"""
+
+import argparse
+import math
+import mmap
+import os
+import re
+import struct
+import time
+import unicodedata
+from pathlib import Path
+
+from mishnah_corpus import (CORPUS_FILE, MISHNAYOT_DIR, NIKUD_TABLE, hebrew_title, iter_chapters, open_corpus,
+                            served_source_digest)
+
+SEARCH_INDEX_FILE = Path("mishnah_search.bin")
+
+# Binary layout (little-endian)
+MAGIC = b"MSHNSRCH"
+VERSION = 3
+HEADER = struct.Struct("<8sIIIIIfQQQQQ32s")  # magic, version, flags, counts, avg words, table offsets, source digest
+TRACTATE_RECORD = struct.Struct("<II")  # name off/len
+DOC_RECORD = struct.Struct("<HHHH")  # tractate index, chapter, mishnah, word count
+TERM_RECORD = struct.Struct("<IIIII")  # word off/len, postings off/len, document frequency
+FLAG_NIKUD_KEPT = 1
+
+# One-letter prefixes (ו ה ב ל מ ש כ) that may stand in front of a word, up to PREFIX_DEPTH of them
+PREFIXES = "והבלמשכ"
+PREFIX_DEPTH = 3
+MIN_STEM = 2  # never match a query word shorter than this with prefixes in front
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DEFAULT_LIMIT = 10
+
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+WORD = re.compile(r'[\u05d0-\u05ea]+')
+WORD_WITH_NIKUD = re.compile(r'[\u05d0-\u05ea\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7]+')
+
+def fold_word(word, keep_nikud=False):
+    """Index form of a word: final letters made regular, nikud removed unless keep_nikud"""
+    if not keep_nikud:
+        word = word.translate(NIKUD_TABLE)
+    return word.translate(FINAL_LETTERS)
+
+def tokenize(text, keep_nikud=False):
+    """Folded Hebrew words of a text, in order (punctuation and maqaf split words)"""
+    # Canonical mark order (shin dot before patah, etc.) and no presentation forms, on both the index and query side
+    text = unicodedata.normalize('NFC', text)
+    if keep_nikud:
+        return [fold_word(word, True) for word in WORD_WITH_NIKUD.findall(text)]
+    return WORD.findall(text.translate(NIKUD_TABLE).translate(FINAL_LETTERS))
+
+def prefixed_forms(word, depth=PREFIX_DEPTH):
+    """The word itself plus every form with up to `depth` prefix letters in front of it"""
+    forms = [word]
+    if len(word.translate(NIKUD_TABLE)) < MIN_STEM:
+        return forms
+    
+    frontier = [word]
+    for _ in range(depth):
+        frontier = [prefix + form for form in frontier for prefix in PREFIXES]
+        forms += frontier
+    return forms
+
+def encode_postings(postings):
+    """LEB128 varint (mishnah id delta, occurrences) pairs"""
+    out = bytearray()
+    previous = 0
+    for doc_id, occurrences in postings:
+        for value in (doc_id - previous, occurrences):
+            while value >= 0x80:
+                out.append((value & 0x7f) | 0x80)
+                value >>= 7
+            out.append(value)
+        previous = doc_id
+    return out
+
+def decode_postings(data):
+    """Inverse of encode_postings: [(mishnah id, occurrences)]"""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+    
+    postings = []
+    doc_id = 0
+    for delta, occurrences in zip(values[::2], values[1::2]):
+        doc_id += delta
+        postings.append((doc_id, occurrences))
+    return postings
+
+def build_search_index(output_path=SEARCH_INDEX_FILE, keep_nikud=False):
+    """Index every mishnah of the corpus and write the search index file, returning its stats"""
+    strings = bytearray()
+    tractate_records = []
+    doc_records = []
+    tractate_ids = {}
+    index = {}
+    total_words = 0
+    digest = served_source_digest() or bytes(32)
+    
+    def add_string(text):
+        data = text.encode('utf-8')
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+    
+    for tractate_name, chapter_num, mishnayot_texts in iter_chapters(CORPUS_FILE, MISHNAYOT_DIR):
+        if tractate_name not in tractate_ids:
+            tractate_ids[tractate_name] = len(tractate_records)
+            tractate_records.append(add_string(tractate_name))
+        
+        for mishnah_num, text in enumerate(mishnayot_texts, 1):
+            doc_id = len(doc_records)
+            words = tokenize(text, keep_nikud)
+            doc_records.append((tractate_ids[tractate_name], chapter_num, mishnah_num, len(words)))
+            total_words += len(words)
+            
+            counts = {}
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+            for word, occurrences in counts.items():
+                index.setdefault(word, []).append((doc_id, occurrences))
+    
+    # Terms sorted by their UTF-8 bytes, the order the reader's binary search compares in
+    term_records = []
+    postings_data = bytearray()
+    for word in sorted(index, key=lambda w: w.encode('utf-8')):
+        encoded = encode_postings(index[word])
+        term_records.append((*add_string(word), len(postings_data), len(encoded), len(index[word])))
+        postings_data += encoded
+    
+    tractates_offset = HEADER.size
+    docs_offset = tractates_offset + TRACTATE_RECORD.size * len(tractate_records)
+    terms_offset = docs_offset + DOC_RECORD.size * len(doc_records)
+    postings_offset = terms_offset + TERM_RECORD.size * len(term_records)
+    strings_offset = postings_offset + len(postings_data)
+    average_words = total_words / len(doc_records) if doc_records else 0.0
+    
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_NIKUD_KEPT if keep_nikud else 0, len(tractate_records),
+                            len(doc_records), len(term_records), average_words, tractates_offset,
+                            docs_offset, terms_offset, postings_offset, strings_offset, digest))
+        for table, record_struct in ((tractate_records, TRACTATE_RECORD), (doc_records, DOC_RECORD),
+                                     (term_records, TERM_RECORD)):
+            for record in table:
+                f.write(record_struct.pack(*record))
+        f.write(postings_data)
+        f.write(strings)
+    os.replace(tmp_path, output_path)
+    
+    return {
+        'mishnayot': len(doc_records),
+        'terms': len(term_records),
+        'postings': sum(len(postings) for postings in index.values()),
+        'bytes': strings_offset + len(strings),
+    }
+
+class SearchIndex:
+    """Read-only, memory-mapped view of a search index built by build_search_index"""
+    
+    def __init__(self, path=SEARCH_INDEX_FILE):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version = struct.unpack_from("<8sI", self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} Mishnah search index - rebuild it")
+        
+        (_, _, flags, self.tractate_count, self.doc_count, self.term_count, self.average_words,
+         self.tractates_offset, self.docs_offset, self.terms_offset, self.postings_offset,
+         self.strings_offset, self.source_digest) = HEADER.unpack_from(self.data, 0)
+        self.keep_nikud = bool(flags & FLAG_NIKUD_KEPT)
+        self._folded_terms = None
+        self.tractate_names = [self._string(*TRACTATE_RECORD.unpack_from(self.data, self.tractates_offset + i * TRACTATE_RECORD.size))
+                               for i in range(self.tractate_count)]
+    
+    def close(self):
+        self.data.close()
+    
+    def _string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.data[start:start + length].decode('utf-8')
+    
+    def _term(self, index):
+        return TERM_RECORD.unpack_from(self.data, self.terms_offset + index * TERM_RECORD.size)
+    
+    def _term_bytes(self, index):
+        word_off, word_len = self._term(index)[:2]
+        start = self.strings_offset + word_off
+        return self.data[start:start + word_len]
+    
+    def doc(self, doc_id):
+        """(tractate_name, chapter_num, mishnah_num, word count) of a mishnah id"""
+        tractate_index, chapter_num, mishnah_num, words = DOC_RECORD.unpack_from(
+            self.data, self.docs_offset + doc_id * DOC_RECORD.size)
+        return self.tractate_names[tractate_index], chapter_num, mishnah_num, words
+    
+    def find_term(self, word):
+        """Term table index of an (already folded) word, or None - a binary search over the sorted terms"""
+        key = word.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term_bytes(low) == key:
+            return low
+        return None
+    
+    def folded_terms(self):
+        """{word without nikud: [term table index]} of a --keep-nikud index, built on first use"""
+        if self._folded_terms is None:
+            self._folded_terms = {}
+            for index in range(self.term_count):
+                bare = self._term_bytes(index).decode('utf-8').translate(NIKUD_TABLE)
+                self._folded_terms.setdefault(bare, []).append(index)
+        return self._folded_terms
+    
+    def term_indexes(self, word):
+        """Term table indexes a folded query word matches - every vocalisation of a bare word in a --keep-nikud index"""
+        if self.keep_nikud and word == word.translate(NIKUD_TABLE):
+            return self.folded_terms().get(word, [])
+        term_index = self.find_term(word)
+        return [] if term_index is None else [term_index]
+    
+    def postings(self, term_index):
+        """[(mishnah id, occurrences)] of a term"""
+        _, _, postings_off, postings_len, _ = self._term(term_index)
+        start = self.postings_offset + postings_off
+        return decode_postings(self.data[start:start + postings_len])
+    
+    def word_postings(self, word, prefixes=True):
+        """{mishnah id: occurrences} for a query word, including its prefixed forms
+        
+        A word typed with nikud (only possible in a --keep-nikud index) is matched exactly.
+        """
+        if word != word.translate(NIKUD_TABLE):
+            prefixes = False
+        
+        matches = {}
+        for form in (prefixed_forms(word) if prefixes else [word]):
+            for term_index in self.term_indexes(form):
+                for doc_id, occurrences in self.postings(term_index):
+                    matches[doc_id] = matches.get(doc_id, 0) + occurrences
+        return matches
+    
+    def search(self, query, limit=DEFAULT_LIMIT, prefixes=True):
+        """Mishnayot containing every word of the query, best first
+        
+        Returns a list of {'id', 'number', 'tractate', 'chapter', 'mishnah', 'score'}
+        (number is the single-mishnah output number).
+        """
+        words = list(dict.fromkeys(tokenize(query, self.keep_nikud)))
+        if not words:
+            return []
+        
+        # Rarest word first, so the candidate set shrinks as fast as possible
+        per_word = sorted((self.word_postings(word, prefixes) for word in words), key=len)
+        candidates = set(per_word[0])
+        for matches in per_word[1:]:
+            candidates &= matches.keys()
+        
+        scores = {}
+        for matches in per_word:
+            idf = math.log(1 + (self.doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc_id in candidates:
+                occurrences = matches[doc_id]
+                length = self.doc(doc_id)[3]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.average_words or 1))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * occurrences * (BM25_K1 + 1) / (occurrences + norm)
+        
+        hits = []
+        for doc_id in sorted(scores, key=lambda d: (-scores[d], d))[:limit]:
+            tractate_name, chapter_num, mishnah_num, _ = self.doc(doc_id)
+            hits.append({
+                'id': doc_id,
+                'number': doc_id + 1,
+                'tractate': tractate_name,
+                'chapter': chapter_num,
+                'mishnah': mishnah_num,
+                'score': round(scores[doc_id], 4),
+            })
+        return hits
+
+def ensure_fresh_search_index(path=SEARCH_INDEX_FILE):
+    """Rebuild the search index if the corpus texts have changed since it was built (e.g. after a refetch)
+    
+    Returns True if an index file exists afterwards.
+    """
+    path = Path(path)
+    if not path.exists():
+        return False
+    
+    current = served_source_digest()
+    if current is None:
+        return True
+    
+    try:
+        index = SearchIndex(path)
+    except ValueError:
+        built_from, keep_nikud = None, False
+    else:
+        built_from, keep_nikud = index.source_digest, index.keep_nikud
+        index.close()
+    
+    if built_from != current:
+        print(f"♻️  {path} was built from other texts than the current corpus - rebuilding it")
+        build_search_index(path, keep_nikud)
+    return True
+
+_default_index = None
+
+def open_search_index(path=SEARCH_INDEX_FILE):
+    """Shared SearchIndex for the default index file, opened (and rebuilt if stale) on first use"""
+    global _default_index
+    if _default_index is None:
+        ensure_fresh_search_index(path)
+        _default_index = SearchIndex(path)
+    return _default_index
+
+def search(query, limit=DEFAULT_LIMIT):
+    """Ranked hits for a query from the default index"""
+    return open_search_index().search(query, limit)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Build or query the Mishnah full-text search index")
+    parser.add_argument("query", nargs="*", help="Hebrew words to search for")
+    parser.add_argument("--build", action="store_true", help=f"(re)build {SEARCH_INDEX_FILE} from the corpus")
+    parser.add_argument("--keep-nikud", action="store_true",
+                        help="index words with their nikud instead of folding it away (with --build)")
+    parser.add_argument("--no-prefixes", action="store_true",
+                        help="match query words exactly, without ו/ה/ב/ל/מ/ש/כ prefixes")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                        help=f"number of hits to show (default: {DEFAULT_LIMIT})")
+    return parser.parse_args()
+
+def main():
+    """Build the search index, or run a query against it"""
+    args = parse_args()
+    
+    if args.build:
+        print(f"🔎 Building {SEARCH_INDEX_FILE}...")
+        started = time.perf_counter()
+        stats = build_search_index(keep_nikud=args.keep_nikud)
+        print(f"\n🎉 Done in {time.perf_counter() - started:.1f}s! {stats['mishnayot']} mishnayot, "
+              f"{stats['terms']} distinct words, {stats['postings']} postings")
+        print(f"📦 {SEARCH_INDEX_FILE}: {stats['bytes'] / 1024:.0f} KB")
+    
+    if not args.query:
+        return
+    if not SEARCH_INDEX_FILE.exists():
+        raise SystemExit(f"❌ {SEARCH_INDEX_FILE} not found - run scripts/mishnah_search.py --build first")
+    
+    index = open_search_index()
+    query = ' '.join(args.query)
+    started = time.perf_counter()
+    hits = index.search(query, args.limit, prefixes=not args.no_prefixes)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"🔎 {len(hits)} hits for \"{query}\" ({elapsed_ms:.1f} ms)\n")
+    corpus = open_corpus() if CORPUS_FILE.exists() else None
+    for hit in hits:
+        print(f"  📖 {hebrew_title(hit['tractate'])} {hit['chapter']}:{hit['mishnah']} "
+              f"(single/{hit['number']}.png, score {hit['score']:.2f})")
+        if corpus:
+            text = corpus.get_mishnah(hit['tractate'], hit['chapter'], hit['mishnah'])
+            print(f"     {text[:120]}{'...' if len(text) > 120 else ''}")
+
+if __name__ == "__main__":
+    main()
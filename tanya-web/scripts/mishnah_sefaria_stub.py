@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Sefaria API, for offline fetch testing and benchmarking
+
+Serves the endpoints fetch_mishnayot.py uses from the checked-in
+mishnayot_texts/ tree, so the fetcher can be run, timed and broken on
+purpose without touching sefaria.org.il:
+
+    GET /api/v2/index/{tractate}          chapter count (schema.lengths)
+    GET /api/v3/texts/{tractate}.{n}      the saved chapter response, byte for byte
+    GET /api/v3/texts/{tractate}          the whole tractate (for --bulk)
+    GET /_stats                           request counts by status
+
+Chapter responses carry an ETag and Last-Modified and answer conditional
+requests with 304, like the real API. Faults can be injected, reproducibly
+with --seed: --latency/--jitter delay every response, --error-rate answers
+a share of requests with 429 (with Retry-After) or 503, --timeout-rate
+stalls a share of requests past the client's timeout, and --flaky N fails
+the first N attempts at every URL.
+
+With --record URL, requests that have no recorded fixture are forwarded to
+that upstream and the responses saved under --fixtures; recorded fixtures
+are always served in preference to the synthesised ones.
+
+Usage:
+    python3 scripts/mishnah_sefaria_stub.py                                  # http://127.0.0.1:8765
+    python3 scripts/mishnah_sefaria_stub.py --latency 80 --error-rate 0.05 --seed 1
+    python3 scripts/mishnah_sefaria_stub.py --record https://www.sefaria.org.il
+    python3 scripts/mishnah_sefaria_stub.py --check                         # build every response once, then exit
+    python3 scripts/fetch_mishnayot.py --base-url http://127.0.0.1:8765
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import requests
+
+from fetch_mishnayot import SECTION_FIELDS
+from mishnah_corpus import MISHNAYOT_DIR, chapter_files
+
+DEFAULT_PORT = 8765
+FIXTURES_DIR = Path("sefaria_fixtures")
+DEFAULT_RETRY_AFTER = 1  # seconds, sent with injected 429s
+DEFAULT_STALL = 15.0  # seconds an injected timeout holds the request (the fetcher gives up after 10)
+
+INDEX_ROUTE = re.compile(r'^/api/v2/index/(\w+)$')
+CHAPTER_ROUTE = re.compile(r'^/api/v3/texts/(\w+)\.(\d+)$')
+BOOK_ROUTE = re.compile(r'^/api/v3/texts/(\w+)$')
+
+def version_field(chapter, index, field, default):
+    """A field of a chapter's index-th version, or default if the chapter has no such version"""
+    versions = chapter.get('versions') or []
+    if index >= len(versions):
+        return default
+    return versions[index].get(field, default)
+
+class Faults:
+    """Decides, reproducibly, which requests are delayed, failed or stalled"""
+    
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, timeout_rate=0.0, flaky=0,
+                 retry_after=DEFAULT_RETRY_AFTER, stall=DEFAULT_STALL, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.flaky = flaky
+        self.retry_after = retry_after
+        self.stall = stall
+        self.random = random.Random(seed)
+        self.attempts = Counter()
+        self.lock = threading.Lock()
+    
+    def plan(self, url):
+        """(delay in seconds, injected status or 'timeout' or None) for one request"""
+        with self.lock:
+            self.attempts[url] += 1
+            attempt = self.attempts[url]
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            roll = self.random.random()
+            error = self.random.choice((429, 503))
+        
+        if attempt <= self.flaky:
+            return delay, 503
+        if roll < self.timeout_rate:
+            return delay, 'timeout'
+        if roll < self.timeout_rate + self.error_rate:
+            return delay, error
+        return delay, None
+
+class FixtureStore:
+    """Responses served by the stand-in: recorded fixtures first, then ones built from mishnayot_texts/"""
+    
+    def __init__(self, source_dir=MISHNAYOT_DIR, fixtures_dir=FIXTURES_DIR, upstream=None):
+        self.source_dir = Path(source_dir)
+        self.fixtures_dir = Path(fixtures_dir)
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.books = {}
+        self.lock = threading.Lock()
+    
+    def fixture_path(self, path, query):
+        """Where the recorded response to a request lives"""
+        name = quote(path.strip('/'), safe='')
+        if query:
+            name += '-' + hashlib.sha256(query.encode('utf-8')).hexdigest()[:12]
+        return self.fixtures_dir / f"{name}.json"
+    
+    def chapters(self, tractate_name):
+        """Chapter files of a tractate in order (empty if it is not in the tree)"""
+        tractate_dir = self.source_dir / tractate_name
+        return chapter_files(tractate_dir) if tractate_dir.is_dir() else []
+    
+    def book(self, tractate_name):
+        """Whole-tractate response assembled from its chapter responses (cached)"""
+        with self.lock:
+            if tractate_name not in self.books:
+                chapters = [json.loads(path.read_bytes()) for path in self.chapters(tractate_name)]
+                # Some saved chapters have no versions at all (e.g. Bikkurim 4) - they contribute empty text
+                template = next((chapter for chapter in chapters if chapter['versions']), chapters[0])
+                book = dict(template)
+                book['versions'] = [
+                    dict(version,
+                         text=[version_field(chapter, i, 'text', []) for chapter in chapters],
+                         sources=[version_field(chapter, i, 'sources', None) for chapter in chapters])
+                    for i, version in enumerate(template['versions'])
+                ]
+                for field in SECTION_FIELDS:
+                    book[field] = None
+                book.update(ref=book['book'], heRef=book['heTitle'], sections=[], toSections=[],
+                            sectionRef=book['book'], title=book['book'], isSpanning=False)
+                self.books[tractate_name] = json.dumps(book, ensure_ascii=False).encode('utf-8')
+            return self.books[tractate_name]
+    
+    def synthesise(self, path):
+        """(body, last-modified timestamp) built from mishnayot_texts/, or None if the route is unknown"""
+        match = CHAPTER_ROUTE.match(path)
+        if match:
+            chapter_file = self.source_dir / match.group(1) / f"chapter_{match.group(2)}.json"
+            if chapter_file.exists():
+                return chapter_file.read_bytes(), chapter_file.stat().st_mtime
+            return None
+        
+        match = INDEX_ROUTE.match(path)
+        if match and self.chapters(match.group(1)):
+            files = self.chapters(match.group(1))
+            lengths = [len(files), max((len(version_field(json.loads(f.read_bytes()), 0, 'text', [])) for f in files),
+                                       default=0)]
+            body = json.dumps({'title': match.group(1), 'schema': {'lengths': lengths}}).encode('utf-8')
+            return body, max(f.stat().st_mtime for f in files)
+        
+        match = BOOK_ROUTE.match(path)
+        if match and self.chapters(match.group(1)):
+            files = self.chapters(match.group(1))
+            return self.book(match.group(1)), max(f.stat().st_mtime for f in files)
+        return None
+    
+    def record(self, path, query):
+        """Fetch a request from the upstream API and save it as a fixture"""
+        response = requests.get(f"{self.upstream}{path}", params=query or None, timeout=60)
+        if response.status_code != 200:
+            return None
+        fixture = self.fixture_path(path, query)
+        fixture.parent.mkdir(parents=True, exist_ok=True)
+        fixture.write_bytes(response.content)
+        print(f"📼 Recorded {path} -> {fixture}")
+        return response.content, time.time()
+    
+    def get(self, path, query):
+        """(body, last-modified timestamp) for a request, or None for 404"""
+        fixture = self.fixture_path(path, query)
+        if fixture.exists():
+            return fixture.read_bytes(), fixture.stat().st_mtime
+        if self.upstream:
+            return self.record(path, query)
+        return self.synthesise(path)
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Sefaria API stand-in with fault injection"""
+    
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API behind its CDN
+    store = None
+    faults = None
+    stats = Counter()
+    stats_lock = threading.Lock()
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def count(self, status):
+        with self.stats_lock:
+            self.stats[str(status)] += 1
+            self.stats['requests'] += 1
+    
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == '/_stats':
+            with self.stats_lock:
+                body = json.dumps(self.stats, indent=2).encode('utf-8')
+            self.send_body(200, body)
+            return
+        
+        delay, fault = self.faults.plan(self.path)
+        if delay:
+            time.sleep(delay)
+        
+        if fault == 'timeout':
+            self.count('timeout')
+            time.sleep(self.faults.stall)
+            self.close_connection = True
+            return
+        if fault is not None:
+            self.count(fault)
+            headers = {'Retry-After': str(self.faults.retry_after)} if fault == 429 else {}
+            self.send_body(fault, b'{"error": "injected fault"}', headers)
+            return
+        
+        found = self.store.get(parts.path, parts.query)
+        if found is None:
+            self.count(404)
+            self.send_body(404, b'{"error": "not found"}')
+            return
+        
+        body, modified = found
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        validators = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True)}
+        if self.headers.get('If-None-Match') == etag:
+            self.count(304)
+            self.send_body(304, b'', validators)
+            return
+        
+        self.count(200)
+        self.send_body(200, body, validators)
+    
+    def send_body(self, code, body, headers=None):
+        self.send_response(code)
+        if code != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if code != 304:
+            self.wfile.write(body)
+
+def check_tree(store):
+    """Build the index, chapter and whole-book responses of every tractate in the tree, returning the failures"""
+    failures = []
+    tractate_dirs = sorted(path for path in store.source_dir.iterdir() if path.is_dir() and store.chapters(path.name))
+    for tractate_dir in tractate_dirs:
+        name = tractate_dir.name
+        paths = [f"/api/v2/index/{name}", f"/api/v3/texts/{name}"]
+        paths += [f"/api/v3/texts/{name}.{path.stem.replace('chapter_', '')}" for path in store.chapters(name)]
+        for path in paths:
+            try:
+                response = store.synthesise(path)
+                if response is None:
+                    raise LookupError("no response")
+                data = json.loads(response[0])
+                if path == paths[0] and data['schema']['lengths'][0] != len(store.chapters(name)):
+                    raise ValueError("wrong chapter count")
+            except Exception as e:
+                failures.append(f"{path}: {type(e).__name__}: {e}")
+    
+    print(f"🧪 Checked {len(tractate_dirs)} tractates in {store.source_dir}/: "
+          f"{'all responses OK' if not failures else f'{len(failures)} failures'}")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    return failures
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Sefaria API")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--source", type=Path, default=MISHNAYOT_DIR,
+                        help=f"chapter tree to serve (default: {MISHNAYOT_DIR})")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR,
+                        help=f"recorded responses, served first (default: {FIXTURES_DIR})")
+    parser.add_argument("--record", metavar="URL",
+                        help="forward requests without a fixture to this API and record them")
+    parser.add_argument("--latency", type=float, default=0, metavar="MS", help="delay added to every response")
+    parser.add_argument("--jitter", type=float, default=0, metavar="MS", help="extra random delay, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0, metavar="P",
+                        help="share of requests answered with 429 or 503")
+    parser.add_argument("--retry-after", type=int, default=DEFAULT_RETRY_AFTER, metavar="S",
+                        help=f"Retry-After sent with injected 429s (default: {DEFAULT_RETRY_AFTER})")
+    parser.add_argument("--timeout-rate", type=float, default=0, metavar="P",
+                        help="share of requests that stall without answering")
+    parser.add_argument("--stall", type=float, default=DEFAULT_STALL, metavar="S",
+                        help=f"how long a stalled request hangs (default: {DEFAULT_STALL})")
+    parser.add_argument("--flaky", type=int, default=0, metavar="N",
+                        help="fail the first N attempts at every URL with 503")
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible latency and faults")
+    parser.add_argument("--check", action="store_true",
+                        help="build every tractate's index, chapter and book responses from --source and exit "
+                             "(non-zero if any fails)")
+    return parser.parse_args()
+
+def main():
+    """Start the stand-in server"""
+    args = parse_args()
+    
+    if not args.record and not args.source.is_dir() and not args.fixtures.is_dir():
+        raise SystemExit(f"❌ Neither {args.source}/ nor {args.fixtures}/ exists - run this from tanya-web/")
+    
+    if args.check:
+        raise SystemExit(1 if check_tree(FixtureStore(args.source, args.fixtures)) else 0)
+    
+    StubRequestHandler.store = FixtureStore(args.source, args.fixtures, args.record)
+    StubRequestHandler.faults = Faults(args.latency / 1000, args.jitter / 1000, args.error_rate, args.timeout_rate,
+                                       args.flaky, args.retry_after, args.stall, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), StubRequestHandler)
+    server.daemon_threads = True
+    
+    print(f"🧪 Sefaria stand-in on http://{args.host}:{args.port} serving {args.source}/"
+          f"{f' (recording from {args.record})' if args.record else ''}")
+    print(f"   Point the fetcher at it: python3 scripts/fetch_mishnayot.py --base-url http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped - {dict(StubRequestHandler.stats)}")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()